@@ -0,0 +1,372 @@
+import calendar
+import json
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from coordination import temp_path
+from journal import read_log
+from search_index import snapshot_due
+from storage import DAYS, TIME_SLOTS
+
+INDEX_VERSION = 1
+
+
+def document_counters(kind, key, data):
+    """문서가 날짜별로 기여하는 집계값 {날짜: {지표: 값}}
+
+    주간 문서는 일정 수를 실제 날짜별로 나누어 tasks, slot:<시간대>, weekday:<요일> 로,
+    일별 문서는 체크리스트 진행/완료 수와 메모 작성 여부를 기록합니다.
+    반복 일정은 문서에 저장되지 않으므로 집계에 포함되지 않습니다.
+    """
+    counters = {}
+    if kind == "week":
+        monday = datetime.strptime(key, "%Y-%m-%d")
+        for day, slots in data.get("days", {}).items():
+            if day not in DAYS:
+                continue
+            values = {}
+            for slot, tasks in slots.items():
+                if len(tasks):
+                    values[f"slot:{slot}"] = values.get(f"slot:{slot}", 0) + len(tasks)
+            total = sum(values.values())
+            if total:
+                values["tasks"] = total
+                values[f"weekday:{day}"] = total
+                date_str = (monday + timedelta(days=DAYS.index(day))).strftime("%Y-%m-%d")
+                counters[date_str] = values
+    else:
+        open_count = len(data.get("checklist", ()))
+        done_count = len(data.get("completed", ()))
+        notes = data.get("notes") or ""
+        values = {}
+        if open_count or done_count:
+            day = DAYS[datetime.strptime(key, "%Y-%m-%d").weekday()]
+            values["days"] = 1
+            values["open"] = open_count
+            values["done"] = done_count
+            values[f"items:{day}"] = open_count + done_count
+            values[f"done:{day}"] = done_count
+        if notes.strip():
+            values["notes"] = 1
+            values["notes_chars"] = len(notes)
+        values = {name: value for name, value in values.items() if value}
+        if values:
+            counters[key] = values
+    return counters
+
+
+def _notes_values(notes):
+    # 메모가 집계값에 기여하는 (notes, notes_chars)
+    if notes and notes.strip():
+        return 1, len(notes)
+    return 0, 0
+
+
+def change_counters(kind, key, data, changes):
+    """apply_operation 이 기록한 항목 변경으로 생기는 날짜별 집계값 변화량 {날짜: {지표: 변화량}}
+
+    data 는 변경이 적용된 문서이며, 일별 문서의 days 를 정하는 항목 수만 읽습니다.
+    """
+    deltas = {}
+    if kind == "week":
+        monday = datetime.strptime(key, "%Y-%m-%d")
+        for location, old, new in changes:
+            sign = (new is not None) - (old is not None)
+            day, slot = location.split("/", 1)
+            if not sign or day not in DAYS:
+                continue
+            date_str = (monday + timedelta(days=DAYS.index(day))).strftime("%Y-%m-%d")
+            values = deltas.setdefault(date_str, Counter())
+            values["tasks"] += sign
+            values[f"slot:{slot}"] += sign
+            values[f"weekday:{day}"] += sign
+    else:
+        day = DAYS[datetime.strptime(key, "%Y-%m-%d").weekday()]
+        values = Counter()
+        items = 0
+        for location, old, new in changes:
+            if location == "notes":
+                old_notes, old_chars = _notes_values(old)
+                new_notes, new_chars = _notes_values(new)
+                values["notes"] += new_notes - old_notes
+                values["notes_chars"] += new_chars - old_chars
+                continue
+            sign = (new is not None) - (old is not None)
+            items += sign
+            values[f"items:{day}"] += sign
+            if location == "checklist":
+                values["open"] += sign
+            else:
+                values["done"] += sign
+                values[f"done:{day}"] += sign
+        total = len(data.get("checklist", ())) + len(data.get("completed", ()))
+        values["days"] += (total > 0) - (total - items > 0)
+        deltas[key] = values
+    return {date_str: {name: value for name, value in values.items() if value} for date_str, values in deltas.items()}
+
+
+def summarize(counters):
+    """집계값에 완료율 등 파생 지표를 붙인 요약 딕셔너리"""
+    total_items = counters.get("open", 0) + counters.get("done", 0)
+    return {
+        "tasks": counters.get("tasks", 0),
+        "tasks_by_slot": {slot: counters.get(f"slot:{slot}", 0) for slot in TIME_SLOTS},
+        "tasks_by_weekday": {day: counters.get(f"weekday:{day}", 0) for day in DAYS},
+        "checklist_days": counters.get("days", 0),
+        "items": total_items,
+        "completed": counters.get("done", 0),
+        "completion_rate": counters.get("done", 0) / total_items if total_items else 0.0,
+        "completion_by_weekday": {
+            day: (counters.get(f"done:{day}", 0) / counters[f"items:{day}"]) if counters.get(f"items:{day}") else 0.0
+            for day in DAYS
+        },
+        "notes_days": counters.get("notes", 0),
+        "notes_chars": counters.get("notes_chars", 0)
+    }
+
+
+class AnalyticsIndex:
+    """문서별 집계값과 일/월/연 단위 합계를 유지하는 생산성 통계 색인
+
+    문서가 바뀔 때마다 연산이 만든 변화량만 문서 기여분과 합계에 더하므로 문서를 다시
+    읽지 않습니다. 기간 조회는 기간 양 끝의 일부 월은 일 합계, 일부 연도는 월 합계,
+    나머지는 연 합계로 계산하므로 저장된 데이터 양과 관계없이 일정한 시간에 끝납니다.
+    저장 방식은 검색 색인과 같이 스냅샷 파일과 변경 로그를 사용하며, load()/rebuild() 전에는
+    변경된 문서의 기여분 전체를 로그에만 추가합니다.
+    """
+
+    def __init__(self, base_dir):
+        self.snapshot_path = os.path.join(base_dir, "analytics.json")
+        self.log_path = os.path.join(base_dir, "analytics.log")
+        # (kind, key) -> {날짜: {지표: 값}}
+        self._docs = {}
+        self._days = {}
+        self._months = {}
+        self._years = {}
+        self._lock = threading.Lock()
+        self._log = None
+        # 스냅샷과 로그를 읽었는지 (rebuild 포함)
+        self.loaded = False
+        # 공유 모드에서 스냅샷이 반영한 변경 알림 위치 (coordination.ChangeFeed)
+        self.cursor = None
+        # 스냅샷에 기록된 위치와 스냅샷/로그 크기, compact() 가 스냅샷을 다시 쓸지 판단
+        self._saved_cursor = None
+        self._snapshot_bytes = 0
+        self._log_bytes = 0
+
+    def load(self):
+        """스냅샷과 로그를 읽어 집계 복원, 스냅샷이 없으면 False"""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if raw.get("version") != INDEX_VERSION:
+            return False
+        with self._lock:
+            self.cursor = self._saved_cursor = raw.get("cursor")
+            self._clear()
+            for kind, key, counters in raw.get("docs", []):
+                self._replace((kind, key), counters)
+            for record in read_log(self.log_path):
+                if "counters" in record:
+                    self._replace(tuple(record["doc"]), record["counters"])
+                else:
+                    self._set_dates(tuple(record["doc"]), record["dates"])
+            self._snapshot_bytes = os.path.getsize(self.snapshot_path)
+            self._log_bytes = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+            self._open_log()
+            self.loaded = True
+        return True
+
+    def rebuild(self, documents):
+        """(kind, key, 문서) 목록으로 집계 전체를 새로 만듦"""
+        with self._lock:
+            self._clear()
+            for kind, key, data in documents:
+                self._replace((kind, key), document_counters(kind, key, data))
+            self._write_snapshot()
+            self.loaded = True
+
+    def update_document(self, kind, key, data):
+        """문서 전체로 기여분을 다시 계산 (put, 다른 프로세스의 변경 반영), 바뀐 경우만 로그에 추가"""
+        counters = document_counters(kind, key, data)
+        doc = (kind, key)
+        with self._lock:
+            if self.loaded:
+                if self._docs.get(doc, {}) == counters:
+                    return False
+                self._replace(doc, counters)
+            self._write_log({"doc": [kind, key], "counters": counters})
+        return True
+
+    def apply_changes(self, kind, key, data, changes):
+        """apply_operation 이 기록한 항목 변경의 변화량을 기여분과 일/월/연 합계에 반영
+
+        로그에는 변화량 대신 바뀐 날짜의 새 기여분을 기록해, 압축 도중 중단되어 같은
+        레코드가 다시 재생되어도 두 번 더해지지 않습니다.
+        """
+        deltas = change_counters(kind, key, data, changes)
+        doc = (kind, key)
+        with self._lock:
+            if not self.loaded:
+                # 이전 기여분을 모르므로 문서의 기여분 전체를 기록
+                self._write_log({"doc": [kind, key], "counters": document_counters(kind, key, data)})
+                return True
+            counters = self._docs.get(doc, {})
+            dates = {}
+            for date_str, delta in deltas.items():
+                if not delta:
+                    continue
+                values = dict(counters.get(date_str, {}))
+                for name, value in delta.items():
+                    values[name] = values.get(name, 0) + value
+                    if not values[name]:
+                        del values[name]
+                dates[date_str] = values
+            if not dates:
+                return False
+            self._set_dates(doc, dates)
+            self._write_log({"doc": [kind, key], "dates": dates})
+        return True
+
+    def compact(self, force=False):
+        """로그가 충분히 쌓였으면 스냅샷에 합치고 로그 비우기, 다시 썼으면 True (기준은 search_index.snapshot_due)"""
+        with self._lock:
+            if not self.loaded:
+                return False
+            if not force and not snapshot_due(self._log_bytes, self._snapshot_bytes, self.cursor, self._saved_cursor):
+                return False
+            self._write_snapshot()
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def bounds(self):
+        """집계가 있는 첫 날짜와 마지막 날짜, 없으면 (None, None)"""
+        with self._lock:
+            if not self._years:
+                return None, None
+            return f"{min(self._years)}-01-01", f"{max(self._years)}-12-31"
+
+    def summary(self, start=None, end=None):
+        """기간(양 끝 포함)의 요약, start/end 가 None 이면 전체 기간"""
+        return summarize(self.counters(start, end))
+
+    def counters(self, start=None, end=None):
+        """기간(양 끝 포함)의 집계값 합계"""
+        first, last = self.bounds()
+        if first is None:
+            return {}
+        start = datetime.strptime(start or first, "%Y-%m-%d").date()
+        end = datetime.strptime(end or last, "%Y-%m-%d").date()
+        total = Counter()
+        with self._lock:
+            current = start
+            while current <= end:
+                if current.month == 1 and current.day == 1 and date(current.year, 12, 31) <= end:
+                    total.update(self._years.get(str(current.year), {}))
+                    current = date(current.year + 1, 1, 1)
+                    continue
+                last_day = calendar.monthrange(current.year, current.month)[1]
+                if current.day == 1 and date(current.year, current.month, last_day) <= end:
+                    total.update(self._months.get(current.strftime("%Y-%m"), {}))
+                    current = date(current.year, current.month, last_day) + timedelta(days=1)
+                    continue
+                total.update(self._days.get(current.strftime("%Y-%m-%d"), {}))
+                current += timedelta(days=1)
+        return dict(total)
+
+    def monthly(self, start=None, end=None):
+        """기간에 걸친 월별 (월, 요약) 목록 (월 합계 기준, 집계가 없는 달은 제외)"""
+        first, last = self.bounds()
+        if first is None:
+            return []
+        start_month = (start or first)[:7]
+        end_month = (end or last)[:7]
+        with self._lock:
+            months = sorted(m for m in self._months if start_month <= m <= end_month)
+            return [(month, summarize(self._months[month])) for month in months]
+
+    def _clear(self):
+        self._docs = {}
+        self._days = {}
+        self._months = {}
+        self._years = {}
+
+    def _replace(self, doc, counters):
+        old_counters = self._docs.get(doc, {})
+        for date_str, values in old_counters.items():
+            self._add(date_str, values, -1)
+        for date_str, values in counters.items():
+            self._add(date_str, values, 1)
+        if counters:
+            self._docs[doc] = counters
+        else:
+            self._docs.pop(doc, None)
+
+    def _set_dates(self, doc, dates):
+        # 문서의 날짜별 기여분 일부만 교체 (빈 값이면 그 날짜 제거)
+        counters = self._docs.setdefault(doc, {})
+        for date_str, values in dates.items():
+            self._add(date_str, counters.get(date_str, {}), -1)
+            self._add(date_str, values, 1)
+            if values:
+                counters[date_str] = values
+            else:
+                counters.pop(date_str, None)
+        if not counters:
+            del self._docs[doc]
+
+    def _add(self, date_str, values, sign):
+        for table, bucket in ((self._days, date_str), (self._months, date_str[:7]), (self._years, date_str[:4])):
+            totals = table.setdefault(bucket, {})
+            for name, value in values.items():
+                totals[name] = totals.get(name, 0) + sign * value
+                if not totals[name]:
+                    del totals[name]
+            if not totals:
+                del table[bucket]
+
+    def _write_log(self, record):
+        if self._log is None:
+            self._open_log()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._log.write(line)
+        self._log.flush()
+        self._log_bytes += len(line.encode('utf-8'))
+
+    def _open_log(self):
+        if self._log is not None:
+            self._log.close()
+        folder = os.path.dirname(self.log_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+
+    def _write_snapshot(self):
+        folder = os.path.dirname(self.snapshot_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = temp_path(self.snapshot_path)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "cursor": self.cursor,
+                "docs": [[kind, key, counters] for (kind, key), counters in self._docs.items()]
+            }, f, ensure_ascii=False)
+        self._snapshot_bytes = os.path.getsize(tmp_path)
+        os.replace(tmp_path, self.snapshot_path)
+        self._saved_cursor = self.cursor
+        if self._log is not None:
+            self._log.close()
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self._log_bytes = 0
+        self._open_log()
@@ -0,0 +1,375 @@
+"""HTML 렌더링 없이 문서를 다루는 REST/JSON API
+
+Gradio 가 사용하는 FastAPI 서버에 /api/v1 아래로 추가됩니다.
+
+    GET    /api/v1/weeks/{date}              주간 문서 (date 가 속한 주)
+    PUT    /api/v1/weeks/{date}              주간 문서 전체 덮어쓰기
+    POST   /api/v1/weeks/{date}/tasks        일정 추가 {"day", "slot", "task"}
+    DELETE /api/v1/weeks/{date}/tasks        일정 삭제 ?day=&slot=&id= (또는 &task=)
+    POST   /api/v1/weeks/{date}/batch        여러 연산을 한 번에 {"operations": [{"op": "add"|"remove"|"rename", ...}]}
+    GET    /api/v1/days/{date}               일별 문서
+    PUT    /api/v1/days/{date}               일별 문서 전체 덮어쓰기
+    POST   /api/v1/days/{date}/items         체크리스트 추가 {"item"}
+    POST   /api/v1/days/{date}/items/complete  항목 완료 {"id"} 또는 {"item"}
+    PUT    /api/v1/days/{date}/notes         메모 저장 {"notes"}
+    POST   /api/v1/days/{date}/batch         {"operations": [{"op": "add"|"complete"|"remove"|"rename", "id", "item"} | {"op": "notes", "notes"}]}
+    GET    /api/v1/dates?kind=day&period=2025-Q2&offset=0&limit=100&latest_first=false
+    GET    /api/v1/analytics?period=2025-Q2  기간 생산성 통계와 월별 요약
+    GET    /api/v1/recurrences               반복 일정 규칙 목록
+    POST   /api/v1/recurrences               규칙 추가/교체 {"text", "target", "start", "freq", "interval", "weekdays", "slot", "until"}
+    DELETE /api/v1/recurrences/{rule_id}     규칙 삭제
+    PUT    /api/v1/recurrences/{rule_id}/occurrences/{date}  한 날짜만 {"status": "skip"|"complete"|null}
+
+문서 응답은 {"kind", "date", "etag", "data"} 형식이며 ETag 헤더가 함께 전달됩니다.
+data 는 저장 형식(schema 2)으로, 항목마다 {"id", "text"} 를 가지며 삭제/완료/이름 변경은 id 로 지정합니다.
+추가 연산에 id 를 직접 지정하면 같은 요청을 다시 보내도 한 번만 추가됩니다.
+GET 에 If-None-Match 를 보내면 바뀌지 않은 문서는 304 로 응답하고,
+변경 요청에 If-Match 를 보내면 그 사이 문서가 바뀐 경우 412 로 거절합니다.
+batch 요청의 연산은 한 번 읽은 문서에 모두 적용된 뒤 한 번만 저장됩니다.
+complete 는 NDJSON 가져오기와 같이 체크리스트에 없는 항목도 완료 목록에 추가합니다.
+문서 응답에는 저장된 항목만 들어 있으며, 반복 일정은 /recurrences 규칙으로 따로 다룹니다.
+사용자별 데이터 분리 모드에서는 SCHEDULE_USER_HEADER 헤더로 사용자를 구분하며 (없으면 401),
+저장 한도를 넘는 변경은 413 으로 거절합니다.
+"""
+from datetime import datetime
+from typing import Dict, List, Literal, Optional, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from manager import DocumentConflictError, QuotaExceededError
+from metrics import timed
+from recurrence import EXCEPTION_STATUSES, FREQUENCIES, TARGETS
+from storage import DAYS, TIME_SLOTS
+from tasks import new_task_id, to_plain
+from tenants import current_manager
+
+Day = Literal[tuple(DAYS)]
+TimeSlot = Literal[tuple(TIME_SLOTS)]
+
+
+class WeekTask(BaseModel):
+    day: Day
+    slot: TimeSlot
+    task: str = Field(min_length=1)
+
+
+class WeekOperation(BaseModel):
+    op: Literal["add", "remove", "rename"]
+    day: Day
+    slot: TimeSlot
+    # add/rename 의 텍스트, remove 는 id 가 없을 때 텍스트로 찾음
+    task: Optional[str] = None
+    id: Optional[str] = None
+
+
+class WeekBatch(BaseModel):
+    operations: List[WeekOperation]
+
+
+class TaskItem(BaseModel):
+    id: Optional[str] = None
+    text: str
+
+
+# 문서 덮어쓰기 시 항목은 문자열 또는 {"id", "text"}, id 가 없으면 새로 만듦
+Item = Union[str, TaskItem]
+
+
+class WeekDocument(BaseModel):
+    # 요일 -> 시간대 -> 일정 목록, 빠진 요일/시간대는 빈 목록
+    days: Dict[Day, Dict[TimeSlot, List[Item]]] = {}
+
+
+class DayItem(BaseModel):
+    item: str = Field(min_length=1)
+
+
+class DayItemRef(BaseModel):
+    id: Optional[str] = None
+    item: Optional[str] = None
+
+
+class DayNotes(BaseModel):
+    notes: str
+
+
+class DayOperation(BaseModel):
+    op: Literal["add", "complete", "remove", "rename", "notes"]
+    id: Optional[str] = None
+    item: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class DayBatch(BaseModel):
+    operations: List[DayOperation]
+
+
+class DayDocument(BaseModel):
+    checklist: List[Item] = []
+    completed: List[Item] = []
+    notes: str = ""
+
+
+class RecurrenceRuleBody(BaseModel):
+    id: Optional[str] = None
+    text: str = Field(min_length=1)
+    target: Literal[TARGETS]
+    start: str
+    freq: Literal[FREQUENCIES] = "weekly"
+    interval: int = Field(1, ge=1)
+    weekdays: List[Day] = []
+    slot: Optional[TimeSlot] = None
+    until: Optional[str] = None
+
+
+class OccurrenceStatus(BaseModel):
+    status: Optional[Literal[EXCEPTION_STATUSES]] = None
+
+
+def _check_date(date_str):
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"날짜 형식이 올바르지 않습니다 (YYYY-MM-DD): {date_str}")
+
+
+def _etag_matches(header, etag):
+    """If-None-Match 헤더 값에 etag 가 포함되어 있는지 (약한 비교)"""
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _document_response(kind, date_str, data, etag):
+    return JSONResponse(
+        {"kind": kind, "date": date_str, "etag": etag, "data": to_plain(data)},
+        headers={"ETag": etag}
+    )
+
+
+def _plain_items(items):
+    return [item if isinstance(item, str) else item.model_dump(exclude_none=True) for item in items]
+
+
+def _invalid(detail):
+    return HTTPException(status_code=422, detail=detail)
+
+
+def _week_operation(operation):
+    record = {"op": f"week_{operation.op}", "day": operation.day, "slot": operation.slot}
+    if operation.op == "add":
+        if not operation.task:
+            raise _invalid("add 연산에는 task 가 필요합니다")
+        return dict(record, task=operation.task, id=operation.id or new_task_id())
+    if operation.op == "rename":
+        if not operation.id or not operation.task:
+            raise _invalid("rename 연산에는 id 와 task 가 필요합니다")
+        return dict(record, id=operation.id, text=operation.task)
+    if not operation.id and not operation.task:
+        raise _invalid("remove 연산에는 id 또는 task 가 필요합니다")
+    return dict(record, id=operation.id, task=operation.task)
+
+
+def _day_operation(operation):
+    if operation.op == "notes":
+        if operation.notes is None:
+            raise _invalid("notes 연산에는 notes 가 필요합니다")
+        return {"op": "day_notes", "notes": operation.notes}
+    if operation.op == "add":
+        if not operation.item:
+            raise _invalid("add 연산에는 item 이 필요합니다")
+        return {"op": "day_add", "item": operation.item, "id": operation.id or new_task_id()}
+    if operation.op == "rename":
+        if not operation.id or not operation.item:
+            raise _invalid("rename 연산에는 id 와 item 이 필요합니다")
+        return {"op": "day_rename", "id": operation.id, "text": operation.item}
+    if not operation.id and not operation.item:
+        raise _invalid(f"{operation.op} 연산에는 id 또는 item 이 필요합니다")
+    return {"op": f"day_{operation.op}", "id": operation.id, "item": operation.item}
+
+
+def tenant_dependency(pool, user_header):
+    """user_header 헤더의 사용자 매니저를 풀에서 빌려 요청 동안 current_manager 로 지정하는 의존성"""
+    async def use_tenant(request: Request):
+        user = request.headers.get(user_header) if user_header else None
+        if not user:
+            raise HTTPException(status_code=401, detail="사용자를 확인할 수 없습니다")
+        manager = await pool.acquire_async(user)
+        # 요청마다 컨텍스트가 따로 있으므로 되돌리지 않음
+        current_manager.set(manager)
+        try:
+            yield manager
+        finally:
+            pool.release(user)
+
+    return use_tenant
+
+
+def create_api_router(manager=None, prefix="/api/v1", get_manager=None, dependencies=()):
+    """ScheduleManager 를 JSON 으로 노출하는 FastAPI 라우터 생성
+
+    get_manager 를 주면 요청마다 호출해 사용할 매니저를 정하며 (사용자별 매니저),
+    dependencies 는 모든 엔드포인트보다 먼저 실행됩니다.
+    """
+    router = APIRouter(prefix=prefix, dependencies=[Depends(dependency) for dependency in dependencies])
+    current = get_manager or (lambda: manager)
+
+    def instrumented(name):
+        return lambda func: timed("api", name, func)
+
+    def get_document(kind, date_str, if_none_match):
+        _check_date(date_str)
+        data, etag = current().get_document(kind, date_str)
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        key = current().get_week_start(date_str) if kind == "week" else date_str
+        return _document_response(kind, key, data, etag)
+
+    def update_document(kind, date_str, operations, if_match):
+        _check_date(date_str)
+        try:
+            data, etag = current().update_document(
+                kind, date_str, operations, if_match=if_match.strip() if if_match else None
+            )
+        except DocumentConflictError as e:
+            raise HTTPException(status_code=412, detail=str(e))
+        except QuotaExceededError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        key = current().get_week_start(date_str) if kind == "week" else date_str
+        return _document_response(kind, key, data, etag)
+
+    @router.get("/weeks/{date}")
+    @instrumented("get_week")
+    def get_week(date: str, if_none_match: Optional[str] = Header(None)):
+        return get_document("week", date, if_none_match)
+
+    @router.put("/weeks/{date}")
+    @instrumented("put_week")
+    def put_week(date: str, body: WeekDocument, if_match: Optional[str] = Header(None)):
+        _check_date(date)
+        data = {
+            "week_start": current().get_week_start(date),
+            "days": {
+                day: {slot: _plain_items(body.days.get(day, {}).get(slot, [])) for slot in TIME_SLOTS}
+                for day in DAYS
+            }
+        }
+        return update_document("week", date, [{"op": "put", "data": data}], if_match)
+
+    @router.post("/weeks/{date}/tasks")
+    @instrumented("add_week_task")
+    def add_week_task(date: str, body: WeekTask, if_match: Optional[str] = Header(None)):
+        operation = WeekOperation(op="add", day=body.day, slot=body.slot, task=body.task)
+        return update_document("week", date, [_week_operation(operation)], if_match)
+
+    @router.delete("/weeks/{date}/tasks")
+    @instrumented("remove_week_task")
+    def remove_week_task(date: str, day: Day, slot: TimeSlot, id: Optional[str] = Query(None),
+                         task: Optional[str] = Query(None), if_match: Optional[str] = Header(None)):
+        operation = WeekOperation(op="remove", day=day, slot=slot, id=id, task=task)
+        return update_document("week", date, [_week_operation(operation)], if_match)
+
+    @router.post("/weeks/{date}/batch")
+    @instrumented("week_batch")
+    def week_batch(date: str, body: WeekBatch, if_match: Optional[str] = Header(None)):
+        return update_document("week", date, [_week_operation(op) for op in body.operations], if_match)
+
+    @router.get("/days/{date}")
+    @instrumented("get_day")
+    def get_day(date: str, if_none_match: Optional[str] = Header(None)):
+        return get_document("day", date, if_none_match)
+
+    @router.put("/days/{date}")
+    @instrumented("put_day")
+    def put_day(date: str, body: DayDocument, if_match: Optional[str] = Header(None)):
+        data = {
+            "date": date,
+            "checklist": _plain_items(body.checklist),
+            "completed": _plain_items(body.completed),
+            "notes": body.notes
+        }
+        return update_document("day", date, [{"op": "put", "data": data}], if_match)
+
+    @router.post("/days/{date}/items")
+    @instrumented("add_day_item")
+    def add_day_item(date: str, body: DayItem, if_match: Optional[str] = Header(None)):
+        return update_document("day", date, [{"op": "day_add", "item": body.item, "id": new_task_id()}], if_match)
+
+    @router.post("/days/{date}/items/complete")
+    @instrumented("complete_day_item")
+    def complete_day_item(date: str, body: DayItemRef, if_match: Optional[str] = Header(None)):
+        operation = DayOperation(op="complete", id=body.id, item=body.item)
+        return update_document("day", date, [_day_operation(operation)], if_match)
+
+    @router.put("/days/{date}/notes")
+    @instrumented("put_day_notes")
+    def put_day_notes(date: str, body: DayNotes, if_match: Optional[str] = Header(None)):
+        return update_document("day", date, [{"op": "day_notes", "notes": body.notes}], if_match)
+
+    @router.post("/days/{date}/batch")
+    @instrumented("day_batch")
+    def day_batch(date: str, body: DayBatch, if_match: Optional[str] = Header(None)):
+        return update_document("day", date, [_day_operation(op) for op in body.operations], if_match)
+
+    @router.get("/dates")
+    @instrumented("list_dates")
+    def list_dates(kind: Literal["week", "day"] = "day", period: str = "", offset: int = 0,
+                   limit: int = 100, latest_first: bool = False):
+        try:
+            dates, total = current().query_dates(kind, period, max(offset, 0), max(limit, 0), latest_first)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"kind": kind, "period": period, "total": total, "dates": dates}
+
+    @router.get("/analytics")
+    @instrumented("analytics")
+    def analytics(period: str = ""):
+        try:
+            summary = current().analytics_summary(period)
+            months = current().analytics_by_month(period)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "period": period,
+            "summary": summary,
+            "months": [dict(month_summary, month=month) for month, month_summary in months]
+        }
+
+    @router.get("/recurrences")
+    @instrumented("list_recurrences")
+    def list_recurrences():
+        return {"rules": current().list_recurrences()}
+
+    @router.post("/recurrences")
+    @instrumented("add_recurrence")
+    def add_recurrence(body: RecurrenceRuleBody):
+        try:
+            return current().add_recurrence(
+                body.text, body.target, body.start, body.freq, body.interval, body.weekdays,
+                body.slot, body.until, body.id
+            )
+        except QuotaExceededError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except ValueError as e:
+            raise _invalid(str(e))
+
+    @router.delete("/recurrences/{rule_id}")
+    @instrumented("remove_recurrence")
+    def remove_recurrence(rule_id: str):
+        if not current().remove_recurrence(rule_id):
+            raise HTTPException(status_code=404, detail=f"반복 일정이 없습니다: {rule_id}")
+        return {"id": rule_id, "removed": True}
+
+    @router.put("/recurrences/{rule_id}/occurrences/{date}")
+    @instrumented("set_occurrence_status")
+    def set_occurrence_status(rule_id: str, date: str, body: OccurrenceStatus):
+        _check_date(date)
+        if not current().set_occurrence_status(rule_id, date, body.status):
+            raise HTTPException(status_code=404, detail=f"{date} 에 해당하는 반복 일정이 없습니다: {rule_id}")
+        return {"id": rule_id, "date": date, "status": body.status}
+
+    return router
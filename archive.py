@@ -0,0 +1,190 @@
+"""오래된 주간/일별 문서를 연도별 파일 하나에 압축해 보관하는 아카이브
+
+파일 구조 (archive/<연도>.archive):
+
+    MAGIC | 문서 블록 ... | 색인 블록 | footer(색인 위치, 색인 길이, MAGIC)
+
+문서 블록은 문서마다 따로 zlib 으로 압축한 JSON 이고, 색인 블록은
+{"week:2020-01-06": [위치, 길이], "day:2020-01-07": [...]} 를 압축한 JSON 입니다.
+파일은 mmap 으로 열어 필요한 문서 블록만 잘라 압축을 풀기 때문에,
+문서 하나를 읽을 때 한 해 전체를 풀지 않습니다.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import zlib
+
+from metrics import registry
+
+MAGIC = b"SCHARC1\n"
+FOOTER = struct.Struct("<QI8s")
+SUFFIX = ".archive"
+
+
+class ArchiveFormatError(ValueError):
+    """아카이브 파일이 손상되었거나 형식이 다를 때 발생"""
+
+
+class YearArchive:
+    """mmap 으로 연 연도별 아카이브 파일 하나"""
+
+    def __init__(self, path, stamp):
+        self.path = path
+        self.stamp = stamp
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < len(MAGIC) + FOOTER.size or self._mm[:len(MAGIC)] != MAGIC:
+                raise ArchiveFormatError(f"아카이브 형식이 아닙니다: {path}")
+            index_offset, index_length, magic = FOOTER.unpack(self._mm[-FOOTER.size:])
+            if magic != MAGIC:
+                raise ArchiveFormatError(f"아카이브 끝부분이 손상되었습니다: {path}")
+            raw_index = json.loads(zlib.decompress(self._mm[index_offset:index_offset + index_length]))
+        except (ArchiveFormatError, zlib.error, ValueError, struct.error):
+            self._mm.close()
+            raise
+        # (kind, 날짜) -> (위치, 길이)
+        self.index = {tuple(name.split(":", 1)): tuple(span) for name, span in raw_index.items()}
+
+    def block(self, kind, name):
+        """압축된 문서 블록 (없으면 None)"""
+        span = self.index.get((kind, name))
+        if span is None:
+            return None
+        offset, length = span
+        return self._mm[offset:offset + length]
+
+    def close(self):
+        self._mm.close()
+
+
+class ArchiveStore:
+    """archive 디렉토리의 연도별 아카이브 모음
+
+    연도 파일은 처음 필요할 때 열고, 파일이 바뀌면(stamp 비교) 다시 엽니다.
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self._years = {}
+        self._lock = threading.Lock()
+
+    def path(self, year):
+        return os.path.join(self.archive_dir, f"{year}{SUFFIX}")
+
+    def years(self):
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(
+            f[:-len(SUFFIX)] for f in os.listdir(self.archive_dir)
+            if f.endswith(SUFFIX) and f[:-len(SUFFIX)].isdigit()
+        )
+
+    def _file_stamp(self, year):
+        try:
+            st = os.stat(self.path(year))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _open(self, year):
+        # self._lock 을 잡은 상태에서 호출
+        stamp = self._file_stamp(year)
+        archive = self._years.get(year)
+        if archive is not None and archive.stamp == stamp:
+            return archive
+        if archive is not None:
+            archive.close()
+            del self._years[year]
+        if stamp is None:
+            return None
+        try:
+            archive = YearArchive(self.path(year), stamp)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 아카이브를 열 수 없습니다: {self.path(year)} ({e})")
+            return None
+        self._years[year] = archive
+        return archive
+
+    def stamp(self, kind, name):
+        """아카이브에 든 문서의 stamp (파일 stamp + 블록 위치), 없으면 None"""
+        with self._lock:
+            archive = self._open(name[:4])
+            if archive is None or (kind, name) not in archive.index:
+                return None
+            return archive.stamp + (archive.index[(kind, name)][0],)
+
+    def read(self, kind, name):
+        """문서 하나의 블록만 잘라 압축을 풀어 반환, 없으면 None"""
+        with self._lock:
+            archive = self._open(name[:4])
+            block = archive.block(kind, name) if archive is not None else None
+        if block is None:
+            return None
+        registry.inc("schedule_storage_bytes_read_total", (("backend", "archive"),), len(block))
+        with registry.time("schedule_storage_seconds", (("backend", "archive"), ("stage", "parse"))):
+            return json.loads(zlib.decompress(block).decode('utf-8'))
+
+    def names(self, kind):
+        """아카이브에 보관된 kind 문서의 날짜 목록"""
+        names = []
+        with self._lock:
+            for year in self.years():
+                archive = self._open(year)
+                if archive is not None:
+                    names.extend(name for k, name in archive.index if k == kind)
+        return names
+
+    def signature(self):
+        return [[year] + list(self._file_stamp(year) or ()) for year in self.years()]
+
+    def pack(self, year, documents):
+        """{(kind, 날짜): 문서} 를 연도 아카이브에 합쳐 다시 쓰고 블록 수 반환
+
+        기존 블록은 압축을 풀지 않고 그대로 복사하며, 같은 문서는 새 내용으로 바꿉니다.
+        새 파일을 임시 파일로 만든 뒤 rename 으로 교체합니다.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with self._lock:
+            archive = self._open(year)
+            blocks = {}
+            if archive is not None:
+                for key in archive.index:
+                    blocks[key] = archive.block(*key)
+                # Windows 에서는 mmap 으로 열려 있는 파일을 교체할 수 없으므로 먼저 닫음
+                archive.close()
+                del self._years[year]
+            for key, data in documents.items():
+                raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+                blocks[key] = zlib.compress(raw, 9)
+            fd, tmp_path = tempfile.mkstemp(dir=self.archive_dir, prefix=".tmp-", suffix=SUFFIX)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(MAGIC)
+                    offset = len(MAGIC)
+                    index = {}
+                    for (kind, name), block in sorted(blocks.items()):
+                        f.write(block)
+                        index[f"{kind}:{name}"] = [offset, len(block)]
+                        offset += len(block)
+                    raw_index = zlib.compress(json.dumps(index).encode('utf-8'), 9)
+                    f.write(raw_index)
+                    f.write(FOOTER.pack(offset, len(raw_index), MAGIC))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path(year))
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            registry.inc("schedule_storage_bytes_written_total", (("backend", "archive"),), offset + len(raw_index))
+        return len(blocks)
+
+    def close(self):
+        with self._lock:
+            for archive in self._years.values():
+                archive.close()
+            self._years.clear()
@@ -0,0 +1,237 @@
+"""ScheduleManager 및 UI 렌더링 벤치마크
+
+고정된 시드로 N년치 주간/일별 데이터를 생성한 뒤, 여러 규모에서 주요 연산의
+실행 시간을 측정하여 JSON 으로 저장합니다. 커밋 간 결과를 비교할 수 있습니다.
+
+    python benchmark.py --years 0.25 1 3 --out bench.json
+    python benchmark.py --years 1 --out new.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import main
+from manager import ScheduleManager
+from storage import DAYS, TIME_SLOTS, create_backend
+from tenants import current_manager
+
+WORDS = ["회의", "운동", "보고서", "메일", "독서", "점심", "코드 리뷰", "장보기", "산책", "공부", "정리", "통화"]
+
+
+def _random_text(rng, words=3):
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + f" #{rng.randint(1, 9999)}"
+
+
+def generate_history(manager, years, tasks_per_slot=2, items_per_day=6, note_size=200,
+                     start="2020-01-06", seed=42):
+    """years 년치 주간/일별 문서를 결정적으로 생성하고 (주 개수, 일 개수) 반환"""
+    rng = random.Random(seed)
+    monday = datetime.strptime(start, "%Y-%m-%d")
+    monday -= timedelta(days=monday.weekday())
+    week_count = max(int(years * 52), 1)
+    for _ in range(week_count):
+        week_start = monday.strftime("%Y-%m-%d")
+        data = {
+            "week_start": week_start,
+            "days": {
+                day: {slot: [_random_text(rng) for _ in range(tasks_per_slot)] for slot in TIME_SLOTS}
+                for day in DAYS
+            }
+        }
+        manager.save_week_data(week_start, data)
+        for offset in range(7):
+            date_str = (monday + timedelta(days=offset)).strftime("%Y-%m-%d")
+            items = [_random_text(rng) for _ in range(items_per_day)]
+            done = rng.randint(0, len(items))
+            manager.save_day_data(date_str, {
+                "date": date_str,
+                "checklist": items[done:],
+                "completed": items[:done],
+                "notes": "".join(rng.choice("가나다라마바사아자차카타파하 ") for _ in range(note_size))
+            })
+        monday += timedelta(days=7)
+    manager.compact()
+    return week_count, week_count * 7
+
+
+def _time_calls(func, args_list):
+    """각 인자로 func 를 호출한 시간(ms) 통계"""
+    samples = []
+    for args in args_list:
+        begin = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - begin) * 1000)
+    samples.sort()
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0]
+    }
+
+
+def run_scale(years, iterations, backend_kind, options):
+    """한 규모에서 데이터를 생성하고 각 연산을 측정"""
+    base_dir = tempfile.mkdtemp(prefix="schedule_bench_")
+    results = []
+    try:
+        manager = ScheduleManager(base_dir, backend=create_backend(backend_kind, base_dir), compact_interval=0)
+        generate_started = time.perf_counter()
+        week_count, day_count = generate_history(manager, years, **options)
+        generate_ms = (time.perf_counter() - generate_started) * 1000
+        manager.close()
+
+        rng = random.Random(7)
+        week_starts = None
+
+        def record(op, stats):
+            stats.update({"scale_years": years, "op": op, "weeks": week_count, "days": day_count})
+            results.append(stats)
+
+        # 캐시가 없는 상태와 캐시가 채워진 상태를 나누어 측정
+        cold = ScheduleManager(base_dir, backend=create_backend(backend_kind, base_dir),
+                               cache_size=0, compact_interval=0)
+        week_starts, day_dates = cold.get_available_dates()
+        sample_weeks = [(rng.choice(week_starts),) for _ in range(iterations)]
+        sample_days = [(rng.choice(day_dates),) for _ in range(iterations)]
+        record("load_week_data[cold]", _time_calls(cold.load_week_data, sample_weeks))
+        record("load_day_data[cold]", _time_calls(cold.load_day_data, sample_days))
+        cold.close()
+
+        manager = ScheduleManager(base_dir, backend=create_backend(backend_kind, base_dir), compact_interval=0)
+        record("get_available_dates", _time_calls(manager.get_available_dates, [()] * iterations))
+        periods = [(rng.choice(day_dates)[:7],) for _ in range(iterations)] + [("",)]
+        record("analytics_summary", _time_calls(manager.analytics_summary, periods))
+        for args in sample_weeks:
+            manager.load_week_data(*args)
+        record("load_week_data[warm]", _time_calls(manager.load_week_data, sample_weeks))
+        record("load_day_data[warm]", _time_calls(manager.load_day_data, sample_days))
+
+        day_docs = [(manager.load_day_data(d),) for (d,) in sample_days]
+        record("format_day_display", _time_calls(manager.format_day_display, day_docs))
+        record("save_day_data", _time_calls(
+            manager.save_day_data, [(doc["date"], doc) for (doc,) in day_docs]
+        ))
+
+        # UI 에서 쓰는 main.create_weekly_calendar_ui 를 그대로 측정 (main 은 UI 를 만들 때만 Gradio 를 import)
+        # 이 매니저를 current_manager 로 지정해 main 이 schedule_data 대신 사용하도록 함
+        token = current_manager.set(manager)
+        try:
+            renderer = main.calendar_renderer
+            # 렌더 캐시를 끄고 측정한 뒤 채워진 상태로 다시 측정
+            cache_size, renderer.cache_size = renderer.cache_size, 0
+            record("create_weekly_calendar_ui[cold]", _time_calls(main.create_weekly_calendar_ui, sample_weeks))
+            renderer.cache_size = cache_size
+            for args in sample_weeks:
+                main.create_weekly_calendar_ui(*args)
+            record("create_weekly_calendar_ui[warm]", _time_calls(main.create_weekly_calendar_ui, sample_weeks))
+        finally:
+            current_manager.reset(token)
+
+        tasks = [(w, rng.choice(DAYS), rng.choice(TIME_SLOTS), f"bench-{i}") for i, (w,) in enumerate(sample_weeks)]
+        record("add_week_task", _time_calls(manager.add_week_task, tasks))
+        # 삭제/완료는 항목 id 로 지정
+        removals = [
+            (w, day, slot, manager.load_week_data(w)["days"][day][slot].find(text).id)
+            for w, day, slot, text in tasks
+        ]
+        record("remove_week_task", _time_calls(manager.remove_week_task, removals))
+        items = [(d, f"bench-{i}") for i, (d,) in enumerate(sample_days)]
+        record("add_day_checklist", _time_calls(manager.add_day_checklist, items))
+        completions = [(d, manager.load_day_data(d)["checklist"].find(text).id) for d, text in items]
+        record("complete_day_checklist", _time_calls(manager.complete_day_checklist, completions))
+        record("update_day_notes", _time_calls(
+            manager.update_day_notes, [(d, f"bench note {i}") for i, (d,) in enumerate(sample_days)]
+        ))
+        compact_started = time.perf_counter()
+        manager.close()
+        record("compact", {"n": 1, "mean_ms": (time.perf_counter() - compact_started) * 1000})
+        record("generate_history", {"n": 1, "mean_ms": generate_ms})
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, baseline, threshold):
+    """이전 결과와 mean_ms 를 비교해 표로 출력, threshold 배 이상 느려진 항목 수 반환"""
+    previous = {(r["scale_years"], r["op"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"{'규모(년)':>8}  {'연산':<34} {'이전(ms)':>10} {'현재(ms)':>10} {'비율':>7}")
+    for result in current["results"]:
+        before = previous.get((result["scale_years"], result["op"]))
+        if before is None or not before["mean_ms"]:
+            continue
+        ratio = result["mean_ms"] / before["mean_ms"]
+        flag = ""
+        if ratio >= threshold:
+            flag = "  ⚠️"
+            regressions += 1
+        print(f"{result['scale_years']:>8}  {result['op']:<34} {before['mean_ms']:>10.3f} "
+              f"{result['mean_ms']:>10.3f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="일정관리 벤치마크")
+    parser.add_argument("--years", type=float, nargs="+", default=[0.25, 1, 3], help="측정할 데이터 규모 (년)")
+    parser.add_argument("--iterations", type=int, default=200, help="연산별 반복 횟수")
+    parser.add_argument("--backend", default="json", help="저장소 종류 (json/sqlite)")
+    parser.add_argument("--tasks-per-slot", type=int, default=2)
+    parser.add_argument("--items-per-day", type=int, default=6)
+    parser.add_argument("--note-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench.json", help="결과 JSON 파일")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=1.25, help="회귀로 판단할 느려짐 배율")
+    args = parser.parse_args()
+
+    options = {
+        "tasks_per_slot": args.tasks_per_slot,
+        "items_per_day": args.items_per_day,
+        "note_size": args.note_size,
+        "seed": args.seed
+    }
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "iterations": args.iterations,
+            "options": options
+        },
+        "results": []
+    }
+    for years in args.years:
+        print(f"⏱️ {years}년 규모 측정 중...")
+        report["results"].extend(run_scale(years, args.iterations, args.backend, options))
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ 결과 저장: {args.out}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            raise SystemExit(1)
@@ -0,0 +1,185 @@
+"""NDJSON 일괄 내보내기/가져오기
+
+한 줄에 레코드 하나씩 기록하며, 다음 형식을 지원합니다.
+
+    {"type": "week", "week_start": "2025-06-02", "data": {...}}        주간 문서 전체 (덮어쓰기)
+    {"type": "day", "date": "2025-06-06", "data": {...}}               일별 문서 전체 (덮어쓰기)
+    {"type": "week_task", "date": "2025-06-06", "slot": "오전", "task": "회의"}
+        주간 일정 추가, "day" 를 생략하면 date 의 요일을 사용
+    {"type": "day_item", "date": "2025-06-06", "item": "보고서", "completed": false}
+    {"type": "day_notes", "date": "2025-06-06", "notes": "메모"}
+    {"type": "recurrence", "rule": {"id", "text", "target", "start", "freq", ...}}
+        반복 일정 규칙 (같은 id 는 교체, 형식은 recurrence.py 참고)
+
+내보내기는 recurrence 규칙과 week/day 문서 레코드를 저장 형식(schema 2, 항목별 id 포함)으로
+생성하므로 그대로 다시 가져올 수 있습니다. 문서에는 반복 일정의 발생 항목이 포함되지 않습니다. 문서 레코드의 항목은 예전 형식(문자열)이어도 됩니다.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from storage import DAYS, TIME_SLOTS
+from tasks import to_model, to_plain
+
+# 가져오기 시 한 번에 메모리에 모아 문서별로 묶는 레코드 수
+IMPORT_CHUNK_SIZE = 5000
+
+
+def iter_export_records(manager):
+    """반복 규칙과 모든 주간/일별 문서를 날짜 순으로 하나씩 읽어 레코드로 반환하는 제너레이터"""
+    for rule in manager.list_recurrences():
+        yield {"type": "recurrence", "rule": rule}
+    week_starts, day_dates = manager.get_available_dates()
+    for week_start in week_starts:
+        yield {"type": "week", "week_start": week_start, "data": to_plain(manager.get_document("week", week_start)[0])}
+    for date_str in day_dates:
+        yield {"type": "day", "date": date_str, "data": to_plain(manager.get_document("day", date_str)[0])}
+
+
+def export_ndjson(manager, fp):
+    """모든 규칙/문서를 NDJSON 으로 기록하고 레코드 수 반환"""
+    count = 0
+    for record in iter_export_records(manager):
+        fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def document_data(kind, data):
+    """문서 레코드의 data 가 kind 의 문서로 읽을 수 있는지 확인하고 그대로 반환 (아니면 ValueError)"""
+    if not isinstance(data, dict):
+        raise ValueError("data 가 객체가 아닙니다")
+    if kind == "week" and not isinstance(data.get("days"), dict):
+        raise ValueError("주간 문서의 days 가 없습니다")
+    if kind == "day" and "days" in data:
+        raise ValueError("일별 문서에 days 가 있습니다")
+    # 지원하지 않는 schema, 잘못된 항목 목록 등은 변환하면서 예외 발생
+    to_model(data)
+    return data
+
+
+def record_to_operation(record):
+    """가져오기 레코드를 (kind, 날짜, 저널 연산 목록) 으로 변환 (잘못된 레코드는 ValueError 등)"""
+    record_type = record.get("type")
+    if record_type == "week":
+        return "week", record["week_start"], [{"op": "put", "data": document_data("week", record["data"])}]
+    if record_type == "day":
+        return "day", record["date"], [{"op": "put", "data": document_data("day", record["data"])}]
+    if record_type == "week_task":
+        date_str = record["date"]
+        day = record.get("day") or DAYS[datetime.strptime(date_str, "%Y-%m-%d").weekday()]
+        slot = record["slot"]
+        if day not in DAYS or slot not in TIME_SLOTS:
+            raise ValueError(f"잘못된 요일/시간대입니다: {day}/{slot}")
+        if not record.get("task"):
+            raise ValueError("task 가 비어 있습니다")
+        return "week", date_str, [{"op": "week_add", "day": day, "slot": slot, "task": record["task"]}]
+    if record_type == "day_item":
+        if not record.get("item"):
+            raise ValueError("item 이 비어 있습니다")
+        operations = [{"op": "day_add", "item": record["item"]}]
+        if record.get("completed"):
+            operations.append({"op": "day_complete", "item": record["item"]})
+        return "day", record["date"], operations
+    if record_type == "day_notes":
+        return "day", record["date"], [{"op": "day_notes", "notes": record.get("notes", "")}]
+    raise ValueError(f"알 수 없는 레코드 종류입니다: {record_type}")
+
+
+def import_ndjson(manager, lines, chunk_size=IMPORT_CHUNK_SIZE):
+    """NDJSON 줄들을 가져와 문서별로 묶어 적용
+
+    chunk_size 개씩 읽어 문서 단위로 묶기 때문에 메모리 사용량이 제한되며,
+    한 묶음 안에서 같은 문서는 한 번만 읽고 한 번만 저장됩니다.
+    """
+    stats = {"records": 0, "documents": 0, "errors": []}
+    groups = {}
+    pending = 0
+
+    def flush():
+        for (kind, date_str), operations in groups.items():
+            try:
+                manager.apply_operations(kind, date_str, operations)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                # 저장 한도를 넘거나 적용할 수 없는 문서만 건너뛰고 나머지는 계속 가져옴
+                stats["errors"].append(f"{date_str} {'주간' if kind == 'week' else '일별'} 문서: {e}")
+                continue
+            stats["documents"] += 1
+        groups.clear()
+
+    for line_no, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if isinstance(record, dict) and record.get("type") == "recurrence":
+                # 반복 규칙은 문서와 따로 저장되므로 바로 반영
+                rule = record["rule"]
+                manager.add_recurrence(
+                    rule["text"], rule["target"], rule["start"], rule.get("freq", "weekly"),
+                    rule.get("interval", 1), rule.get("weekdays"), rule.get("slot"), rule.get("until"),
+                    rule.get("id"), rule.get("exceptions")
+                )
+                stats["records"] += 1
+                continue
+            kind, date_str, operations = record_to_operation(record)
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            stats["errors"].append(f"{line_no}번째 줄: {e}")
+            continue
+        if kind == "week":
+            # 같은 주의 레코드는 월요일 기준으로 묶음
+            date_str = manager.get_week_start(date_str)
+        groups.setdefault((kind, date_str), []).extend(operations)
+        stats["records"] += 1
+        pending += 1
+        if pending >= chunk_size:
+            flush()
+            pending = 0
+    flush()
+    return stats
+
+
+def format_import_stats(stats):
+    """가져오기 결과 요약 문자열"""
+    text = f"📥 {stats['records']}개 레코드를 {stats['documents']}개 문서에 반영했습니다."
+    if stats["errors"]:
+        text += f"\n⚠️ 건너뛴 줄 {len(stats['errors'])}개:\n" + "\n".join(stats["errors"][:20])
+    return text
+
+
+if __name__ == "__main__":
+    from manager import ScheduleManager
+    from storage import create_backend
+    from tenants import tenant_dir
+
+    parser = argparse.ArgumentParser(description="일정 데이터 NDJSON 내보내기/가져오기")
+    parser.add_argument("--data", default="schedule_data", help="데이터 디렉토리")
+    parser.add_argument("--backend", default=os.environ.get("SCHEDULE_BACKEND", "json"), help="저장소 종류 (json/sqlite)")
+    parser.add_argument("--user", help="사용자별 데이터 분리 모드에서 이 사용자의 데이터 사용")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="모든 문서를 NDJSON 으로 내보내기")
+    export_parser.add_argument("--out", default="-", help="출력 파일 (기본: 표준 출력)")
+    import_parser = commands.add_parser("import", help="NDJSON 파일 가져오기")
+    import_parser.add_argument("--in", dest="input", required=True, help="가져올 NDJSON 파일")
+    args = parser.parse_args()
+
+    data_dir = tenant_dir(args.data, args.user) if args.user else args.data
+    manager = ScheduleManager(data_dir, backend=create_backend(args.backend, data_dir), compact_interval=0)
+    try:
+        if args.command == "export":
+            if args.out == "-":
+                count = export_ndjson(manager, sys.stdout)
+            else:
+                with open(args.out, 'w', encoding='utf-8') as f:
+                    count = export_ndjson(manager, f)
+                print(f"📤 {count}개 문서를 내보냈습니다: {args.out}")
+        else:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                print(format_import_stats(import_ndjson(manager, f)))
+    finally:
+        manager.close()
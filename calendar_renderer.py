@@ -0,0 +1,112 @@
+import html
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from metrics import registry
+from storage import DAYS, TIME_SLOTS
+
+CALENDAR_CSS = """
+<style>
+.sch-cal { width: 100%; margin: 20px auto; }
+.sch-cal table { width: 100%; border-collapse: collapse; font-family: Arial, sans-serif; }
+.sch-cal th, .sch-cal td { border: 1px solid #ddd; }
+.sch-cal thead tr { background-color: #f5f5f5; }
+.sch-cal th { padding: 10px; text-align: center; font-weight: bold; }
+.sch-cal th.day { background-color: #e8f4f8; }
+.sch-cal td.slot { padding: 10px; text-align: center; font-weight: bold; background-color: #f0f8ff; }
+.sch-cal td.cell { padding: 8px; vertical-align: top; min-height: 60px; }
+.sch-cal .task { background-color: #e6f3ff; margin: 2px; padding: 4px; border-radius: 3px; font-size: 12px; }
+.sch-cal .task.recurring { background-color: #eef7e6; border-left: 3px solid #8bc34a; }
+.sch-cal .task.done { color: #888; text-decoration: line-through; }
+</style>
+"""
+
+
+class WeeklyCalendarRenderer:
+    """주간 달력 HTML 렌더러
+
+    표 골격과 CSS 는 한 번만 만들어 두고, 셀 내용만 join 으로 채웁니다.
+    결과는 (주 시작일, 문서 버전) 단위로 캐시되어 바뀌지 않은 주는 바로 반환됩니다.
+    반복 일정에서 전개된 항목은 🔁 와 별도 스타일로 표시됩니다.
+    """
+
+    def __init__(self, cache_size=128):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        header = "".join(f'<th class="day">{day}</th>' for day in DAYS)
+        self._head = f'{CALENDAR_CSS}<div class="sch-cal"><table><thead><tr><th></th>{header}</tr></thead><tbody>'
+        self._row_heads = {slot: f'<tr><td class="slot">{slot}</td>' for slot in TIME_SLOTS}
+        self._tail = "</tbody></table></div>"
+
+    def render_data(self, data):
+        """주간 문서를 HTML 로 변환 (캐시 없이)"""
+        parts = [self._head]
+        days = data["days"]
+        for slot in TIME_SLOTS:
+            parts.append(self._row_heads[slot])
+            for day in DAYS:
+                parts.append('<td class="cell">')
+                parts.extend(_task_html(task) for task in days.get(day, {}).get(slot, ()))
+                parts.append("</td>")
+            parts.append("</tr>")
+        parts.append(self._tail)
+        return "".join(parts)
+
+    def render(self, week_start, version, load_data):
+        """캐시된 HTML 반환, 없으면 load_data() 로 문서를 읽어 렌더링"""
+        key = (week_start, version)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+        self.misses += 1
+        data = load_data()
+        with registry.time("schedule_render_seconds", (("view", "weekly_calendar"),)):
+            rendered = self.render_data(data)
+        with self._lock:
+            self._cache[key] = rendered
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return rendered
+
+    def render_overview(self, week_sections, days):
+        """여러 주의 달력과 일별 체크리스트 요약을 하나의 HTML 로 합침
+
+        week_sections 는 (주 시작일, 달력 HTML) 목록, days 는 {날짜: 일별 문서} 입니다.
+        """
+        parts = []
+        day_dates = sorted(days)
+        for week_start, calendar_html in week_sections:
+            parts.append(f'<h4 style="margin: 16px 0 0;">📅 {week_start} 주</h4>')
+            parts.append(calendar_html)
+            week_days = [d for d in day_dates if week_start <= d < _next_week(week_start)]
+            if week_days:
+                parts.append('<ul style="margin: 0 0 8px; font-size: 13px;">')
+                for date_str in week_days:
+                    data = days[date_str]
+                    parts.append(
+                        f'<li>{date_str}: 🔲 {len(data["checklist"])}개 · ✅ {len(data["completed"])}개'
+                        f'{" · 📝 메모" if data.get("notes") else ""}</li>'
+                    )
+                parts.append("</ul>")
+        return "".join(parts)
+
+
+def _task_html(task):
+    """일정 하나의 HTML, 반복 일정은 🔁 (완료된 날짜는 ✅) 로 구분"""
+    if not getattr(task, "recurring", False):
+        return f'<div class="task">📝 {html.escape(str(task))}</div>'
+    if task.done:
+        return f'<div class="task recurring done" title="반복 일정 (완료)">✅ {html.escape(str(task))}</div>'
+    return f'<div class="task recurring" title="반복 일정">🔁 {html.escape(str(task))}</div>'
+
+
+def _next_week(week_start):
+    return (datetime.strptime(week_start, "%Y-%m-%d") + timedelta(days=7)).strftime("%Y-%m-%d")
@@ -0,0 +1,192 @@
+"""Gradio 없이 빠르게 실행되는 명령줄 도구
+
+저장소 계층(ScheduleManager)만 불러오므로 cron 등에서 바로 실행할 수 있습니다.
+
+    python cli.py add week tomorrow 월 오전 "주간 회의"
+    python cli.py add day 2025-06-06 "보고서 제출"
+    python cli.py remove week 2025-06-06 월 오전 "주간 회의"   (id 또는 텍스트)
+    python cli.py remove day 2025-06-06 "보고서 제출"
+    python cli.py complete today "보고서 제출"
+    python cli.py list day --period 2025-06
+    python cli.py show week today
+    python cli.py show day today --json
+    python cli.py --user alice show week today   (사용자별 데이터 분리 모드의 사용자 데이터)
+
+날짜는 YYYY-MM-DD 또는 today/tomorrow/yesterday (오늘/내일/어제) 를 사용할 수 있습니다.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+from manager import ScheduleManager
+from storage import DAYS, TIME_SLOTS, create_backend
+from tasks import to_plain
+from tenants import tenant_dir
+
+# 날짜 대신 쓸 수 있는 이름 -> 오늘 기준 일수
+RELATIVE_DATES = {
+    "today": 0, "오늘": 0,
+    "tomorrow": 1, "내일": 1,
+    "yesterday": -1, "어제": -1,
+}
+
+
+def parse_date(text):
+    """YYYY-MM-DD 또는 today/tomorrow/yesterday 를 날짜 문자열로 변환"""
+    offset = RELATIVE_DATES.get(text.strip().lower())
+    if offset is not None:
+        return (datetime.now() + timedelta(days=offset)).strftime("%Y-%m-%d")
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"날짜 형식이 올바르지 않습니다 (YYYY-MM-DD): {text}")
+
+
+def find_task(tasks, ref):
+    """id 또는 텍스트로 항목 찾기, 없으면 None"""
+    return tasks.get(ref) or tasks.find(ref)
+
+
+def added_task(tasks, text):
+    """방금 추가한 항목 (같은 텍스트가 여러 개면 마지막에 저장된 항목)"""
+    return [task for task in tasks if task.text == text and not task.recurring][-1]
+
+
+def format_week(data):
+    """주간 문서를 요일/시간대별 목록으로 표시 (항목 id 포함, 반복 일정은 🔁)"""
+    lines = [f"📅 {data['week_start']} 주간 일정"]
+    for day in DAYS:
+        slots = data["days"].get(day, {})
+        entries = [
+            f"  {slot}  • {'🔁 ' if task.recurring else ''}{task}  ({task.id})"
+            for slot in TIME_SLOTS
+            for task in slots.get(slot, ())
+        ]
+        if entries:
+            lines.append(f"[{day}]")
+            lines.extend(entries)
+    if len(lines) == 1:
+        lines.append("📌 저장된 일정이 없습니다.")
+    return "\n".join(lines)
+
+
+def format_day(data):
+    """일별 문서를 항목 id 와 함께 표시"""
+    lines = [f"📋 {data['date']} 체크리스트", "🔲 진행중:"]
+    lines += [f"  • {'🔁 ' if item.recurring else ''}{item}  ({item.id})" for item in data["checklist"]]
+    lines.append("✅ 완료됨:")
+    lines += [f"  • {'🔁 ' if item.recurring else ''}{item}  ({item.id})" for item in data["completed"]]
+    if data["notes"]:
+        lines += ["📝 메모:", data["notes"]]
+    return "\n".join(lines)
+
+
+def run(manager, args):
+    """명령 하나를 실행하고 (출력 문자열, 종료 코드) 반환"""
+    if args.command == "add":
+        if not args.text.strip():
+            return "❌ 추가할 내용을 입력해주세요.", 1
+        if args.kind == "week":
+            data = manager.add_week_task(args.date, args.day, args.slot, args.text)
+            task = added_task(data["days"][args.day][args.slot], args.text)
+            return f"✅ {data['week_start']} 주 {args.day} {args.slot}: {args.text} ({task.id})", 0
+        data = manager.add_day_checklist(args.date, args.text)
+        return f"✅ {args.date}: {args.text} ({added_task(data['checklist'], args.text).id})", 0
+    if args.command == "remove":
+        if args.kind == "week":
+            data = manager.load_week_data(args.date)
+            task = find_task(data["days"][args.day][args.slot], args.ref)
+            if task is None:
+                return f"❌ {args.day} {args.slot} 에 '{args.ref}' 일정이 없습니다.", 1
+            manager.remove_week_task(args.date, args.day, args.slot, task.id)
+            return f"🗑️ {args.date} {args.day} {args.slot}: {task}", 0
+        data = manager.load_day_data(args.date)
+        task = find_task(data["checklist"], args.ref) or find_task(data["completed"], args.ref)
+        if task is None:
+            return f"❌ {args.date} 에 '{args.ref}' 항목이 없습니다.", 1
+        manager.remove_day_checklist(args.date, task.id)
+        return f"🗑️ {args.date}: {task}", 0
+    if args.command == "complete":
+        data = manager.load_day_data(args.date)
+        task = find_task(data["checklist"], args.ref)
+        if task is None:
+            return f"❌ {args.date} 체크리스트에 '{args.ref}' 항목이 없습니다.", 1
+        manager.complete_day_checklist(args.date, task.id)
+        return f"✅ {args.date}: {task} 완료", 0
+    if args.command == "list":
+        dates, total = manager.query_dates(args.kind, args.period, 0, args.limit, latest_first=True)
+        if not dates:
+            return "📌 저장된 데이터가 없습니다.", 0
+        return "\n".join([f"총 {total}개 중 {len(dates)}개 (최신순)"] + dates), 0
+    if args.kind == "week":
+        data = manager.load_week_data(args.date)
+        return (json.dumps(to_plain(data), ensure_ascii=False, indent=2) if args.json else format_week(data)), 0
+    data = manager.load_day_data(args.date)
+    return (json.dumps(to_plain(data), ensure_ascii=False, indent=2) if args.json else format_day(data)), 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="일정관리 명령줄 도구 (웹 UI 없이 실행)")
+    parser.add_argument("--data", default="schedule_data", help="데이터 디렉토리")
+    parser.add_argument("--backend", default=os.environ.get("SCHEDULE_BACKEND", "json"), help="저장소 종류 (json/sqlite)")
+    parser.add_argument("--user", help="사용자별 데이터 분리 모드에서 이 사용자의 데이터 사용")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="주간 일정 / 일별 체크리스트 항목 추가")
+    add_kinds = add_parser.add_subparsers(dest="kind", required=True)
+    add_week = add_kinds.add_parser("week", help="주간 일정 추가")
+    add_week.add_argument("date", type=parse_date)
+    add_week.add_argument("day", choices=DAYS)
+    add_week.add_argument("slot", choices=TIME_SLOTS)
+    add_week.add_argument("text")
+    add_day = add_kinds.add_parser("day", help="체크리스트 항목 추가")
+    add_day.add_argument("date", type=parse_date)
+    add_day.add_argument("text")
+
+    remove_parser = commands.add_parser("remove", help="항목 삭제 (id 또는 텍스트)")
+    remove_kinds = remove_parser.add_subparsers(dest="kind", required=True)
+    remove_week = remove_kinds.add_parser("week", help="주간 일정 삭제")
+    remove_week.add_argument("date", type=parse_date)
+    remove_week.add_argument("day", choices=DAYS)
+    remove_week.add_argument("slot", choices=TIME_SLOTS)
+    remove_week.add_argument("ref", help="항목 id 또는 텍스트")
+    remove_day = remove_kinds.add_parser("day", help="체크리스트 항목 삭제")
+    remove_day.add_argument("date", type=parse_date)
+    remove_day.add_argument("ref", help="항목 id 또는 텍스트")
+
+    complete_parser = commands.add_parser("complete", help="체크리스트 항목 완료 (id 또는 텍스트)")
+    complete_parser.add_argument("date", type=parse_date)
+    complete_parser.add_argument("ref", help="항목 id 또는 텍스트")
+
+    list_parser = commands.add_parser("list", help="저장된 날짜 목록")
+    list_parser.add_argument("kind", choices=["week", "day"])
+    list_parser.add_argument("--period", default="", help="기간 (예: 2025, 2025-06, 2025-Q2)")
+    list_parser.add_argument("--limit", type=int, default=50, help="최대 표시 개수")
+
+    show_parser = commands.add_parser("show", help="주간 일정 / 일별 체크리스트 보기")
+    show_parser.add_argument("kind", choices=["week", "day"])
+    show_parser.add_argument("date", type=parse_date)
+    show_parser.add_argument("--json", action="store_true", help="저장 형식 JSON 으로 출력")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    data_dir = tenant_dir(args.data, args.user) if args.user else args.data
+    # 검색 색인/통계는 쓰지 않으므로 읽지 않고 변경만 각 색인의 로그에 추가
+    manager = ScheduleManager(data_dir, backend=create_backend(args.backend, data_dir), compact_interval=0,
+                              load_indexes=False)
+    try:
+        output, code = run(manager, args)
+    except ValueError as e:
+        output, code = f"❌ {e}", 1
+    finally:
+        manager.close()
+    print(output, file=sys.stderr if code else sys.stdout)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
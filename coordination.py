@@ -0,0 +1,255 @@
+"""여러 프로세스가 같은 schedule_data 를 함께 쓸 때의 잠금과 변경 알림
+
+- 파일 잠금: 문서 키를 고정된 개수의 잠금 파일(locks/NN.lock)에 나눠 대응시키고
+  변경하는 동안 advisory 잠금(fcntl.flock, Windows 는 msvcrt.locking)을 잡습니다.
+- 변경 알림 로그 (changes.log): 문서를 저장한 프로세스가 (kind, key) 를 한 줄씩 추가하고,
+  다른 프로세스는 조회/변경 직전에 새로 추가된 줄만 읽어 메모리 캐시를 무효화합니다.
+  로그가 커지면 changes.log.1 로 한 세대만 남기고 교체하며, 각 파일의 첫 줄에 세대 번호를 기록합니다.
+
+잠금과 알림 모두 파일만 사용하므로 한 서버의 여러 워커는 물론, POSIX 잠금을 지원하는
+공유 파일시스템(NFSv4 등)을 마운트한 여러 서버에서도 동작합니다.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CHANGES_FILE = "changes.log"
+# 변경 알림 로그를 교체하는 크기
+MAX_FEED_BYTES = 8 * 1024 * 1024
+
+
+def temp_path(path):
+    """여러 프로세스/서버가 같은 파일을 저장할 때 겹치지 않는 임시 파일 경로"""
+    return f"{path}.{socket.gethostname()}-{os.getpid()}.tmp"
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """path 잠금 파일에 대한 프로세스 간 advisory 잠금 (Windows 는 항상 배타 잠금)"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.001)
+        yield
+    finally:
+        if fcntl is None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        # POSIX 에서는 닫으면 잠금도 풀림
+        os.close(fd)
+
+
+class LockStripes:
+    """문서 키를 stripes 개의 잠금 파일에 나눠 대응시키는 프로세스 간 잠금
+
+    문서마다 잠금 파일을 만들지 않으므로 파일 수가 늘지 않으며, 같은 파일을 쓰는
+    다른 문서끼리만 서로 기다립니다. 한 스레드가 둘 이상의 문서 잠금을 동시에 잡으면 안 됩니다.
+    """
+
+    def __init__(self, folder, stripes=64):
+        self.folder = folder
+        self.stripes = stripes
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, key):
+        stripe = zlib.crc32("\x1f".join(key).encode('utf-8')) % self.stripes
+        return os.path.join(self.folder, f"{stripe:02d}.lock")
+
+    def lock(self, key):
+        return file_lock(self.path(key))
+
+
+def _read_records(f, offset):
+    """offset 부터 끝까지의 완성된 레코드 목록과 다음 offset (기록 중인 마지막 줄은 남겨 둠)"""
+    f.seek(offset)
+    raw = f.read()
+    end = raw.rfind(b"\n")
+    if end < 0:
+        return [], offset
+    records = []
+    for line in raw[:end].split(b"\n"):
+        try:
+            records.append(json.loads(line.decode('utf-8')))
+        except ValueError:
+            # 다른 프로세스의 기록은 계속 이어지므로 깨진 줄만 건너뜀
+            continue
+    return records, offset + end + 1
+
+
+def _read_header(f):
+    """파일 첫 줄의 세대 번호와 그 다음 offset"""
+    f.seek(0)
+    line = f.readline()
+    return json.loads(line.decode('utf-8'))["generation"], len(line)
+
+
+class ChangeFeed:
+    """여러 프로세스가 함께 쓰는 문서 변경 알림 로그
+
+    publish() 로 변경을 알리고 poll() 로 다른 프로세스의 새 알림을 읽습니다.
+    poll() 은 마지막으로 읽은 위치 이후만 읽으므로 새 알림이 없으면 파일 크기 확인 정도로 끝납니다.
+    """
+
+    def __init__(self, path, max_bytes=MAX_FEED_BYTES):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.max_bytes = max_bytes
+        # 자기 알림을 구분하기 위한 프로세스 식별자
+        self.origin = uuid.uuid4().hex[:12]
+        self.generation = None
+        self._offset = 0
+        self._file = None
+        self._lock = threading.Lock()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with file_lock(self.lock_path):
+            if not os.path.exists(path):
+                self._create(self._previous_generation() + 1)
+        with self._lock:
+            self._open_current()
+            # 지금까지의 변경은 저장소에 이미 반영되어 있으므로 끝부터 읽음
+            self._file.seek(0, os.SEEK_END)
+            self._offset = self._file.tell()
+
+    @property
+    def position(self):
+        """지금까지 읽은 위치 (세대, offset), 색인 스냅샷의 cursor 로 사용"""
+        with self._lock:
+            return [self.generation, self._offset]
+
+    def publish(self, kind, key):
+        """문서 변경 알림 추가 (문서 잠금을 잡은 채로 호출)"""
+        line = (json.dumps({"origin": self.origin, "kind": kind, "key": key}, ensure_ascii=False) + "\n").encode('utf-8')
+        # O_APPEND 로 한 번에 쓰므로 여러 프로세스의 줄이 섞이지 않음, 교체 중에는 공유 잠금으로 기다림
+        with file_lock(self.lock_path, shared=True):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, line)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        if self.max_bytes and size > self.max_bytes:
+            self._rotate()
+
+    def poll(self):
+        """다른 프로세스의 새 알림 [(kind, key)] 과 빠짐없이 읽었는지 여부
+
+        읽지 않은 사이에 로그가 두 번 이상 교체되어 알림 일부를 놓쳤으면 False 이며,
+        이때 호출자는 메모리 상태 전체를 다시 읽어야 합니다.
+        """
+        with self._lock:
+            if self._file is None:
+                # close() 뒤에는 읽지 않음
+                return [], True
+            records, self._offset = _read_records(self._file, self._offset)
+            complete = True
+            try:
+                current = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                # 교체 도중이면 다음 poll 에서 이어서 읽음
+                current = None
+            if current is not None and current != os.fstat(self._file.fileno()).st_ino:
+                # 교체된 이전 파일은 더 이상 바뀌지 않으므로 남은 부분을 마저 읽고 새 파일로 넘어감
+                rest, _ = _read_records(self._file, self._offset)
+                records += rest
+                previous = self.generation
+                self._file.close()
+                self._open_current()
+                complete = self.generation == previous + 1
+                rest, self._offset = _read_records(self._file, self._offset)
+                records += rest
+        changes = [(r["kind"], r["key"]) for r in records if r.get("origin") != self.origin]
+        return changes, complete
+
+    def read_since(self, cursor):
+        """cursor (세대, offset) 이후의 모든 알림 [(kind, key)] 과 빠짐없이 읽었는지 여부
+
+        시작할 때 색인 스냅샷 이후의 변경을 찾는 데 쓰며, cursor 가 None 이면 첫 세대의 처음부터 읽습니다.
+        """
+        with file_lock(self.lock_path, shared=True):
+            with open(self.path, 'rb') as f:
+                generation, header_end = _read_header(f)
+                if cursor is None:
+                    cursor = [1, 0]
+                if cursor[0] == generation:
+                    records, _ = _read_records(f, max(cursor[1], header_end))
+                    return [(r["kind"], r["key"]) for r in records], True
+                if cursor[0] != generation - 1:
+                    return [], False
+                records, _ = _read_records(f, header_end)
+            try:
+                with open(self.path + ".1", 'rb') as f:
+                    previous, header_end = _read_header(f)
+                    if previous != cursor[0]:
+                        return [], False
+                    older, _ = _read_records(f, max(cursor[1], header_end))
+            except FileNotFoundError:
+                return [], False
+        return [(r["kind"], r["key"]) for r in older + records], True
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open_current(self):
+        # self._lock 을 잡은 상태에서 호출, 교체 중이라 파일이 잠시 없으면 기다림
+        while True:
+            try:
+                self._file = open(self.path, 'rb')
+                break
+            except FileNotFoundError:
+                time.sleep(0.001)
+        self.generation, self._offset = _read_header(self._file)
+
+    def _previous_generation(self):
+        try:
+            with open(self.path + ".1", 'rb') as f:
+                return _read_header(f)[0]
+        except (FileNotFoundError, ValueError, KeyError):
+            return 0
+
+    def _create(self, generation, path=None):
+        with open(path or self.path, 'wb') as f:
+            f.write((json.dumps({"generation": generation}) + "\n").encode('utf-8'))
+
+    def _rotate(self):
+        """로그를 changes.log.1 로 옮기고 다음 세대 로그 시작"""
+        with file_lock(self.lock_path):
+            tmp_path = temp_path(self.path)
+            try:
+                with open(self.path, 'rb') as f:
+                    generation, _ = _read_header(f)
+                    f.seek(0, os.SEEK_END)
+                    if f.tell() <= self.max_bytes:
+                        # 다른 프로세스가 이미 교체함
+                        return
+                self._create(generation + 1, tmp_path)
+                os.replace(self.path, self.path + ".1")
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                # Windows 에서는 다른 프로세스가 열어 둔 파일을 교체할 수 없으므로 이 프로세스는 교체를 멈춤
+                print(f"⚠️ 변경 알림 로그 교체 실패: {e}")
+                self.max_bytes = 0
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
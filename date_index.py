@@ -0,0 +1,200 @@
+import bisect
+import calendar
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+
+from coordination import temp_path
+
+INDEX_VERSION = 1
+
+
+def parse_period(text):
+    """기간 문자열을 (시작일, 종료일) 로 변환
+
+    지원 형식: '2025', '2025-06', '2025-Q2', '2025-06-01~2025-06-30'.
+    빈 문자열이면 (None, None) 으로 전체 기간을 의미합니다.
+    """
+    text = (text or "").strip()
+    if not text:
+        return None, None
+    if "~" in text:
+        start, end = (part.strip() for part in text.split("~", 1))
+        return start or None, end or None
+    match = re.fullmatch(r"(\d{4})-[Qq]([1-4])", text)
+    if match:
+        year, quarter = int(match.group(1)), int(match.group(2))
+        first_month = (quarter - 1) * 3 + 1
+        last_month = first_month + 2
+        last_day = calendar.monthrange(year, last_month)[1]
+        return f"{year}-{first_month:02d}-01", f"{year}-{last_month:02d}-{last_day:02d}"
+    match = re.fullmatch(r"(\d{4})-(\d{2})", text)
+    if match:
+        year, month = int(match.group(1)), int(match.group(2))
+        last_day = calendar.monthrange(year, month)[1]
+        return f"{year}-{month:02d}-01", f"{year}-{month:02d}-{last_day:02d}"
+    if re.fullmatch(r"\d{4}", text):
+        return f"{text}-01-01", f"{text}-12-31"
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+        return text, text
+    raise ValueError(f"기간 형식을 해석할 수 없습니다: {text}")
+
+
+def span_period(date_str, span):
+    """기준 날짜가 속한 월/분기, 또는 해당 주부터 13주 기간을 (시작일, 종료일) 로 반환"""
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+    if span == "month":
+        return parse_period(date_str[:7])
+    if span == "quarter":
+        return parse_period(f"{date_obj.year}-Q{(date_obj.month - 1) // 3 + 1}")
+    if span == "13weeks":
+        monday = date_obj - timedelta(days=date_obj.weekday())
+        end = monday + timedelta(weeks=13, days=-1)
+        return monday.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    raise ValueError(f"알 수 없는 기간 단위입니다: {span}")
+
+
+class DateIndex:
+    """저장된 주간/일별 날짜를 정렬된 상태로 유지하는 영속 인덱스
+
+    저장 경로에서 새 문서가 생길 때만 갱신되며, 파일이 없거나 저장소의
+    signature 가 달라졌을 때만 전체를 다시 만듭니다. 새 날짜는 로그 파일에
+    한 줄씩 추가하고, 압축/종료 때 set_signature() 에서 스냅샷으로 합칩니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.log_path = os.path.splitext(path)[0] + ".log"
+        self.signature = None
+        self._dates = {"week": [], "day": []}
+        self._members = {"week": set(), "day": set()}
+        # 스냅샷에 아직 합치지 않은 로그 줄 수
+        self._logged = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """인덱스 파일을 읽음, 없거나 형식이 맞지 않으면 False"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if raw.get("version") != INDEX_VERSION:
+            return False
+        added = self._read_log()
+        with self._lock:
+            for kind in ("week", "day"):
+                members = set(raw.get(kind, [])) | added[kind]
+                self._dates[kind] = sorted(members)
+                self._members[kind] = members
+            self.signature = raw.get("signature")
+            self._logged = sum(len(names) for names in added.values())
+        return True
+
+    def rebuild(self, week_dates, day_dates, signature):
+        """저장소 목록으로 인덱스 전체를 다시 만듦"""
+        with self._lock:
+            for kind, dates in (("week", week_dates), ("day", day_dates)):
+                dates = sorted(set(dates))
+                self._dates[kind] = dates
+                self._members[kind] = set(dates)
+            self.signature = signature
+            self._save()
+
+    def add(self, kind, name):
+        """새 날짜를 추가, 이미 있으면 아무 것도 하지 않음"""
+        if name in self._members[kind]:
+            return False
+        with self._lock:
+            if name in self._members[kind]:
+                return False
+            bisect.insort(self._dates[kind], name)
+            self._members[kind].add(name)
+            self._append_log(kind, name)
+        return True
+
+    def set_signature(self, signature):
+        """저장소 signature 가 바뀌었거나 로그에 추가된 날짜가 있으면 스냅샷을 다시 씀"""
+        with self._lock:
+            if signature != self.signature or self._logged:
+                self.signature = signature
+                self._save()
+
+    def all(self, kind):
+        with self._lock:
+            return list(self._dates[kind])
+
+    def contains(self, kind, name):
+        return name in self._members[kind]
+
+    def count(self):
+        """저장된 주간/일별 문서 수의 합"""
+        with self._lock:
+            return len(self._dates["week"]) + len(self._dates["day"])
+
+    def query(self, kind, start=None, end=None, offset=0, limit=None, latest_first=False):
+        """기간/페이지 조건에 맞는 날짜 목록과 전체 개수 반환"""
+        with self._lock:
+            dates = self._dates[kind]
+            lo = bisect.bisect_left(dates, start) if start else 0
+            hi = bisect.bisect_right(dates, end) if end else len(dates)
+            total = max(hi - lo, 0)
+            if latest_first:
+                stop = hi - offset
+                begin = lo if limit is None else max(lo, stop - limit)
+                items = dates[begin:max(stop, lo)][::-1]
+            else:
+                begin = lo + offset
+                stop = hi if limit is None else min(hi, begin + limit)
+                items = dates[begin:stop]
+        return items, total
+
+    def _save(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = temp_path(self.path)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "signature": self.signature,
+                "week": self._dates["week"],
+                "day": self._dates["day"]
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        # 스냅샷에 모두 들어갔으므로 로그 비우기 (그 전에 중단되어도 다시 읽으면 같은 결과)
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self._logged = 0
+
+    def _append_log(self, kind, name):
+        folder = os.path.dirname(self.log_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps([kind, name], ensure_ascii=False) + "\n")
+        self._logged += 1
+
+    def _read_log(self):
+        """로그에 기록된 {kind: {날짜}}, 기록 도중 중단된 마지막 줄은 버리고 파일도 잘라냄"""
+        added = {"week": set(), "day": set()}
+        try:
+            with open(self.log_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return added
+        end = raw.rfind(b"\n") + 1
+        for line in raw[:end].splitlines():
+            try:
+                kind, name = json.loads(line.decode('utf-8'))
+            except (ValueError, TypeError):
+                continue
+            if kind in added:
+                added[kind].add(name)
+        if end < len(raw):
+            # 다음 줄이 중단된 줄에 이어 붙지 않도록 마지막 정상 줄 위치로 자름
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(end)
+        return added
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+
+from metrics import registry
+from tasks import DAY_LISTS, Task, derived_task_id, to_model
+
+
+def apply_operation(data, record, changes=None):
+    """저널 레코드 하나를 문서에 적용
+
+    모든 연산은 같은 레코드를 여러 번 적용해도 결과가 같도록 작성되어 있어,
+    압축 도중 중단되어 스냅샷과 저널에 같은 변경이 남아 있어도 안전하게 재생됩니다.
+    항목은 "id" 로 찾고, id 가 없는 레코드(NDJSON 가져오기 등)는 예전처럼 텍스트로 찾습니다.
+
+    changes 목록을 넘기면 실제로 바뀐 항목마다 (위치, 이전 텍스트, 새 텍스트) 를 추가합니다.
+    위치는 주간 "요일/시간대", 일별 "checklist"/"completed"/"notes" 이며 추가는 이전 텍스트가,
+    삭제는 새 텍스트가 None 입니다. put 은 문서 전체가 바뀌므로 기록하지 않습니다.
+    """
+    if changes is None:
+        changes = []
+    op = record["op"]
+    if op == "put":
+        data.clear()
+        data.update(to_model(record["data"]))
+    elif op == "week_add":
+        location = f"{record['day']}/{record['slot']}"
+        tasks = data["days"][record["day"]][record["slot"]]
+        if _add(tasks, record, "task", data["week_start"], record["day"], record["slot"]):
+            changes.append((location, None, record["task"]))
+    elif op == "week_remove":
+        tasks = data["days"][record["day"]][record["slot"]]
+        task = _find(tasks, record, "task")
+        if task is not None:
+            tasks.remove(task.id)
+            changes.append((f"{record['day']}/{record['slot']}", task.text, None))
+    elif op == "week_rename":
+        _rename(data["days"][record["day"]][record["slot"]], record, f"{record['day']}/{record['slot']}", changes)
+    elif op == "day_add":
+        if _add(data["checklist"], record, "item", data["date"], "checklist"):
+            changes.append(("checklist", None, record["item"]))
+    elif op == "day_complete":
+        task = _find(data["checklist"], record, "item")
+        if task is not None:
+            data["checklist"].remove(task.id)
+            changes.append(("checklist", task.text, None))
+            if data["completed"].add(task):
+                changes.append(("completed", None, task.text))
+        elif record.get("item") and _find(data["completed"], record, "item") is None:
+            # 체크리스트에 없던 항목은 바로 완료 목록에 추가
+            if _add(data["completed"], record, "item", data["date"], "completed"):
+                changes.append(("completed", None, record["item"]))
+    elif op == "day_remove":
+        for field in DAY_LISTS:
+            task = _find(data[field], record, "item")
+            if task is not None:
+                data[field].remove(task.id)
+                changes.append((field, task.text, None))
+                break
+    elif op == "day_rename":
+        for field in DAY_LISTS:
+            _rename(data[field], record, field, changes)
+    elif op == "day_notes":
+        if data["notes"] != record["notes"]:
+            changes.append(("notes", data["notes"], record["notes"]))
+        data["notes"] = record["notes"]
+    else:
+        raise ValueError(f"알 수 없는 저널 연산입니다: {op}")
+    return data
+
+
+def _find(tasks, record, text_field):
+    if record.get("id"):
+        return tasks.get(record["id"])
+    return tasks.find(record[text_field])
+
+
+def _add(tasks, record, text_field, *id_parts):
+    # 추가했으면 True
+    text = record[text_field]
+    if record.get("id"):
+        return tasks.add(Task(record["id"], text))
+    if text not in tasks:
+        return tasks.add(Task(tasks.unique_id(derived_task_id(*id_parts, text, "0")), text))
+    return False
+
+
+def _rename(tasks, record, location, changes):
+    task = tasks.get(record["id"])
+    if task is not None and task.text != record["text"]:
+        tasks.rename(record["id"], record["text"])
+        changes.append((location, task.text, record["text"]))
+
+
+def read_log(path):
+    """NDJSON 로그 파일의 레코드 목록 (파일이 없으면 빈 목록)
+
+    기록 도중 중단된 마지막 줄은 버리고 파일도 그 앞에서 잘라냅니다.
+    그대로 두면 다음에 추가한 줄이 중단된 줄에 이어 붙어 함께 읽을 수 없게 됩니다.
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return []
+    end = raw.rfind(b"\n") + 1
+    records = []
+    for line in raw[:end].splitlines():
+        try:
+            records.append(json.loads(line.decode('utf-8')))
+        except ValueError:
+            continue
+    if end < len(raw):
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+    return records
+
+
+class OperationJournal:
+    """문서 변경을 한 줄에 하나씩 추가 기록하는 append-only 저널 (NDJSON)"""
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.seq = 0
+        self.count = 0
+        self._lock = threading.Lock()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._file = open(path, 'ab')
+
+    def replay(self):
+        """저널의 레코드 목록 반환
+
+        개행으로 끝나지 않거나 해석할 수 없는 마지막 레코드는 기록 도중 중단된
+        것으로 보고 버리며, 파일도 마지막 정상 레코드 위치로 잘라냅니다.
+        """
+        with self._lock:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            records = []
+            good_offset = 0
+            offset = 0
+            while offset < len(raw):
+                end = raw.find(b"\n", offset)
+                if end < 0:
+                    break
+                line = raw[offset:end]
+                if line.strip():
+                    try:
+                        records.append(json.loads(line.decode('utf-8')))
+                    except ValueError:
+                        break
+                offset = end + 1
+                good_offset = offset
+            if good_offset < len(raw):
+                self._file.truncate(good_offset)
+            self.count = len(records)
+            if records:
+                self.seq = max(self.seq, records[-1].get("seq", 0))
+            return records
+
+    def append(self, record):
+        """레코드를 저널 끝에 추가하고 순번 반환"""
+        with self._lock:
+            self.seq += 1
+            record["seq"] = self.seq
+            line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+            with registry.time("schedule_storage_seconds", (("backend", "journal"), ("stage", "write"))):
+                self._file.write(line)
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            registry.inc("schedule_storage_bytes_written_total", (("backend", "journal"),), len(line))
+            self.count += 1
+            return self.seq
+
+    def rewrite(self, records):
+        """스냅샷 압축이 끝난 뒤 남은 레코드만으로 저널을 원자적으로 교체"""
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                for record in records:
+                    f.write((json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8'))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'ab')
+            self.count = len(records)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -1,212 +1,238 @@
-import gradio as gr
-import json
+import atexit
 import os
-from datetime import datetime, timedelta
+import tempfile
+import threading
+from datetime import datetime
 import calendar
 
-class ScheduleManager:
-    def __init__(self):
-        self.base_dir = "schedule_data"
-        self.week_dir = os.path.join(self.base_dir, "week")
-        self.day_dir = os.path.join(self.base_dir, "day")
-        self.setup_directories()
-    
-    def setup_directories(self):
-        """필요한 디렉토리들을 생성"""
-        os.makedirs(self.week_dir, exist_ok=True)
-        os.makedirs(self.day_dir, exist_ok=True)
-    
-    def get_week_filename(self, date_str):
-        """주차별 파일명 생성 (월요일 기준)"""
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        # 해당 주의 월요일을 찾기
-        monday = date_obj - timedelta(days=date_obj.weekday())
-        return f"{monday.strftime('%Y-%m-%d')}_week.json"
-    
-    def get_day_filename(self, date_str):
-        """일별 파일명 생성"""
-        return f"{date_str}.json"
-    
-    def load_week_data(self, date_str):
-        """주간 투두리스트 로드"""
-        filename = self.get_week_filename(date_str)
-        filepath = os.path.join(self.week_dir, filename)
-        
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            # 기본 주간 구조 생성 (요일별 구조)
-            return {
-                "week_start": date_str,
-                "days": {
-                    "월": {"오전": [], "오후": [], "저녁": []},
-                    "화": {"오전": [], "오후": [], "저녁": []},
-                    "수": {"오전": [], "오후": [], "저녁": []},
-                    "목": {"오전": [], "오후": [], "저녁": []},
-                    "금": {"오전": [], "오후": [], "저녁": []},
-                    "토": {"오전": [], "오후": [], "저녁": []},
-                    "일": {"오전": [], "오후": [], "저녁": []}
-                }
-            }
-    
-    def save_week_data(self, date_str, data):
-        """주간 투두리스트 저장"""
-        filename = self.get_week_filename(date_str)
-        filepath = os.path.join(self.week_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    def load_day_data(self, date_str):
-        """일별 체크리스트 로드"""
-        # 날짜별 폴더 생성
-        date_folder = os.path.join(self.day_dir, date_str)
-        os.makedirs(date_folder, exist_ok=True)
-        
-        filename = self.get_day_filename(date_str)
-        filepath = os.path.join(date_folder, filename)
-        
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            return {
-                "date": date_str,
-                "checklist": [],
-                "completed": [],
-                "notes": ""
-            }
-    
-    def save_day_data(self, date_str, data):
-        """일별 체크리스트 저장"""
-        date_folder = os.path.join(self.day_dir, date_str)
-        os.makedirs(date_folder, exist_ok=True)
-        
-        filename = self.get_day_filename(date_str)
-        filepath = os.path.join(date_folder, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    def add_week_task(self, date_str, day, time_slot, task):
-        """주간 달력에 태스크 추가"""
-        data = self.load_week_data(date_str)
-        if task and task not in data["days"][day][time_slot]:
-            data["days"][day][time_slot].append(task)
-            self.save_week_data(date_str, data)
-        return data
-    
-    def remove_week_task(self, date_str, day, time_slot, task):
-        """주간 달력에서 태스크 제거"""
-        data = self.load_week_data(date_str)
-        if task in data["days"][day][time_slot]:
-            data["days"][day][time_slot].remove(task)
-            self.save_week_data(date_str, data)
-        return data
-    
-    def add_day_checklist(self, date_str, checklist_item):
-        """일별 체크리스트 항목 추가"""
-        data = self.load_day_data(date_str)
-        if checklist_item and checklist_item not in data["checklist"]:
-            data["checklist"].append(checklist_item)
-            self.save_day_data(date_str, data)
-        return self.format_day_display(data)
-    
-    def complete_day_checklist(self, date_str, checklist_item):
-        """일별 체크리스트 항목 완료"""
-        data = self.load_day_data(date_str)
-        if checklist_item in data["checklist"]:
-            data["checklist"].remove(checklist_item)
-            if checklist_item not in data["completed"]:
-                data["completed"].append(checklist_item)
-                self.save_day_data(date_str, data)
-        return self.format_day_display(data)
-    
-    def update_day_notes(self, date_str, notes):
-        """일별 노트 업데이트"""
-        data = self.load_day_data(date_str)
-        data["notes"] = notes
-        self.save_day_data(date_str, data)
-        return self.format_day_display(data)
-    
-    def format_day_display(self, data):
-        """일별 데이터 표시 형식"""
-        display = f"📋 {data['date']} 체크리스트\n\n"
-        display += "🔲 진행중:\n"
-        for item in data["checklist"]:
-            display += f"  • {item}\n"
-        
-        display += "\n✅ 완료됨:\n"
-        for completed in data["completed"]:
-            display += f"  • {completed}\n"
-        
-        if data["notes"]:
-            display += f"\n📝 메모:\n{data['notes']}\n"
-        
-        return display
+from bulk_io import export_ndjson, format_import_stats, import_ndjson
+from calendar_renderer import WeeklyCalendarRenderer
+from date_index import span_period
+from manager import QuotaExceededError, ScheduleManager, StorageQuota
+from metrics import create_metrics_router, registry, timed
+from search_index import DAY_FIELDS
+from storage import create_backend
+from tenants import TenantPool, current_manager
+
+# 스케줄 매니저 인스턴스, import 만으로 데이터 디렉토리를 만들지 않도록 처음 사용할 때 생성
+_schedule_manager = None
+_schedule_manager_lock = threading.Lock()
+
+# 사용자별 데이터 분리 모드, 로그인한 사용자마다 schedule_data/users/ 아래에 따로 저장 (SCHEDULE_MULTI_TENANT=1)
+MULTI_TENANT = os.environ.get("SCHEDULE_MULTI_TENANT") == "1"
+# 로그인 대신 사용자 이름을 전달하는 요청 헤더 (앞단 프록시가 인증한 경우에만 설정)
+USER_HEADER = os.environ.get("SCHEDULE_USER_HEADER")
+# 사용자별 매니저의 문서 캐시 크기, 열린 사용자 수만큼 쓰므로 공용 매니저보다 작게 둠
+TENANT_CACHE_SIZE = 64
+_tenant_pool = None
+
+def open_schedule_manager(base_dir, **options):
+    """환경 변수 설정으로 base_dir 의 스케줄 매니저 생성"""
+    return ScheduleManager(
+        base_dir,
+        backend=create_backend(os.environ.get("SCHEDULE_BACKEND", "json"), base_dir),
+        read_workers=int(os.environ.get("SCHEDULE_READ_WORKERS", "16")),
+        write_workers=int(os.environ.get("SCHEDULE_WRITE_WORKERS", "4")),
+        archive_after_days=int(os.environ["SCHEDULE_ARCHIVE_AFTER_DAYS"]) if os.environ.get("SCHEDULE_ARCHIVE_AFTER_DAYS") else None,
+        # 이 일수보다 오래된 반복 일정의 건너뛰기/완료 기록은 압축할 때 정리
+        recurrence_history_days=int(os.environ["SCHEDULE_RECURRENCE_HISTORY_DAYS"]) if os.environ.get("SCHEDULE_RECURRENCE_HISTORY_DAYS") else None,
+        # 여러 워커 프로세스가 같은 schedule_data 를 쓰는 경우 SCHEDULE_SHARED=1
+        shared=True if os.environ.get("SCHEDULE_SHARED") == "1" else None,
+        **options
+    )
+
+def get_tenant_pool():
+    """사용자별 매니저 풀 반환 (사용자별 데이터 분리 모드가 아니면 None)"""
+    global _tenant_pool
+    if not MULTI_TENANT:
+        return None
+    if _tenant_pool is None:
+        with _schedule_manager_lock:
+            if _tenant_pool is None:
+                quota = StorageQuota(
+                    max_documents=int(os.environ.get("SCHEDULE_QUOTA_DOCUMENTS", "0")),
+                    max_items=int(os.environ.get("SCHEDULE_QUOTA_ITEMS", "0")),
+                    max_notes_chars=int(os.environ.get("SCHEDULE_QUOTA_NOTES_CHARS", "0")),
+                    max_rules=int(os.environ.get("SCHEDULE_QUOTA_RULES", "0"))
+                )
+                pool = TenantPool(
+                    "schedule_data",
+                    lambda base_dir: open_schedule_manager(base_dir, cache_size=TENANT_CACHE_SIZE, quota=quota),
+                    max_active=int(os.environ.get("SCHEDULE_TENANT_MAX_ACTIVE", "32")),
+                    idle_seconds=float(os.environ.get("SCHEDULE_TENANT_IDLE_SECONDS", "600"))
+                )
+                pool.start_janitor(min(60.0, pool.idle_seconds))
+                # 종료 시 열려 있는 모든 사용자의 변경을 스냅샷으로 반영
+                atexit.register(pool.close)
+                _tenant_pool = pool
+    return _tenant_pool
+
+def get_schedule_manager():
+    """현재 요청의 스케줄 매니저 반환
     
-    def get_available_dates(self):
-        """저장된 날짜 목록 반환"""
-        week_files = []
-        day_files = []
-        
-        if os.path.exists(self.week_dir):
-            week_files = [f.replace('_week.json', '') for f in os.listdir(self.week_dir) if f.endswith('_week.json')]
-        
-        if os.path.exists(self.day_dir):
-            for date_folder in os.listdir(self.day_dir):
-                date_path = os.path.join(self.day_dir, date_folder)
-                if os.path.isdir(date_path):
-                    day_files.append(date_folder)
-        
-        return sorted(week_files), sorted(day_files)
+    사용자별 데이터 분리 모드에서는 요청한 사용자의 매니저를, 아니면 처음 호출할 때
+    환경 변수 설정으로 만든 공용 매니저를 반환합니다.
+    """
+    manager = current_manager.get()
+    if manager is not None:
+        return manager
+    if MULTI_TENANT:
+        raise RuntimeError("사용자별 데이터 분리 모드에서는 사용자 요청 안에서만 매니저를 사용할 수 있습니다")
+    global _schedule_manager
+    if _schedule_manager is None:
+        with _schedule_manager_lock:
+            if _schedule_manager is None:
+                manager = open_schedule_manager("schedule_data")
+                # 종료 시 저널에 남은 변경을 스냅샷으로 반영
+                atexit.register(manager.close)
+                _schedule_manager = manager
+    return _schedule_manager
+
+def request_user(request):
+    """Gradio 요청의 사용자 이름 (로그인 이름, 없으면 SCHEDULE_USER_HEADER 헤더), 알 수 없으면 None"""
+    user = getattr(request, "username", None)
+    if not user and USER_HEADER and request is not None:
+        user = request.headers.get(USER_HEADER)
+    return user or None
+
+def load_auth_file(path):
+    """사용자:비밀번호 줄로 된 파일을 Gradio launch(auth=...) 목록으로 읽음"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [
+            tuple(line.strip().split(":", 1))
+            for line in f
+            if ":" in line and not line.lstrip().startswith("#")
+        ]
 
-# 스케줄 매니저 인스턴스 생성
-schedule_manager = ScheduleManager()
+def collect_cache_metrics():
+    """문서 캐시와 달력 렌더 캐시 적중 수를 /metrics 에 노출 (사용자별 매니저는 열린 매니저의 합)"""
+    if _tenant_pool is not None:
+        managers = [manager for _, manager in _tenant_pool.managers()]
+    elif _schedule_manager is not None:
+        managers = [_schedule_manager]
+    else:
+        return []
+    stats = [manager.cache_stats() for manager in managers]
+    metrics = [
+        ("schedule_document_cache_hits_total", "counter", "문서 캐시 적중 수", [((), sum(s["hits"] for s in stats))]),
+        ("schedule_document_cache_misses_total", "counter", "문서 캐시 실패 수", [((), sum(s["misses"] for s in stats))]),
+        ("schedule_document_cache_size", "gauge", "문서 캐시에 들어 있는 문서 수", [((), sum(s["size"] for s in stats))]),
+        ("schedule_render_cache_hits_total", "counter", "주간 달력 렌더 캐시 적중 수", [((), calendar_renderer.hits)]),
+        ("schedule_render_cache_misses_total", "counter", "주간 달력 렌더 캐시 실패 수", [((), calendar_renderer.misses)]),
+    ]
+    if _tenant_pool is not None:
+        pool_stats = _tenant_pool.stats()
+        metrics += [
+            ("schedule_tenants_active", "gauge", "메모리에 열려 있는 사용자 매니저 수", [((), pool_stats["active"])]),
+            ("schedule_tenant_opens_total", "counter", "사용자 매니저를 연 횟수", [((), pool_stats["opens"])]),
+            ("schedule_tenant_evictions_total", "counter", "쓰지 않아 닫은 사용자 매니저 수", [((), pool_stats["evictions"])]),
+        ]
+    return metrics
+
+
+# 주간 달력 렌더러 (주/버전별 HTML 캐시)
+calendar_renderer = WeeklyCalendarRenderer()
+registry.register_collector(collect_cache_metrics)
+
+# 저장된 날짜 목록 한 페이지에 표시할 개수
+DATE_PAGE_SIZE = 50
+
+# 검색 결과 최대 표시 개수
+SEARCH_RESULT_LIMIT = 100
+
+# 이벤트 종류별 동시 처리 개수, 조회가 다른 사용자의 저장 뒤에 줄 서지 않도록 따로 제한
+READ_EVENT = {
+    "concurrency_id": "schedule_read",
+    "concurrency_limit": int(os.environ.get("SCHEDULE_READ_CONCURRENCY", "64"))
+}
+WRITE_EVENT = {
+    "concurrency_id": "schedule_write",
+    "concurrency_limit": int(os.environ.get("SCHEDULE_WRITE_CONCURRENCY", "8"))
+}
 
 def create_weekly_calendar_ui(date_str):
     """주간 달력 UI 생성"""
-    data = schedule_manager.load_week_data(date_str)
-    
-    days = ["월", "화", "수", "목", "금", "토", "일"]
-    time_slots = ["오전", "오후", "저녁"]
-    
-    # HTML 테이블로 달력 생성
-    html = """
-    <div style="width: 100%; margin: 20px auto;">
-        <table style="width: 100%; border-collapse: collapse; font-family: Arial, sans-serif;">
-            <thead>
-                <tr style="background-color: #f5f5f5;">
-                    <th style="border: 1px solid #ddd; padding: 10px; text-align: center; font-weight: bold;"></th>
-    """
-    
-    for day in days:
-        html += f'<th style="border: 1px solid #ddd; padding: 10px; text-align: center; font-weight: bold; background-color: #e8f4f8;">{day}</th>'
-    
-    html += "</tr></thead><tbody>"
-    
-    for time_slot in time_slots:
-        html += f'<tr><td style="border: 1px solid #ddd; padding: 10px; text-align: center; font-weight: bold; background-color: #f0f8ff;">{time_slot}</td>'
-        
-        for day in days:
-            tasks = data["days"][day][time_slot]
-            cell_content = ""
-            
-            if tasks:
-                for task in tasks:
-                    cell_content += f'<div style="background-color: #e6f3ff; margin: 2px; padding: 4px; border-radius: 3px; font-size: 12px;">📝 {task}</div>'
-            
-            html += f'<td style="border: 1px solid #ddd; padding: 8px; vertical-align: top; min-height: 60px;">{cell_content}</td>'
-        
-        html += "</tr>"
-    
-    html += "</tbody></table></div>"
-    
-    return html
+    manager = get_schedule_manager()
+    return calendar_renderer.render(
+        manager.get_week_start(date_str),
+        manager.get_document_token("week", date_str),
+        lambda: manager.load_week_data(date_str)
+    )
+
+# 기간 보기 선택지 -> span_period 단위
+RANGE_SPANS = {"월": "month", "분기": "quarter", "13주 (3개월)": "13weeks"}
+
+def create_range_overview_ui(date_str, span_label):
+    """월/분기/13주 기간의 주간 달력을 한 번에 생성"""
+    start, end = span_period(date_str, RANGE_SPANS[span_label])
+    manager = get_schedule_manager()
+    loaded = manager.load_range(start, end)
+    sections = [
+        (
+            week_start,
+            calendar_renderer.render(
+                week_start,
+                manager.get_document_token("week", week_start),
+                lambda data=data: data
+            )
+        )
+        for week_start, data in loaded["weeks"].items()
+    ]
+    header = f'<div style="font-weight: bold; margin-bottom: 8px;">📆 {start} ~ {end} ({len(sections)}주)</div>'
+    return header + calendar_renderer.render_overview(sections, loaded["days"])
+
+def create_dashboard_ui(period):
+    """기간의 생산성 통계를 Markdown 으로 생성 (일/월/연 집계에서 바로 계산)"""
+    manager = get_schedule_manager()
+    summary = manager.analytics_summary(period)
+    months = manager.analytics_by_month(period)
+    title = period.strip() if period and period.strip() else "전체 기간"
+    lines = [
+        f"### 📊 {title} 통계",
+        "",
+        "| 항목 | 값 |",
+        "| --- | --- |",
+        f"| 📅 주간 일정 | {summary['tasks']}개 |",
+        f"| 📋 체크리스트를 쓴 날 | {summary['checklist_days']}일 |",
+        f"| ✅ 완료 / 전체 항목 | {summary['completed']} / {summary['items']} ({summary['completion_rate']:.0%}) |",
+        f"| 📝 메모를 쓴 날 | {summary['notes_days']}일 ({summary['notes_chars']}자) |",
+        "",
+        "#### ⏰ 시간대별 일정",
+        "",
+        "| " + " | ".join(summary["tasks_by_slot"]) + " |",
+        "|" + " --- |" * len(summary["tasks_by_slot"]),
+        "| " + " | ".join(str(count) for count in summary["tasks_by_slot"].values()) + " |",
+        "",
+        "#### 📆 요일별 일정 수 / 체크리스트 완료율",
+        "",
+        "| | " + " | ".join(summary["tasks_by_weekday"]) + " |",
+        "| --- |" + " --- |" * len(summary["tasks_by_weekday"]),
+        "| 일정 | " + " | ".join(str(count) for count in summary["tasks_by_weekday"].values()) + " |",
+        "| 완료율 | " + " | ".join(f"{rate:.0%}" for rate in summary["completion_by_weekday"].values()) + " |",
+    ]
+    if months:
+        lines += ["", "#### 🗓️ 월별", "", "| 월 | 일정 | 완료 / 항목 | 완료율 | 메모 |", "| --- | --- | --- | --- | --- |"]
+        lines += [
+            f"| {month} | {m['tasks']} | {m['completed']} / {m['items']} | {m['completion_rate']:.0%} | {m['notes_days']}일 |"
+            for month, m in months
+        ]
+    return "\n".join(lines)
+
+def mount_router(server_app, router):
+    """Gradio 의 FastAPI 앱에 라우터를 추가하고, Gradio 기본 라우트보다 먼저 매칭되도록 앞으로 이동"""
+    existing = len(server_app.router.routes)
+    server_app.include_router(router)
+    added = server_app.router.routes[existing:]
+    del server_app.router.routes[existing:]
+    server_app.router.routes[0:0] = added
 
 def create_schedule_interface():
-    """Gradio 인터페이스 생성"""
+    """Gradio 인터페이스 생성
+    
+    화면 구성 중에는 데이터를 읽지 않고, 처음 접속할 때 interface.load 에서 불러옵니다.
+    """
+    # 웹 UI 를 띄울 때만 Gradio 를 불러옴 (cli.py 등은 Gradio 없이 실행)
+    import gradio as gr
     
     # 오늘 날짜를 기본값으로 설정
     today = datetime.now().strftime("%Y-%m-%d")
@@ -275,7 +301,7 @@ def create_schedule_interface():
                     with gr.Column(scale=3):
                         gr.Markdown("### 📅 주간 달력")
                         weekly_calendar = gr.HTML(
-                            value=create_weekly_calendar_ui(today),
+                            value="<div style='text-align: center; padding: 20px; color: #666;'>📅 주간 달력을 불러오는 중...</div>",
                             label="주간 달력"
                         )
             
@@ -318,6 +344,104 @@ def create_schedule_interface():
                             interactive=False
                         )
             
+            # 반복 일정 탭 (규칙은 한 번만 저장되고 주간 달력/일별 체크리스트에 자동 표시)
+            with gr.TabItem("🔁 반복 일정"):
+                with gr.Row():
+                    with gr.Column(scale=1):
+                        recurrence_text = gr.Textbox(
+                            label="반복할 일",
+                            placeholder="예: 주간 회의, 운동하기"
+                        )
+                        recurrence_target = gr.Radio(
+                            label="표시 위치",
+                            choices=[("📅 주간 달력", "week"), ("📋 일별 체크리스트", "day")],
+                            value="week"
+                        )
+                        recurrence_slot = gr.Dropdown(
+                            label="시간대 (주간 달력)",
+                            choices=["오전", "오후", "저녁"],
+                            value="오전"
+                        )
+                        recurrence_freq = gr.Radio(
+                            label="반복 주기",
+                            choices=[("매주", "weekly"), ("매일", "daily")],
+                            value="weekly"
+                        )
+                        recurrence_interval = gr.Number(
+                            label="간격 (N주/N일마다)",
+                            value=1,
+                            precision=0,
+                            minimum=1
+                        )
+                        recurrence_weekdays = gr.CheckboxGroup(
+                            label="요일 (매주: 비워두면 시작일의 요일, 매일: 비워두면 모든 요일)",
+                            choices=["월", "화", "수", "목", "금", "토", "일"]
+                        )
+                        with gr.Row():
+                            recurrence_start = gr.Textbox(
+                                label="시작일 (YYYY-MM-DD)",
+                                value=today
+                            )
+                            recurrence_until = gr.Textbox(
+                                label="종료일 (비워두면 계속)",
+                                placeholder="2025-12-31"
+                            )
+                        add_recurrence_btn = gr.Button("🔁 반복 일정 추가", variant="primary")
+                        
+                        gr.Markdown("### 🗑️ 반복 일정 삭제")
+                        remove_recurrence_select = gr.Dropdown(
+                            label="삭제할 반복 일정",
+                            choices=[],
+                            interactive=True
+                        )
+                        remove_recurrence_btn = gr.Button("🗑️ 삭제", variant="secondary")
+                    
+                    with gr.Column(scale=2):
+                        recurrence_list = gr.Textbox(
+                            label="등록된 반복 일정",
+                            lines=15,
+                            interactive=False
+                        )
+                        gr.Markdown("💡 특정 날짜만 빼려면 주간 달력에서 삭제하고, 일별 체크리스트에서 완료하면 그 날짜만 완료로 기록됩니다.")
+            
+            # 기간 보기 탭 (월/분기/13주)
+            with gr.TabItem("📆 기간 보기"):
+                with gr.Row():
+                    with gr.Column(scale=1):
+                        range_date = gr.Textbox(
+                            label="기준 날짜 (YYYY-MM-DD)",
+                            value=today,
+                            placeholder="2025-06-06"
+                        )
+                        range_span = gr.Radio(
+                            label="기간",
+                            choices=list(RANGE_SPANS),
+                            value="월"
+                        )
+                        view_range_btn = gr.Button("📆 기간 일정 보기", variant="primary")
+                    
+                    with gr.Column(scale=3):
+                        range_overview = gr.HTML(
+                            value="<div style='text-align: center; padding: 20px; color: #666;'>📌 기준 날짜와 기간을 선택하고 '기간 일정 보기'를 클릭하세요.</div>",
+                            label="기간 일정"
+                        )
+            
+            # 통계 대시보드 탭
+            with gr.TabItem("📈 통계"):
+                with gr.Row():
+                    with gr.Column(scale=1):
+                        dashboard_period = gr.Textbox(
+                            label="기간 (예: 2025, 2025-06, 2025-Q2, 2025-06-01~2025-06-15)",
+                            placeholder="비워두면 전체 기간",
+                            value=today[:4]
+                        )
+                        dashboard_btn = gr.Button("📈 통계 보기", variant="primary")
+                    
+                    with gr.Column(scale=3):
+                        dashboard_view = gr.Markdown(
+                            value="📌 기간을 입력하고 '통계 보기'를 클릭하세요."
+                        )
+            
             # 데이터 조회 탭
             with gr.TabItem("📂 데이터 조회"):
                 with gr.Row():
@@ -341,6 +465,19 @@ def create_schedule_interface():
                         gr.Markdown("---")
                         gr.Markdown("### 📂 저장된 데이터 목록")
                         
+                        with gr.Row():
+                            dates_period = gr.Textbox(
+                                label="기간 (예: 2025, 2025-06, 2025-Q2)",
+                                placeholder="비워두면 전체 기간",
+                                value=""
+                            )
+                            dates_page = gr.Number(
+                                label=f"페이지 (최신순 {DATE_PAGE_SIZE}개씩)",
+                                value=1,
+                                precision=0,
+                                minimum=1
+                            )
+                        
                         with gr.Accordion("주간 데이터 목록", open=False):
                             week_dates_list = gr.Textbox(
                                 label="저장된 주간 날짜들",
@@ -377,29 +514,102 @@ def create_schedule_interface():
                             interactive=False,
                             value="📌 왼쪽에서 날짜를 입력하고 '일별 일정 보기'를 클릭하세요."
                         )
+                
+                gr.Markdown("---")
+                gr.Markdown("### 🔎 일정 검색")
+                with gr.Row():
+                    with gr.Column(scale=1):
+                        search_query = gr.Textbox(
+                            label="검색어",
+                            placeholder="예: 회의, 운동"
+                        )
+                        search_btn = gr.Button("🔎 검색", variant="primary")
+                    
+                    with gr.Column(scale=2):
+                        search_results = gr.Textbox(
+                            label="검색 결과",
+                            lines=10,
+                            interactive=False
+                        )
+                
+                gr.Markdown("---")
+                gr.Markdown("### 💾 백업 / 가져오기 (NDJSON)")
+                with gr.Row():
+                    with gr.Column(scale=1):
+                        export_btn = gr.Button("📤 전체 내보내기")
+                        export_file = gr.File(label="내보낸 파일", interactive=False)
+                    
+                    with gr.Column(scale=1):
+                        import_file = gr.File(label="가져올 NDJSON 파일", file_types=[".ndjson", ".jsonl"])
+                        import_btn = gr.Button("📥 가져오기", variant="primary")
+                        import_result = gr.Textbox(label="가져오기 결과", lines=4, interactive=False)
         
         # 이벤트 핸들러들
-        def update_day_checklist_dropdown(date_str):
-            data = schedule_manager.load_day_data(date_str)
-            return gr.Dropdown(choices=data["checklist"])
+        def handler(name, func):
+            # 이벤트 핸들러별 호출 수/실행 시간 기록
+            if MULTI_TENANT:
+                func = tenant_handler(func)
+            return timed("handler", name, func)
+        
+        def tenant_handler(func):
+            # 요청한 사용자의 매니저를 빌려 current_manager 로 지정한 채 실행
+            # (Gradio 가 request 인자를 넘기도록 시그니처가 달라야 하므로 functools.wraps 대신 이름만 복사)
+            async def wrapper(request: gr.Request, *args):
+                user = request_user(request)
+                if user is None:
+                    raise gr.Error("🔒 로그인한 사용자만 사용할 수 있습니다.")
+                pool = get_tenant_pool()
+                manager = await pool.acquire_async(user)
+                token = current_manager.set(manager)
+                try:
+                    return await func(*args)
+                except QuotaExceededError as e:
+                    raise gr.Error(f"❌ {e}")
+                finally:
+                    current_manager.reset(token)
+                    pool.release(user)
+            
+            wrapper.__name__ = wrapper.__qualname__ = func.__name__
+            return wrapper
+        
+        def task_choices(tasks):
+            # 같은 텍스트의 항목도 구분되도록 선택값은 항목 id 로 사용
+            return [(task.text, task.id) for task in tasks]
         
-        def update_remove_task_dropdown(date_str, day, time_slot):
-            data = schedule_manager.load_week_data(date_str)
+        async def update_remove_task_dropdown(date_str, day, time_slot):
+            data = await get_schedule_manager().load_week_data_async(date_str)
             tasks = data["days"][day][time_slot]
-            return gr.Dropdown(choices=tasks)
+            return gr.Dropdown(choices=task_choices(tasks))
         
-        def refresh_dates_display():
-            week_dates, day_dates = schedule_manager.get_available_dates()
-            week_text = "\n".join(week_dates) if week_dates else "저장된 주간 데이터가 없습니다."
-            day_text = "\n".join(day_dates) if day_dates else "저장된 일별 데이터가 없습니다."
+        async def refresh_dates_display(period="", page=1):
+            page = max(int(page or 1), 1)
+            offset = (page - 1) * DATE_PAGE_SIZE
+            try:
+                week_dates, week_total = await get_schedule_manager().query_dates_async(
+                    "week", period, offset, DATE_PAGE_SIZE, latest_first=True
+                )
+                day_dates, day_total = await get_schedule_manager().query_dates_async(
+                    "day", period, offset, DATE_PAGE_SIZE, latest_first=True
+                )
+            except ValueError as e:
+                return f"❌ {e}", f"❌ {e}"
+            
+            def page_text(dates, total, empty_text):
+                if not dates:
+                    return empty_text
+                header = f"총 {total}개 중 {offset + 1}-{offset + len(dates)}번째\n"
+                return header + "\n".join(dates)
+            
+            week_text = page_text(week_dates, week_total, "저장된 주간 데이터가 없습니다.")
+            day_text = page_text(day_dates, day_total, "저장된 일별 데이터가 없습니다.")
             return week_text, day_text
         
-        def view_past_week(date_str):
+        async def view_past_week(date_str):
             if not date_str:
                 return "<p>❌ 날짜를 선택해주세요.</p>"
             
             try:
-                html = create_weekly_calendar_ui(date_str)
+                html = await get_schedule_manager().run_async(create_weekly_calendar_ui, date_str)
                 # 읽기 전용임을 명시하는 스타일 추가
                 readonly_html = f"""
                 <div style="background-color: #f9f9f9; padding: 10px; border-radius: 5px; border: 2px solid #e0e0e0;">
@@ -413,20 +623,20 @@ def create_schedule_interface():
             except Exception as e:
                 return f"<p>❌ 데이터를 불러올 수 없습니다: {str(e)}</p>"
         
-        def view_past_day(date_str):
+        async def view_past_day(date_str):
             if not date_str:
                 return "❌ 날짜를 선택해주세요."
             
             try:
-                data = schedule_manager.load_day_data(date_str)
+                data = await get_schedule_manager().load_day_data_async(date_str)
                 display = f"📖 {data['date']} 체크리스트 (읽기 전용)\n\n"
                 display += "🔲 할 일 목록:\n"
                 for item in data["checklist"]:
-                    display += f"  • {item}\n"
+                    display += f"  • {'🔁 ' if item.recurring else ''}{item}\n"
                 
                 display += "\n✅ 완료된 일:\n"
                 for completed in data["completed"]:
-                    display += f"  • {completed}\n"
+                    display += f"  • {'🔁 ' if completed.recurring else ''}{completed}\n"
                 
                 if data["notes"]:
                     display += f"\n📝 메모:\n{data['notes']}\n"
@@ -438,116 +648,294 @@ def create_schedule_interface():
             except Exception as e:
                 return f"❌ 데이터를 불러올 수 없습니다: {str(e)}"
         
-        def add_weekly_task(date_str, day, time_slot, task):
-            schedule_manager.add_week_task(date_str, day, time_slot, task)
-            return create_weekly_calendar_ui(date_str), ""
-        
-        def remove_weekly_task(date_str, day, time_slot, task):
-            schedule_manager.remove_week_task(date_str, day, time_slot, task)
-            return create_weekly_calendar_ui(date_str), gr.Dropdown(choices=[])
-        
-        def load_weekly_calendar(date_str):
-            return create_weekly_calendar_ui(date_str)
+        # 변경 핸들러는 문서를 한 번만 읽고 (필요하면 한 번 저장한 뒤)
+        # 돌려받은 문서로 화면, 선택 목록, 입력창을 한꺼번에 갱신
+        async def add_weekly_task(date_str, day, time_slot, task):
+            data = await get_schedule_manager().add_week_task_async(date_str, day, time_slot, task)
+            return calendar_renderer.render_data(data), ""
+        
+        async def remove_weekly_task(date_str, day, time_slot, task_id):
+            data = await get_schedule_manager().remove_week_task_async(date_str, day, time_slot, task_id)
+            return calendar_renderer.render_data(data), gr.Dropdown(choices=task_choices(data["days"][day][time_slot]), value=None)
+        
+        async def add_day_item(date_str, item):
+            data = await get_schedule_manager().add_day_checklist_async(date_str, item)
+            return get_schedule_manager().format_day_display(data), gr.Dropdown(choices=task_choices(data["checklist"])), ""
+        
+        async def load_day_checklist(date_str):
+            data = await get_schedule_manager().load_day_data_async(date_str)
+            return get_schedule_manager().format_day_display(data), gr.Dropdown(choices=task_choices(data["checklist"])), data["notes"]
+        
+        async def complete_day_item(date_str, item_id):
+            data = await get_schedule_manager().complete_day_checklist_async(date_str, item_id)
+            return get_schedule_manager().format_day_display(data), gr.Dropdown(choices=task_choices(data["checklist"]), value=None)
+        
+        async def save_day_notes(date_str, notes):
+            data = await get_schedule_manager().update_day_notes_async(date_str, notes)
+            return get_schedule_manager().format_day_display(data)
+        
+        def recurrence_view(rules, message=""):
+            if rules:
+                lines = [f"🔁 {rule['text']} · {rule['description']}" for rule in rules]
+            else:
+                lines = ["등록된 반복 일정이 없습니다."]
+            if message:
+                lines = [message, ""] + lines
+            choices = [(f"{rule['text']} · {rule['description']}", rule["id"]) for rule in rules]
+            return "\n".join(lines), gr.Dropdown(choices=choices, value=None)
+        
+        async def load_recurrences():
+            return recurrence_view(await get_schedule_manager().list_recurrences_async())
+        
+        async def add_recurrence(text, target, slot, freq, interval, weekdays, start, until):
+            try:
+                await get_schedule_manager().add_recurrence_async(
+                    text, target, start, freq, interval, weekdays, slot, until.strip() or None
+                )
+            except ValueError as e:
+                return recurrence_view(await get_schedule_manager().list_recurrences_async(), f"❌ {e}") + (text,)
+            return recurrence_view(await get_schedule_manager().list_recurrences_async(), "✅ 반복 일정을 추가했습니다.") + ("",)
+        
+        async def remove_recurrence(rule_id):
+            if not rule_id:
+                return recurrence_view(await get_schedule_manager().list_recurrences_async(), "❌ 삭제할 반복 일정을 선택해주세요.")
+            await get_schedule_manager().remove_recurrence_async(rule_id)
+            return recurrence_view(await get_schedule_manager().list_recurrences_async(), "🗑️ 반복 일정을 삭제했습니다.")
+        
+        async def view_dashboard(period):
+            try:
+                return await get_schedule_manager().run_async(create_dashboard_ui, period)
+            except ValueError as e:
+                return f"❌ {e}"
+        
+        async def load_weekly_calendar(date_str):
+            return await get_schedule_manager().run_async(create_weekly_calendar_ui, date_str)
+        
+        async def search_schedule(query):
+            if not query or not query.strip():
+                return "❌ 검색어를 입력해주세요."
+            results = await get_schedule_manager().search_async(query, limit=SEARCH_RESULT_LIMIT)
+            if not results:
+                return f"🔎 '{query}' 검색 결과가 없습니다."
+            lines = [f"🔎 '{query}' 검색 결과 {len(results)}건\n"]
+            for result in results:
+                if result["kind"] == "week":
+                    location = "📅 " + result["location"].replace("/", " ")
+                else:
+                    location = "📋 " + DAY_FIELDS[result["location"]]
+                text = result["text"].replace("\n", " ")
+                if len(text) > 60:
+                    text = text[:60] + "…"
+                lines.append(f"  • {result['date']} · {location} · {text}")
+            return "\n".join(lines)
+        
+        def write_export():
+            fd, path = tempfile.mkstemp(prefix="schedule_export_", suffix=".ndjson")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                export_ndjson(get_schedule_manager(), f)
+            return path
+        
+        def read_import(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return import_ndjson(get_schedule_manager(), f)
+        
+        async def export_all():
+            return await get_schedule_manager().run_async(write_export)
+        
+        async def import_uploaded(file):
+            if file is None:
+                return "❌ 가져올 파일을 선택해주세요."
+            path = file if isinstance(file, str) else file.name
+            stats = await get_schedule_manager().run_async(read_import, path, write=True)
+            return format_import_stats(stats)
+        
+        async def view_range(date_str, span_label):
+            if not date_str:
+                return "<p>❌ 날짜를 선택해주세요.</p>"
+            try:
+                return await get_schedule_manager().run_async(create_range_overview_ui, date_str, span_label)
+            except Exception as e:
+                return f"<p>❌ 데이터를 불러올 수 없습니다: {str(e)}</p>"
         
         # 주간 달력 이벤트
         add_task_btn.click(
-            add_weekly_task,
+            handler("add_weekly_task", add_weekly_task),
             inputs=[week_date, day_select, time_select, task_input],
-            outputs=[weekly_calendar, task_input]
+            outputs=[weekly_calendar, task_input],
+            **WRITE_EVENT
         )
         
         load_week_btn.click(
-            load_weekly_calendar,
+            handler("load_weekly_calendar", load_weekly_calendar),
             inputs=[week_date],
-            outputs=[weekly_calendar]
+            outputs=[weekly_calendar],
+            **READ_EVENT
         )
         
         remove_day_select.change(
-            update_remove_task_dropdown,
+            handler("update_remove_task_dropdown", update_remove_task_dropdown),
             inputs=[week_date, remove_day_select, remove_time_select],
-            outputs=[remove_task_select]
+            outputs=[remove_task_select],
+            **READ_EVENT
         )
         
         remove_time_select.change(
-            update_remove_task_dropdown,
+            handler("update_remove_task_dropdown", update_remove_task_dropdown),
             inputs=[week_date, remove_day_select, remove_time_select],
-            outputs=[remove_task_select]
+            outputs=[remove_task_select],
+            **READ_EVENT
         )
         
         remove_task_btn.click(
-            remove_weekly_task,
+            handler("remove_weekly_task", remove_weekly_task),
             inputs=[week_date, remove_day_select, remove_time_select, remove_task_select],
-            outputs=[weekly_calendar, remove_task_select]
+            outputs=[weekly_calendar, remove_task_select],
+            **WRITE_EVENT
         )
         
         # 일별 체크리스트 이벤트
         add_day_btn.click(
-            schedule_manager.add_day_checklist,
+            handler("add_day_checklist", add_day_item),
             inputs=[day_date, day_checklist_input],
-            outputs=[day_display]
-        ).then(
-            lambda date: gr.update(value=""),
-            inputs=[day_date],
-            outputs=[day_checklist_input]
-        ).then(
-            update_day_checklist_dropdown,
-            inputs=[day_date],
-            outputs=[day_checklist_select]
+            outputs=[day_display, day_checklist_select, day_checklist_input],
+            **WRITE_EVENT
         )
         
         load_day_btn.click(
-            lambda date: schedule_manager.format_day_display(schedule_manager.load_day_data(date)),
-            inputs=[day_date],
-            outputs=[day_display]
-        ).then(
-            update_day_checklist_dropdown,
+            handler("load_day_checklist", load_day_checklist),
             inputs=[day_date],
-            outputs=[day_checklist_select]
+            outputs=[day_display, day_checklist_select, day_notes],
+            **READ_EVENT
         )
         
         complete_day_btn.click(
-            schedule_manager.complete_day_checklist,
+            handler("complete_day_checklist", complete_day_item),
             inputs=[day_date, day_checklist_select],
-            outputs=[day_display]
-        ).then(
-            update_day_checklist_dropdown,
-            inputs=[day_date],
-            outputs=[day_checklist_select]
+            outputs=[day_display, day_checklist_select],
+            **WRITE_EVENT
         )
         
         save_notes_btn.click(
-            schedule_manager.update_day_notes,
+            handler("update_day_notes", save_day_notes),
             inputs=[day_date, day_notes],
-            outputs=[day_display]
+            outputs=[day_display],
+            **WRITE_EVENT
+        )
+        
+        # 반복 일정 이벤트
+        add_recurrence_btn.click(
+            handler("add_recurrence", add_recurrence),
+            inputs=[recurrence_text, recurrence_target, recurrence_slot, recurrence_freq,
+                    recurrence_interval, recurrence_weekdays, recurrence_start, recurrence_until],
+            outputs=[recurrence_list, remove_recurrence_select, recurrence_text],
+            **WRITE_EVENT
+        )
+        
+        remove_recurrence_btn.click(
+            handler("remove_recurrence", remove_recurrence),
+            inputs=[remove_recurrence_select],
+            outputs=[recurrence_list, remove_recurrence_select],
+            **WRITE_EVENT
         )
         
         # 데이터 조회 이벤트
         refresh_week_btn.click(
-            refresh_dates_display,
-            outputs=[week_dates_list, day_dates_list]
+            handler("refresh_dates_display", refresh_dates_display),
+            inputs=[dates_period, dates_page],
+            outputs=[week_dates_list, day_dates_list],
+            **READ_EVENT
         )
         
         refresh_day_btn.click(
-            refresh_dates_display,
-            outputs=[week_dates_list, day_dates_list]
+            handler("refresh_dates_display", refresh_dates_display),
+            inputs=[dates_period, dates_page],
+            outputs=[week_dates_list, day_dates_list],
+            **READ_EVENT
         )
         
         view_week_btn.click(
-            view_past_week,
+            handler("view_past_week", view_past_week),
             inputs=[week_search_date],
-            outputs=[past_weekly_calendar]
+            outputs=[past_weekly_calendar],
+            **READ_EVENT
         )
         
         view_day_btn.click(
-            view_past_day,
+            handler("view_past_day", view_past_day),
             inputs=[day_search_date],
-            outputs=[past_day_display]
+            outputs=[past_day_display],
+            **READ_EVENT
+        )
+        
+        search_btn.click(
+            handler("search_schedule", search_schedule),
+            inputs=[search_query],
+            outputs=[search_results],
+            **READ_EVENT
+        )
+        
+        search_query.submit(
+            handler("search_schedule", search_schedule),
+            inputs=[search_query],
+            outputs=[search_results],
+            **READ_EVENT
+        )
+        
+        export_btn.click(
+            handler("export_all", export_all),
+            outputs=[export_file],
+            **READ_EVENT
+        )
+        
+        import_btn.click(
+            handler("import_uploaded", import_uploaded),
+            inputs=[import_file],
+            outputs=[import_result],
+            **WRITE_EVENT
+        )
+        
+        # 통계 이벤트
+        dashboard_btn.click(
+            handler("view_dashboard", view_dashboard),
+            inputs=[dashboard_period],
+            outputs=[dashboard_view],
+            **READ_EVENT
+        )
+        
+        dashboard_period.submit(
+            handler("view_dashboard", view_dashboard),
+            inputs=[dashboard_period],
+            outputs=[dashboard_view],
+            **READ_EVENT
+        )
+        
+        # 기간 보기 이벤트
+        view_range_btn.click(
+            handler("view_range", view_range),
+            inputs=[range_date, range_span],
+            outputs=[range_overview],
+            **READ_EVENT
         )
         
         # 초기 데이터 로드
         interface.load(
-            refresh_dates_display,
-            outputs=[week_dates_list, day_dates_list]
+            handler("load_weekly_calendar", load_weekly_calendar),
+            inputs=[week_date],
+            outputs=[weekly_calendar],
+            **READ_EVENT
+        )
+        
+        interface.load(
+            handler("refresh_dates_display", refresh_dates_display),
+            inputs=[dates_period, dates_page],
+            outputs=[week_dates_list, day_dates_list],
+            **READ_EVENT
+        )
+        
+        interface.load(
+            handler("load_recurrences", load_recurrences),
+            outputs=[recurrence_list, remove_recurrence_select],
+            **READ_EVENT
         )
     
     return interface
@@ -555,9 +943,30 @@ def create_schedule_interface():
 if __name__ == "__main__":
     # 인터페이스 생성 및 실행
     app = create_schedule_interface()
-    app.launch(
+    # 문서별 잠금으로 보호되므로 여러 요청을 동시에 처리
+    app.queue(default_concurrency_limit=int(os.environ.get("SCHEDULE_CONCURRENCY_LIMIT", "16")))
+    # 로그인 계정 파일 ("사용자:비밀번호" 한 줄에 하나), 사용자별 데이터 분리 모드에서 사용자 이름이 됨
+    auth = load_auth_file(os.environ["SCHEDULE_AUTH_FILE"]) if os.environ.get("SCHEDULE_AUTH_FILE") else None
+    if MULTI_TENANT and auth is None and not USER_HEADER:
+        print("⚠️ SCHEDULE_MULTI_TENANT=1 에는 SCHEDULE_AUTH_FILE 또는 SCHEDULE_USER_HEADER 가 필요합니다 (사용자를 알 수 없어 모든 요청이 거절됨)")
+    server_app, _, _ = app.launch(
         server_name="0.0.0.0",
-        server_port=7860,
+        # 로드 밸런서 뒤에 여러 워커를 띄울 때는 워커마다 다른 포트 (SCHEDULE_SHARED=1 과 함께 사용)
+        server_port=int(os.environ.get("SCHEDULE_PORT", "7860")),
         share=True,
-        show_error=True
-    )
\ No newline at end of file
+        show_error=True,
+        auth=auth,
+        prevent_thread_lock=True
+    )
+    # Gradio 가 사용하는 FastAPI 서버에 /metrics 엔드포인트와 JSON API 추가
+    from api import create_api_router, tenant_dependency
+    mount_router(server_app, create_metrics_router())
+    if MULTI_TENANT:
+        # API 는 로그인 세션이 없으므로 SCHEDULE_USER_HEADER 헤더의 사용자로 구분
+        mount_router(server_app, create_api_router(
+            get_manager=get_schedule_manager,
+            dependencies=[tenant_dependency(get_tenant_pool(), USER_HEADER)]
+        ))
+    else:
+        mount_router(server_app, create_api_router(get_schedule_manager()))
+    app.block_thread()
\ No newline at end of file
@@ -0,0 +1,1058 @@
+import asyncio
+import contextlib
+import contextvars
+import copy
+import functools
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from analytics import AnalyticsIndex
+from coordination import CHANGES_FILE, ChangeFeed, LockStripes, file_lock
+from date_index import DateIndex, parse_period
+from journal import OperationJournal, apply_operation
+from metrics import instrument_class
+from recurrence import RecurrenceStore, parse_occurrence_id, strip_occurrences
+from search_index import SearchIndex
+from storage import JsonFileBackend
+from tasks import SCHEMA_VERSION, count_items, empty_document, new_task_id, to_model, to_plain
+
+# 백그라운드 아카이브 압축 간격 (초)
+ARCHIVE_INTERVAL = 24 * 60 * 60
+
+# 매니저 인스턴스 번호, 문서 token 에 포함
+_instance_ids = itertools.count(1)
+
+# 문서 잠금 개수, 문서 키의 해시로 나눠 쓰므로 문서가 많아져도 늘지 않음
+DOC_LOCK_STRIPES = 64
+
+class DocumentConflictError(Exception):
+    """If-Match 로 전달된 ETag 가 현재 문서와 다를 때 발생"""
+
+class QuotaExceededError(ValueError):
+    """저장 한도(StorageQuota)를 넘는 변경일 때 발생, 변경은 저장되지 않음"""
+
+class StorageQuota:
+    """저장소 하나(사용자 한 명)의 저장 한도, 0 이면 제한 없음"""
+    def __init__(self, max_documents=0, max_items=0, max_notes_chars=0, max_rules=0):
+        # 주간 + 일별 문서 수
+        self.max_documents = max_documents
+        # 문서 하나의 항목 수
+        self.max_items = max_items
+        self.max_notes_chars = max_notes_chars
+        # 반복 일정 규칙 수
+        self.max_rules = max_rules
+
+class DocumentView(Mapping):
+    """변경 메서드가 돌려주는 문서, 처음 읽을 때 반복 일정을 덧붙인 복사본을 만듦
+    
+    결과를 쓰지 않는 호출자는 문서 복사 비용을 내지 않으며, 만들 때의 최신 문서를 보여줍니다.
+    """
+    __slots__ = ("_load", "_data")
+    
+    def __init__(self, load):
+        self._load = load
+        self._data = None
+    
+    def resolve(self):
+        """문서 복사본(dict) 반환, 처음 호출할 때 한 번만 만듦"""
+        if self._data is None:
+            self._data = self._load()
+        return self._data
+    
+    def __getitem__(self, key):
+        return self.resolve()[key]
+    
+    def __iter__(self):
+        return iter(self.resolve())
+    
+    def __len__(self):
+        return len(self.resolve())
+    
+    def __repr__(self):
+        return f"DocumentView({self.resolve()!r})"
+    
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self.resolve(), memo)
+
+class DocumentCache:
+    """파싱된 주간/일별 문서를 보관하는 LRU 캐시"""
+    def __init__(self, max_size=256, on_evict=None):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # key -> (stamp, version, data)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 크기 제한으로 밀려난 문서의 (key, version) 을 받는 함수, 캐시 잠금 밖에서 호출
+        self.on_evict = on_evict
+    
+    def get(self, key, stamp, version):
+        """stamp(mtime, size)와 버전이 모두 일치할 때만 캐시된 문서 반환"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp and entry[1] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, stamp, version, data):
+        """문서를 캐시에 저장하고 크기 제한을 넘으면 가장 오래된 항목 제거"""
+        evicted = []
+        if self.max_size <= 0:
+            evicted.append((key, version))
+        else:
+            with self._lock:
+                self._entries[key] = (stamp, version, data)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    old_key, entry = self._entries.popitem(last=False)
+                    evicted.append((old_key, entry[1]))
+        if self.on_evict is not None:
+            for old_key, old_version in evicted:
+                self.on_evict(old_key, old_version)
+    
+    def invalidate(self, key=None):
+        """특정 문서 또는 전체 캐시 무효화"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+    
+    def stats(self):
+        """캐시 적중/실패 통계"""
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+@lru_cache(maxsize=4096)
+def week_start_of(date_str):
+    """해당 주의 월요일 날짜 문자열 (자주 쓰이므로 결과를 캐시)"""
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+    # 해당 주의 월요일을 찾기
+    monday = date_obj - timedelta(days=date_obj.weekday())
+    return monday.strftime('%Y-%m-%d')
+
+class ScheduleManager:
+    def __init__(self, base_dir="schedule_data", cache_size=256, backend=None,
+                 journal=True, compact_interval=30.0, fsync=False, load_workers=8,
+                 read_workers=16, write_workers=4, archive_after_days=None, shared=None,
+                 quota=None, load_indexes=True, recurrence_history_days=None):
+        self.base_dir = base_dir
+        # 한 프로세스에 여러 매니저(사용자별, 닫았다 다시 연 매니저)가 있어도 렌더 캐시 등이 섞이지 않도록 구분
+        self.instance_id = next(_instance_ids)
+        # 저장 한도 (StorageQuota), None 이면 제한 없음
+        self.quota = quota
+        self.backend = backend if backend is not None else JsonFileBackend(base_dir)
+        self.cache = DocumentCache(cache_size, on_evict=self._forget_document)
+        # 변경될 때마다 새 번호를 받는 문서별 버전, 캐시에서 밀려난 문서는 _forget_document 에서 지움
+        self._versions = {}
+        # 모든 문서가 함께 쓰는 버전 번호, 지웠다 다시 바뀐 문서의 버전이 예전 값과 겹치지 않음
+        self._version_seq = itertools.count(1)
+        # 항목 수 한도를 확인한 문서의 항목 수, 이후 변경 연산마다 증감
+        self._item_counts = {}
+        # 아직 스냅샷에 반영되지 않은 문서별 저널 레코드
+        self._pending = {}
+        # 문서(주간 파일/일별 날짜) 잠금, 다른 잠금에 대응하는 문서끼리는 병렬로 수정 가능
+        self._doc_locks = [threading.Lock() for _ in range(DOC_LOCK_STRIPES)]
+        # 저널 기록과 _pending 갱신을 한 묶음으로 처리하기 위한 잠금
+        self._journal_guard = threading.Lock()
+        self._compact_lock = threading.Lock()
+        # 이 일수보다 오래된 문서를 백그라운드 압축 때 하루 한 번 아카이브로 옮김 (None 이면 사용 안 함)
+        self.archive_after_days = archive_after_days
+        self._last_archive = None
+        self._stop_compactor = threading.Event()
+        self._compactor = None
+        # 기간 조회 시 문서를 병렬로 읽는 스레드 풀 (처음 사용할 때 생성)
+        self.load_workers = load_workers
+        self._executor = None
+        self._executor_guard = threading.Lock()
+        # 비동기 API 가 파일 입출력을 넘기는 스레드 풀, 조회가 저장 뒤에 줄 서지 않도록 분리
+        self._io_workers = {"read": read_workers, "write": write_workers}
+        self._io_executors = {}
+        
+        # 여러 프로세스가 같은 저장소를 쓰는 공유 모드, None 이면 변경 알림 로그가 있을 때 자동으로 사용
+        # (공유 모드로 쓰던 디렉토리를 다른 프로세스가 저널 모드로 열지 않도록)
+        changes_path = os.path.join(base_dir, CHANGES_FILE)
+        self.shared = os.path.exists(changes_path) if shared is None else shared
+        self.changes = None
+        self._lock_stripes = None
+        self._sync_lock = threading.Lock()
+        # 다른 프로세스가 바꿨지만 아직 검색 색인/통계에 반영하지 않은 문서
+        self._stale = set()
+        # 변경 알림을 놓쳐 캐시 전체를 비운 횟수 (문서 token 에 포함)
+        self._generation = 0
+        journal_path = os.path.join(base_dir, "journal.log")
+        if self.shared:
+            self._lock_stripes = LockStripes(os.path.join(base_dir, "locks"))
+            self.changes = ChangeFeed(changes_path)
+            # 프로세스마다 따로 쌓이는 저널은 다른 프로세스가 볼 수 없으므로 변경을 바로 스냅샷에 씀
+            self._flush_journal(journal_path)
+        
+        self.journal = None
+        if journal and not self.shared:
+            self.journal = OperationJournal(journal_path, fsync=fsync)
+            for record in self.journal.replay():
+                key = (record["kind"], record["key"])
+                if record["op"] == "put":
+                    self._pending[key] = []
+                self._pending.setdefault(key, []).append(record)
+        
+        # 저장된 날짜 인덱스, 없거나 저장소가 외부에서 바뀐 경우에만 다시 생성
+        # (공유 모드에서는 여러 프로세스가 같은 인덱스 파일을 덮어쓰므로 시작할 때 항상 다시 생성)
+        self.date_index = DateIndex(os.path.join(base_dir, "date_index.json"))
+        signature = self.backend.index_signature()
+        if self.shared or not self.date_index.load() or self.date_index.signature != signature:
+            self.date_index.rebuild(
+                self.backend.list_week_starts(), self.backend.list_day_dates(), signature
+            )
+        for kind, name in list(self._pending):
+            self.date_index.add(kind, name)
+        
+        # 반복 일정 규칙, 문서를 불러올 때 해당 주의 발생 항목으로 전개
+        self.recurrence = RecurrenceStore(os.path.join(base_dir, "recurrence.json"))
+        self.recurrence.load()
+        # 이 일수보다 오래된 반복 일정 예외(건너뛰기/완료)는 압축할 때 정리 (None 이면 유지)
+        self.recurrence_history_days = recurrence_history_days
+        
+        # 전체 검색 색인과 생산성 통계 집계, 처음 한 번만 전체 문서로 만들고 이후에는 저장 시 갱신
+        # load_indexes=False 이면 검색/통계를 조회할 때 처음 읽고, 그 전의 변경은 각 색인의 로그에만 추가
+        # (명령줄 도구처럼 변경 몇 개만 하고 끝나는 경우 전체 색인을 읽고 다시 쓰지 않도록)
+        self.search_index = SearchIndex(base_dir)
+        self.analytics = AnalyticsIndex(base_dir)
+        self._indexes_guard = threading.Lock()
+        if load_indexes:
+            self._load_indexes()
+        else:
+            for kind, name in list(self._pending):
+                # 비정상 종료로 색인에 빠졌을 수 있는 저널 변경을 로그에 남김
+                _, data = self._materialize((kind, name))
+                self.search_index.update_document(kind, name, data)
+                self.analytics.update_document(kind, name, data)
+        
+        if self.journal is not None and compact_interval:
+            self.start_compactor(compact_interval)
+    
+    def get_week_start(self, date_str):
+        """해당 주의 월요일 날짜 문자열 반환"""
+        return week_start_of(date_str)
+    
+    def iter_week_starts(self, start_date, end_date):
+        """기간에 걸친 모든 주의 월요일 날짜 목록"""
+        monday = datetime.strptime(self.get_week_start(start_date), "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        week_starts = []
+        while monday <= end:
+            week_starts.append(monday.strftime('%Y-%m-%d'))
+            monday += timedelta(days=7)
+        return week_starts
+    
+    def get_week_filename(self, date_str):
+        """주차별 파일명 생성 (월요일 기준)"""
+        return f"{self.get_week_start(date_str)}_week.json"
+    
+    def get_day_filename(self, date_str):
+        """일별 파일명 생성"""
+        return f"{date_str}.json"
+    
+    def _week_key(self, date_str):
+        return ("week", self.get_week_start(date_str))
+    
+    def _day_key(self, date_str):
+        return ("day", date_str)
+    
+    def _doc_lock(self, key):
+        """문서 키에 대응하는 잠금 객체 반환 (한 스레드가 둘 이상의 문서 잠금을 동시에 잡으면 안 됨)"""
+        return self._doc_locks[hash(key) % DOC_LOCK_STRIPES]
+    
+    def _forget_document(self, key, version):
+        """캐시에서 밀려난 문서의 버전/항목 수를 지움
+        
+        저널에 남은 변경이 없고 그 뒤로 바뀌지 않은 문서만 지우므로, 버전이 0 으로 돌아가도
+        스냅샷 stamp 가 내용을 구분해 token 이 예전 내용의 값과 겹치지 않습니다.
+        """
+        self._item_counts.pop(key, None)
+        with self._journal_guard:
+            if key not in self._pending and self._versions.get(key) == version:
+                del self._versions[key]
+    
+    @contextlib.contextmanager
+    def _write_lock(self, key):
+        """문서를 변경하는 동안 잡는 잠금
+        
+        공유 모드에서는 다른 프로세스와의 파일 잠금도 함께 잡고, 잠금을 얻은 뒤
+        그 사이 다른 프로세스가 바꾼 문서를 반영하므로 동시에 수정해도 변경이 유실되지 않습니다.
+        """
+        with self._doc_lock(key):
+            if self._lock_stripes is None:
+                yield
+                return
+            with self._lock_stripes.lock(key):
+                self._sync_changes()
+                yield
+    
+    def _process_lock(self, name):
+        """공유 모드에서 name 작업을 한 프로세스만 하도록 잡는 파일 잠금 (아니면 아무 것도 하지 않음)"""
+        if self._lock_stripes is None:
+            return contextlib.nullcontext()
+        return file_lock(os.path.join(self._lock_stripes.folder, f"{name}.lock"))
+    
+    @contextlib.contextmanager
+    def _recurrence_lock(self):
+        """반복 규칙을 변경하는 동안 잡는 잠금 (공유 모드에서는 변경 후 다른 프로세스에 알림)"""
+        with self._process_lock("recurrence"):
+            self._sync_changes()
+            yield
+            if self.changes is not None:
+                self.changes.publish("recurrence", "")
+    
+    def _feed_position(self):
+        return self.changes.position if self.changes is not None else None
+    
+    def _sync_changes(self):
+        """다른 프로세스가 바꾼 문서의 캐시를 무효화 (공유 모드)
+        
+        변경 알림 로그에서 새로 추가된 줄만 읽으므로 바뀐 것이 없으면 파일 크기 확인 정도로 끝납니다.
+        검색 색인/통계는 조회할 때 _refresh_indexes 에서 반영합니다.
+        """
+        if self.changes is None:
+            return
+        with self._sync_lock:
+            changes, complete = self.changes.poll()
+            if not complete:
+                # 알림 일부를 놓쳤으므로 모든 문서를 저장소에서 다시 읽음
+                self._generation += 1
+                self.cache.invalidate()
+                self._item_counts.clear()
+                self.recurrence.load()
+                self.date_index.rebuild(
+                    self.backend.list_week_starts(), self.backend.list_day_dates(), self.backend.index_signature()
+                )
+                self._stale.update((kind, name) for kind in ("week", "day") for name in self.date_index.all(kind))
+            for kind, name in dict.fromkeys(changes):
+                if kind == "recurrence":
+                    self.recurrence.load()
+                    continue
+                key = (kind, name)
+                self._versions[key] = next(self._version_seq)
+                self.cache.invalidate(key)
+                self._item_counts.pop(key, None)
+                self.date_index.add(kind, name)
+                self._stale.add(key)
+    
+    def _load_indexes(self):
+        """검색 색인/통계를 스냅샷과 로그에서 읽음 (없거나 알림을 놓쳤으면 전체 문서로 생성), 이미 읽었으면 무시"""
+        if self.search_index.loaded and self.analytics.loaded:
+            return
+        with self._indexes_guard:
+            for index in (self.search_index, self.analytics):
+                if index.loaded:
+                    continue
+                if not index.load() or not self._catch_up(index):
+                    index.cursor = self._feed_position()
+                    index.rebuild(
+                        (kind, name, self._materialize((kind, name))[1])
+                        for kind in ("week", "day")
+                        for name in self.date_index.all(kind)
+                    )
+                for kind, name in list(self._pending):
+                    # 비정상 종료로 색인에 빠졌을 수 있는 저널 변경 반영
+                    index.update_document(kind, name, self._materialize((kind, name))[1])
+    
+    def _refresh_indexes(self):
+        """다른 프로세스가 바꾼 문서를 검색 색인/통계에 반영하고 반영한 알림 위치 반환 (공유 모드)"""
+        if self.changes is None:
+            return None
+        self._sync_changes()
+        with self._sync_lock:
+            stale, self._stale = self._stale, set()
+            cursor = self.changes.position
+        for key in stale:
+            with self._doc_lock(key):
+                _, data = self._materialize(key)
+                self.search_index.update_document(key[0], key[1], data)
+                self.analytics.update_document(key[0], key[1], data)
+        return cursor
+    
+    def _catch_up(self, index):
+        """공유 모드에서 색인 스냅샷 이후 다른 프로세스가 바꾼 문서를 반영, 알림을 놓쳤으면 False"""
+        if self.changes is None:
+            return True
+        changes, complete = self.changes.read_since(index.cursor)
+        if not complete:
+            return False
+        for kind, name in dict.fromkeys(changes):
+            if kind in ("week", "day"):
+                index.update_document(kind, name, self._materialize((kind, name))[1])
+        return True
+    
+    def _flush_journal(self, path):
+        """공유 모드로 열기 전에 남아 있던 저널을 스냅샷에 반영하고 저널 파일 삭제"""
+        if not os.path.exists(path) or not os.path.getsize(path):
+            return
+        with self._process_lock("journal"):
+            if not os.path.exists(path):
+                return
+            journal = OperationJournal(path)
+            pending = {}
+            for record in journal.replay():
+                key = (record["kind"], record["key"])
+                if record["op"] == "put":
+                    pending[key] = []
+                pending.setdefault(key, []).append(record)
+            for key, records in pending.items():
+                with self._lock_stripes.lock(key):
+                    data = self._read_snapshot(key) or self._default_document(key)
+                    for record in records:
+                        apply_operation(data, record)
+                    self._write_snapshot(key, data)
+                    self.changes.publish(*key)
+            journal.close()
+            os.remove(path)
+    
+    def _default_document(self, key):
+        """저장된 문서가 없을 때 사용할 기본 구조"""
+        return empty_document(*key)
+    
+    def _snapshot_stamp(self, key):
+        kind, name = key
+        if kind == "week":
+            return self.backend.week_stamp(name)
+        return self.backend.day_stamp(name)
+    
+    def _read_snapshot(self, key):
+        """저장된 문서를 메모리 문서로 읽음 (예전 schema 는 자동 변환)"""
+        kind, name = key
+        raw = self.backend.read_week(name) if kind == "week" else self.backend.read_day(name)
+        return to_model(raw) if raw is not None else None
+    
+    def _write_snapshot(self, key, data):
+        kind, name = key
+        if kind == "week":
+            self.backend.write_week(name, to_plain(data))
+        else:
+            self.backend.write_day(name, to_plain(data))
+    
+    def _materialize(self, key):
+        """스냅샷에 저널을 재생한 문서를 캐시를 거쳐 반환 (stamp, 문서 참조)
+        
+        반환된 문서는 캐시와 공유되므로 호출자가 직접 수정하면 안 됩니다.
+        """
+        self._sync_changes()
+        stamp = self._snapshot_stamp(key)
+        version = self._versions.get(key, 0)
+        data = self.cache.get(key, stamp, version)
+        if data is None:
+            data = self._read_snapshot(key) if stamp is not None else None
+            if data is None:
+                data = self._default_document(key)
+            for record in self._pending.get(key, ()):
+                apply_operation(data, record)
+            self.cache.put(key, stamp, version, data)
+        return stamp, data
+    
+    def _apply(self, key, record):
+        """변경 레코드를 저널에 추가하고 메모리 문서에 반영
+        
+        호출자는 해당 문서의 잠금(_write_lock)을 잡고 있어야 하며,
+        저널을 쓰지 않는 경우에는 곧바로 스냅샷을 다시 씁니다.
+        """
+        stamp, data = self._materialize(key)
+        record["kind"], record["key"] = key
+        if record["op"] == "put":
+            # 저널에는 id 가 붙은 저장 형식으로 기록해 재생해도 같은 id 가 되도록 함
+            # (전개된 반복 일정이 섞여 있으면 문서에 복사되지 않도록 제거)
+            record["data"] = to_plain(strip_occurrences(to_model(record["data"])))
+        if self.quota is not None:
+            self._check_quota(key, data, record)
+        if self.journal is not None:
+            with self._journal_guard:
+                self.journal.append(record)
+                if record["op"] == "put":
+                    self._pending[key] = []
+                self._pending.setdefault(key, []).append(record)
+        # put 이 아니면 바뀐 항목을 기록해 색인을 그만큼만 갱신
+        changes = None if record["op"] == "put" else []
+        apply_operation(data, record, changes)
+        if self.journal is None:
+            self._write_snapshot(key, data)
+            stamp = self._snapshot_stamp(key)
+            if self.changes is not None:
+                # 다른 프로세스가 이 문서의 캐시를 버리도록 알림 (파일 잠금을 잡은 상태)
+                self.changes.publish(*key)
+        version = next(self._version_seq)
+        self._versions[key] = version
+        self.cache.put(key, stamp, version, data)
+        # 캐시에서 밀려나며 다른 스레드가 지울 수 있으므로 get/pop 으로 처리
+        count = self._item_counts.get(key)
+        if count is not None:
+            if changes is None:
+                self._item_counts.pop(key, None)
+            else:
+                self._item_counts[key] = count + sum(
+                    (new is not None) - (old is not None) for location, old, new in changes if location != "notes"
+                )
+        self.date_index.add(*key)
+        if changes is None:
+            self.search_index.update_document(key[0], key[1], data)
+            self.analytics.update_document(key[0], key[1], data)
+        elif changes:
+            self.search_index.apply_changes(key[0], key[1], data, changes)
+            self.analytics.apply_changes(key[0], key[1], data, changes)
+        return data
+    
+    def _check_quota(self, key, data, record):
+        """record 를 적용하면 저장 한도를 넘는지 확인 (넘으면 QuotaExceededError)"""
+        quota = self.quota
+        op = record["op"]
+        if quota.max_documents and not self.date_index.contains(*key) and self.date_index.count() >= quota.max_documents:
+            raise QuotaExceededError(f"저장할 수 있는 문서 수({quota.max_documents}개)를 넘었습니다")
+        if quota.max_items:
+            if op == "put":
+                items = count_items(record["data"])
+            elif op in ("week_add", "day_add"):
+                items = self._item_counts.get(key)
+                if items is None:
+                    items = self._item_counts[key] = count_items(data)
+                items += 1
+            else:
+                items = 0
+            if items > quota.max_items:
+                raise QuotaExceededError(f"문서 하나에 저장할 수 있는 항목 수({quota.max_items}개)를 넘었습니다")
+        if quota.max_notes_chars:
+            if op == "put":
+                notes = record["data"].get("notes") or ""
+            else:
+                notes = record.get("notes") or ""
+            if len(notes) > quota.max_notes_chars:
+                raise QuotaExceededError(f"메모는 {quota.max_notes_chars}자까지 저장할 수 있습니다")
+    
+    def _lazy_view(self, key):
+        """변경 메서드의 반환값, 호출자가 읽을 때 _view 로 만듦"""
+        return DocumentView(functools.partial(self._current_view, key))
+    
+    def _current_view(self, key):
+        with self._doc_lock(key):
+            _, data = self._materialize(key)
+            return self._view(key, data)
+    
+    def _view(self, key, data):
+        """호출자에게 돌려줄 문서 복사본에 반복 규칙의 발생 항목을 덧붙임 (저장되지 않음)"""
+        view = copy.deepcopy(data)
+        if not len(self.recurrence):
+            return view
+        kind, name = key
+        if kind == "week":
+            for day, slots in self.recurrence.expand_week(name)["week"].items():
+                for slot, tasks in slots.items():
+                    for task in tasks:
+                        view["days"][day][slot].add(task)
+        else:
+            for task in self.recurrence.expand_week(self.get_week_start(name))["day"].get(name, ()):
+                (view["completed"] if task.done else view["checklist"]).add(task)
+        return view
+    
+    def compact(self):
+        """저널에 쌓인 변경을 스냅샷 파일로 반영하고 저널 정리
+        
+        문서마다 해당 문서의 잠금만 잡으므로 다른 문서의 수정은 계속 진행됩니다.
+        """
+        if self.journal is None:
+            return 0
+        with self._compact_lock:
+            with self._journal_guard:
+                keys = list(self._pending)
+            for key in keys:
+                with self._doc_lock(key):
+                    _, data = self._materialize(key)
+                    self._write_snapshot(key, data)
+                    with self._journal_guard:
+                        self._pending.pop(key, None)
+                    # 스냅샷이 바뀌었으므로 캐시를 새 stamp 기준으로 갱신 (저널 정리 뒤라 밀려나면 버전도 지울 수 있음)
+                    self.cache.put(key, self._snapshot_stamp(key), self._versions.get(key, 0), data)
+            # 압축하는 동안 새로 들어온 레코드만 남기고 저널을 다시 씀
+            with self._journal_guard:
+                remaining = [record for records in self._pending.values() for record in records]
+                remaining.sort(key=lambda record: record["seq"])
+                self.journal.rewrite(remaining)
+            # 압축으로 생긴 파일 변화는 인덱스에 이미 반영되어 있음
+            self.date_index.set_signature(self.backend.index_signature())
+            self.search_index.compact()
+            self.analytics.compact()
+            self._compact_recurrence()
+        return len(keys)
+    
+    def _compact_recurrence(self):
+        """반복 일정 예외 로그를 규칙 파일에 합치고 보관 기간이 지난 예외 정리"""
+        before = None
+        if self.recurrence_history_days is not None:
+            before = (datetime.now() - timedelta(days=self.recurrence_history_days)).strftime("%Y-%m-%d")
+        with self._recurrence_lock():
+            return self.recurrence.compact(before)
+    
+    def start_compactor(self, interval):
+        """주기적으로 저널을 압축하는 백그라운드 스레드 시작"""
+        if self._compactor is not None:
+            return
+        self._compactor = threading.Thread(
+            target=self._compact_loop, args=(interval,), name="journal-compactor", daemon=True
+        )
+        self._compactor.start()
+    
+    def _compact_loop(self, interval):
+        while not self._stop_compactor.wait(interval):
+            try:
+                self.compact()
+            except OSError as e:
+                print(f"⚠️ 저널 압축 실패: {e}")
+            if self.archive_after_days is None or self.backend.archive is None:
+                continue
+            now = time.monotonic()
+            if self._last_archive is not None and now - self._last_archive < ARCHIVE_INTERVAL:
+                continue
+            self._last_archive = now
+            try:
+                self.archive_old_documents(self.archive_after_days)
+            except OSError as e:
+                print(f"⚠️ 아카이브 압축 실패: {e}")
+    
+    def archive_old_documents(self, older_than_days=365):
+        """older_than_days 일보다 오래된 문서를 연도별 아카이브로 옮기고 (주 개수, 일 개수) 반환
+        
+        아직 저널에만 있는 변경은 먼저 스냅샷으로 반영하며, 옮기는 도중 다시 수정된
+        문서는 개별 파일을 남겨 둡니다 (개별 파일이 아카이브보다 우선).
+        """
+        if self.backend.archive is None:
+            raise ValueError("이 저장소는 아카이브를 지원하지 않습니다")
+        self.compact()
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y-%m-%d")
+        # 기준일이 속한 주는 아직 끝나지 않았으므로 그 전 주까지만 옮김
+        week_cutoff = self.get_week_start(cutoff)
+        candidates = [("week", name) for name in self.date_index.all("week") if name < week_cutoff]
+        candidates += [("day", name) for name in self.date_index.all("day") if name < cutoff]
+        by_year = {}
+        for kind, name in candidates:
+            stamp = self.backend.loose_stamp(kind, name)
+            if stamp is None or (kind, name) in self._pending:
+                continue
+            by_year.setdefault(name[:4], []).append((kind, name, stamp))
+        counts = {"week": 0, "day": 0}
+        with self._compact_lock, self._process_lock("archive"):
+            for year, entries in sorted(by_year.items()):
+                documents = {}
+                for kind, name, stamp in entries:
+                    data = self.backend.read_week(name) if kind == "week" else self.backend.read_day(name)
+                    if data is not None:
+                        documents[(kind, name)] = data
+                self.backend.archive_documents(year, documents)
+                for kind, name, stamp in entries:
+                    key = (kind, name)
+                    if key not in documents:
+                        continue
+                    with self._write_lock(key):
+                        if key not in self._pending and self.backend.remove_loose(kind, name, stamp):
+                            counts[kind] += 1
+            self.date_index.set_signature(self.backend.index_signature())
+        return counts["week"], counts["day"]
+    
+    def close(self):
+        """백그라운드 압축을 멈추고 남은 변경을 스냅샷으로 반영"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for executor in self._io_executors.values():
+            executor.shutdown(wait=True)
+        self._io_executors.clear()
+        self._stop_compactor.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        if self.journal is not None:
+            self.compact()
+            self.journal.close()
+            self.journal = None
+        else:
+            # 공유 모드에서는 다른 프로세스가 바꾼 문서까지 반영한 알림 위치를 색인 스냅샷에 기록
+            cursor = self._refresh_indexes()
+            self.search_index.cursor = self.analytics.cursor = cursor
+            self.search_index.compact()
+            self.analytics.compact()
+            self._compact_recurrence()
+        self.search_index.close()
+        self.analytics.close()
+        self.date_index.set_signature(self.backend.index_signature())
+        if self.changes is not None:
+            self.changes.close()
+    
+    def upgrade_documents(self):
+        """예전 schema 로 저장된 문서를 현재 schema 로 다시 저장하고 개수 반환
+        
+        읽을 때마다 자동으로 변환되지만, 미리 한 번에 바꿔 두면 id 가 파일에 고정됩니다.
+        아카이브에만 있는 문서는 그대로 둡니다.
+        """
+        self.compact()
+        count = 0
+        with self._compact_lock:
+            for kind in ("week", "day"):
+                for name in self.date_index.all(kind):
+                    key = (kind, name)
+                    if self.backend.archive is not None and self.backend.loose_stamp(kind, name) is None:
+                        continue
+                    with self._write_lock(key):
+                        raw = self.backend.read_week(name) if kind == "week" else self.backend.read_day(name)
+                        if raw is None or raw.get("schema", 1) >= SCHEMA_VERSION or key in self._pending:
+                            continue
+                        self._write_snapshot(key, to_model(raw))
+                        count += 1
+            self.date_index.set_signature(self.backend.index_signature())
+        return count
+    
+    def get_document_version(self, kind, date_str):
+        """문서 버전 반환, 문서가 바뀔 때마다 달라짐 (kind: 'week' 또는 'day')"""
+        key = self._week_key(date_str) if kind == "week" else self._day_key(date_str)
+        return self._versions.get(key, 0)
+    
+    def get_document_token(self, kind, date_str):
+        """문서가 바뀌었는지 비교할 수 있는 값 (매니저 번호, 스냅샷 stamp, 버전, 반복 규칙 버전, 재동기화 횟수) 반환"""
+        key = self._week_key(date_str) if kind == "week" else self._day_key(date_str)
+        self._sync_changes()
+        return (self.instance_id, self._snapshot_stamp(key), self._versions.get(key, 0), self.recurrence.version, self._generation)
+    
+    def _etag(self, data):
+        # 버전 카운터는 재시작/압축 때 달라지므로 문서 내용 자체로 ETag 를 만듦
+        digest = hashlib.sha1(
+            json.dumps(to_plain(data), ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        return f'"{digest[:20]}"'
+    
+    def get_document(self, kind, date_str):
+        """문서와 그 ETag 를 같은 시점 기준으로 함께 반환"""
+        key = self._week_key(date_str) if kind == "week" else self._day_key(date_str)
+        with self._doc_lock(key):
+            _, data = self._materialize(key)
+            return copy.deepcopy(data), self._etag(data)
+    
+    def cache_stats(self):
+        """문서 캐시 통계 반환"""
+        return self.cache.stats()
+    
+    def load_week_data(self, date_str):
+        """주간 투두리스트 로드 (반복 일정 포함)"""
+        key = self._week_key(date_str)
+        with self._doc_lock(key):
+            _, data = self._materialize(key)
+            return self._view(key, data)
+    
+    def save_week_data(self, date_str, data):
+        """주간 투두리스트 저장"""
+        key = self._week_key(date_str)
+        with self._write_lock(key):
+            self._apply(key, {"op": "put", "data": copy.deepcopy(data)})
+    
+    def load_day_data(self, date_str):
+        """일별 체크리스트 로드 (반복 일정 포함)"""
+        key = self._day_key(date_str)
+        with self._doc_lock(key):
+            _, data = self._materialize(key)
+            return self._view(key, data)
+    
+    def save_day_data(self, date_str, data):
+        """일별 체크리스트 저장"""
+        key = self._day_key(date_str)
+        with self._write_lock(key):
+            self._apply(key, {"op": "put", "data": copy.deepcopy(data)})
+    
+    def apply_operations(self, kind, date_str, operations):
+        """여러 변경 연산을 한 문서에 모아 적용하고 한 번만 저장
+        
+        operations 는 저널 레코드 형식({"op": "week_add", ...})의 목록이며,
+        변경이 있으면 최종 문서를 하나의 put 레코드로 기록합니다.
+        """
+        return self.update_document(kind, date_str, operations)[0]
+    
+    def update_document(self, kind, date_str, operations, if_match=None):
+        """apply_operations 와 같지만 (문서, ETag) 를 반환
+        
+        if_match 가 주어지면 현재 ETag 와 같을 때만 적용하고,
+        다르면 DocumentConflictError 를 발생시킵니다.
+        """
+        key = self._week_key(date_str) if kind == "week" else self._day_key(date_str)
+        with self._write_lock(key):
+            _, data = self._materialize(key)
+            if if_match is not None and if_match != "*" and if_match != self._etag(data):
+                raise DocumentConflictError(f"{kind} {key[1]} 문서가 그 사이에 변경되었습니다")
+            updated = copy.deepcopy(data)
+            for operation in operations:
+                apply_operation(updated, operation)
+            if updated != data:
+                data = self._apply(key, {"op": "put", "data": updated})
+            return copy.deepcopy(data), self._etag(data)
+    
+    def add_week_task(self, date_str, day, time_slot, task):
+        """주간 달력에 태스크 추가 (같은 텍스트도 새 id 로 추가), 변경된 문서 반환"""
+        key = self._week_key(date_str)
+        with self._write_lock(key):
+            if task:
+                self._apply(key, {
+                    "op": "week_add", "day": day, "slot": time_slot, "task": task, "id": new_task_id()
+                })
+        return self._lazy_view(key)
+    
+    def remove_week_task(self, date_str, day, time_slot, task_id):
+        """주간 달력에서 태스크 제거 (반복 일정은 그 날짜만 건너뜀), 변경된 문서 반환"""
+        key = self._week_key(date_str)
+        with self._write_lock(key):
+            _, data = self._materialize(key)
+            occurrence = parse_occurrence_id(task_id)
+            if occurrence is not None:
+                with self._recurrence_lock():
+                    self.recurrence.set_exception(*occurrence, "skip")
+            elif data["days"][day][time_slot].get(task_id) is not None:
+                self._apply(key, {"op": "week_remove", "day": day, "slot": time_slot, "id": task_id})
+        return self._lazy_view(key)
+    
+    def rename_week_task(self, date_str, day, time_slot, task_id, text):
+        """주간 태스크 이름 변경 (id 와 위치 유지), 변경된 문서 반환"""
+        key = self._week_key(date_str)
+        with self._write_lock(key):
+            _, data = self._materialize(key)
+            task = data["days"][day][time_slot].get(task_id)
+            if task is not None and text and task.text != text:
+                self._apply(key, {
+                    "op": "week_rename", "day": day, "slot": time_slot, "id": task_id, "text": text
+                })
+        return self._lazy_view(key)
+    
+    def add_day_checklist(self, date_str, checklist_item):
+        """일별 체크리스트 항목 추가, 변경된 문서 반환"""
+        key = self._day_key(date_str)
+        with self._write_lock(key):
+            if checklist_item:
+                self._apply(key, {"op": "day_add", "item": checklist_item, "id": new_task_id()})
+        return self._lazy_view(key)
+    
+    def complete_day_checklist(self, date_str, item_id):
+        """일별 체크리스트 항목 완료 (반복 일정은 그 날짜만 완료로 기록), 변경된 문서 반환"""
+        key = self._day_key(date_str)
+        with self._write_lock(key):
+            _, data = self._materialize(key)
+            occurrence = parse_occurrence_id(item_id)
+            if occurrence is not None:
+                with self._recurrence_lock():
+                    self.recurrence.set_exception(*occurrence, "complete")
+            elif data["checklist"].get(item_id) is not None:
+                self._apply(key, {"op": "day_complete", "id": item_id})
+        return self._lazy_view(key)
+    
+    def remove_day_checklist(self, date_str, item_id):
+        """일별 항목 삭제 (진행중/완료 모두, 반복 일정은 그 날짜만 건너뜀), 변경된 문서 반환"""
+        key = self._day_key(date_str)
+        with self._write_lock(key):
+            _, data = self._materialize(key)
+            occurrence = parse_occurrence_id(item_id)
+            if occurrence is not None:
+                with self._recurrence_lock():
+                    self.recurrence.set_exception(*occurrence, "skip")
+            elif data["checklist"].get(item_id) is not None or data["completed"].get(item_id) is not None:
+                self._apply(key, {"op": "day_remove", "id": item_id})
+        return self._lazy_view(key)
+    
+    def rename_day_checklist(self, date_str, item_id, text):
+        """일별 항목 이름 변경 (id 와 위치 유지), 변경된 문서 반환"""
+        key = self._day_key(date_str)
+        with self._write_lock(key):
+            _, data = self._materialize(key)
+            task = data["checklist"].get(item_id) or data["completed"].get(item_id)
+            if task is not None and text and task.text != text:
+                self._apply(key, {"op": "day_rename", "id": item_id, "text": text})
+        return self._lazy_view(key)
+    
+    def update_day_notes(self, date_str, notes):
+        """일별 노트 업데이트, 변경된 문서 반환"""
+        key = self._day_key(date_str)
+        with self._write_lock(key):
+            self._apply(key, {"op": "day_notes", "notes": notes})
+        return self._lazy_view(key)
+    
+    def list_recurrences(self):
+        """반복 일정 규칙 목록"""
+        self._sync_changes()
+        return self.recurrence.rules()
+    
+    def add_recurrence(self, text, target, start, freq="weekly", interval=1, weekdays=None,
+                       slot=None, until=None, rule_id=None, exceptions=None):
+        """반복 일정 규칙 추가 (문서 파일은 바뀌지 않음), 저장된 규칙 반환"""
+        with self._recurrence_lock():
+            max_rules = self.quota.max_rules if self.quota is not None else 0
+            if max_rules and len(self.recurrence) >= max_rules and (rule_id is None or self.recurrence.get(rule_id) is None):
+                raise QuotaExceededError(f"반복 일정은 {max_rules}개까지 저장할 수 있습니다")
+            return self.recurrence.add(text, target, start, freq, interval, weekdays, slot, until, rule_id, exceptions)
+    
+    def remove_recurrence(self, rule_id):
+        """반복 일정 규칙 삭제, 없으면 False"""
+        with self._recurrence_lock():
+            return self.recurrence.remove(rule_id)
+    
+    def set_occurrence_status(self, rule_id, date_str, status):
+        """반복 일정의 한 날짜만 건너뛰기('skip')/완료('complete') 처리, None 이면 되돌림"""
+        with self._recurrence_lock():
+            return self.recurrence.set_exception(rule_id, date_str, status)
+    
+    def format_day_display(self, data):
+        """일별 데이터 표시 형식 (반복 일정은 🔁 표시)"""
+        display = f"📋 {data['date']} 체크리스트\n\n"
+        display += "🔲 진행중:\n"
+        for item in data["checklist"]:
+            display += f"  • {'🔁 ' if item.recurring else ''}{item}\n"
+        
+        display += "\n✅ 완료됨:\n"
+        for completed in data["completed"]:
+            display += f"  • {'🔁 ' if completed.recurring else ''}{completed}\n"
+        
+        if data["notes"]:
+            display += f"\n📝 메모:\n{data['notes']}\n"
+        
+        return display
+    
+    def _get_executor(self):
+        with self._executor_guard:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.load_workers, thread_name_prefix="schedule-load"
+                )
+            return self._executor
+    
+    def _get_io_executor(self, kind):
+        with self._executor_guard:
+            executor = self._io_executors.get(kind)
+            if executor is None:
+                executor = self._io_executors[kind] = ThreadPoolExecutor(
+                    max_workers=self._io_workers[kind], thread_name_prefix=f"schedule-{kind}"
+                )
+            return executor
+    
+    async def run_async(self, func, *args, write=False, **kwargs):
+        """func 를 읽기/쓰기 스레드 풀에서 실행하고 결과를 기다림 (이벤트 루프를 막지 않음)
+        
+        호출한 쪽의 컨텍스트 변수(요청 사용자의 매니저 등)를 그대로 넘겨 실행합니다.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_io_executor("write" if write else "read")
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(executor, functools.partial(context.run, func, *args, **kwargs))
+    
+    def load_range(self, start_date, end_date, include_days=True):
+        """기간에 걸친 주간 문서와 저장된 일별 문서를 한 번에 병렬로 로드
+        
+        {"weeks": {월요일: 문서}, "days": {날짜: 문서}} 를 날짜 순으로 반환합니다.
+        """
+        week_starts = self.iter_week_starts(start_date, end_date)
+        day_dates = self.date_index.query("day", start_date, end_date)[0] if include_days else []
+        executor = self._get_executor()
+        week_futures = [(w, executor.submit(self.load_week_data, w)) for w in week_starts]
+        day_futures = [(d, executor.submit(self.load_day_data, d)) for d in day_dates]
+        return {
+            "weeks": {w: future.result() for w, future in week_futures},
+            "days": {d: future.result() for d, future in day_futures}
+        }
+    
+    def search(self, query, limit=100):
+        """주간 일정/체크리스트/메모 전체 검색"""
+        self._load_indexes()
+        self._refresh_indexes()
+        return self.search_index.search(query, limit)
+    
+    def get_available_dates(self):
+        """저장된 날짜 목록 반환"""
+        self._sync_changes()
+        return self.date_index.all("week"), self.date_index.all("day")
+    
+    def query_dates(self, kind, period="", offset=0, limit=None, latest_first=False):
+        """기간(예: '2025-Q2', '2025-06')과 페이지 조건으로 저장된 날짜 조회
+        
+        (날짜 목록, 조건에 맞는 전체 개수) 를 반환합니다.
+        """
+        self._sync_changes()
+        start, end = parse_period(period)
+        if kind == "week" and start:
+            # 기간 시작일이 속한 주도 포함
+            start = self.get_week_start(start)
+        return self.date_index.query(kind, start, end, offset, limit, latest_first)
+    
+    def analytics_summary(self, period=""):
+        """기간(예: '2025', '2025-Q2', '2025-06-01~2025-06-15')의 생산성 요약
+        
+        문서를 다시 읽지 않고 일/월/연 집계 합계에서 바로 계산합니다.
+        """
+        self._load_indexes()
+        self._refresh_indexes()
+        start, end = parse_period(period)
+        return self.analytics.summary(start, end)
+    
+    def analytics_by_month(self, period=""):
+        """기간에 걸친 월별 (월, 요약) 목록"""
+        self._load_indexes()
+        self._refresh_indexes()
+        start, end = parse_period(period)
+        return self.analytics.monthly(start, end)
+
+
+# 모든 공개 메서드의 호출 수/실행 시간 기록
+instrument_class(ScheduleManager, "manager")
+
+
+# 이벤트 루프에서 쓸 수 있도록 "<이름>_async" 비동기 버전을 만들 메서드
+ASYNC_READ_METHODS = (
+    "load_week_data", "load_day_data", "get_document", "load_range",
+    "search", "get_available_dates", "query_dates", "list_recurrences",
+    "analytics_summary", "analytics_by_month"
+)
+ASYNC_WRITE_METHODS = (
+    "save_week_data", "save_day_data", "apply_operations", "update_document",
+    "add_week_task", "remove_week_task", "rename_week_task",
+    "add_day_checklist", "complete_day_checklist", "remove_day_checklist", "rename_day_checklist",
+    "update_day_notes",
+    "add_recurrence", "remove_recurrence", "set_occurrence_status"
+)
+
+
+def _resolved(func, *args, **kwargs):
+    # 변경 메서드가 돌려준 DocumentView 를 스레드 풀 안에서 만들어 이벤트 루프가 파일을 읽지 않도록 함
+    result = func(*args, **kwargs)
+    return result.resolve() if isinstance(result, DocumentView) else result
+
+
+def _async_variant(name, write):
+    async def method(self, *args, **kwargs):
+        return await self.run_async(functools.partial(_resolved, getattr(self, name)), *args, write=write, **kwargs)
+    
+    method.__name__ = f"{name}_async"
+    method.__qualname__ = f"ScheduleManager.{name}_async"
+    method.__doc__ = f"{name} 의 비동기 버전 ({'쓰기' if write else '읽기'} 스레드 풀에서 실행)"
+    return method
+
+
+for _name in ASYNC_READ_METHODS:
+    setattr(ScheduleManager, f"{_name}_async", _async_variant(_name, False))
+for _name in ASYNC_WRITE_METHODS:
+    setattr(ScheduleManager, f"{_name}_async", _async_variant(_name, True))
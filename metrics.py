@@ -0,0 +1,177 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 버킷 (초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+HELP = {
+    "schedule_calls_total": "함수/이벤트 핸들러 호출 수",
+    "schedule_call_errors_total": "예외로 끝난 호출 수",
+    "schedule_call_duration_seconds": "함수/이벤트 핸들러 실행 시간",
+    "schedule_storage_seconds": "저장소 단계별 실행 시간 (read/parse/write)",
+    "schedule_storage_bytes_read_total": "저장소에서 읽은 바이트 수",
+    "schedule_storage_bytes_written_total": "저장소에 쓴 바이트 수",
+    "schedule_render_seconds": "HTML 렌더링 시간",
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class MetricsRegistry:
+    """카운터/히스토그램을 모아 Prometheus 텍스트 형식으로 내보내는 레지스트리"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, slow_call_ms=0.0):
+        self.buckets = buckets
+        # 이 시간(ms)보다 오래 걸린 호출을 출력, 0 이면 사용하지 않음
+        self.slow_call_ms = slow_call_ms
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels=(), value=1):
+        """카운터 증가"""
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        """히스토그램에 관측값 추가"""
+        key = (name, tuple(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+                    break
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    @contextmanager
+    def time(self, name, labels=()):
+        """with 블록의 실행 시간을 히스토그램에 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, labels, time.perf_counter() - started)
+
+    def register_collector(self, collector):
+        """내보낼 때마다 호출되는 수집 함수 등록
+
+        collector() 는 (이름, 타입, 설명, [(labels, 값), ...]) 목록을 반환해야 합니다.
+        """
+        self._collectors.append(collector)
+
+    def render(self):
+        """Prometheus 텍스트 형식 문자열 생성"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+        lines = []
+        emitted = set()
+
+        def header(name, metric_type, help_text=None):
+            if name in emitted:
+                return
+            emitted.add(name)
+            lines.append(f"# HELP {name} {help_text or HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_label_text(labels)} {value}")
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_label_text(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_bucket{_label_text(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_label_text(labels)} {total}")
+            lines.append(f"{name}_count{_label_text(labels)} {count}")
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                header(name, metric_type, help_text)
+                for labels, value in samples:
+                    lines.append(f"{name}{_label_text(tuple(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(slow_call_ms=float(os.environ.get("SCHEDULE_SLOW_CALL_MS", "0")))
+
+
+def timed(component, name, func):
+    """호출 수, 실행 시간, 예외 수를 기록하도록 함수를 감쌈 (코루틴 함수도 지원)"""
+    labels = (("component", component), ("name", name))
+
+    def record(started):
+        elapsed = time.perf_counter() - started
+        registry.inc("schedule_calls_total", labels)
+        registry.observe("schedule_call_duration_seconds", labels, elapsed)
+        if registry.slow_call_ms and elapsed * 1000 >= registry.slow_call_ms:
+            print(f"🐢 느린 호출: {component}.{name} {elapsed * 1000:.1f}ms")
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                registry.inc("schedule_call_errors_total", labels)
+                raise
+            finally:
+                record(started)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            registry.inc("schedule_call_errors_total", labels)
+            raise
+        finally:
+            record(started)
+
+    return wrapper
+
+
+def instrument_class(cls, component):
+    """클래스의 모든 공개 메서드에 timed 적용"""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not callable(attr):
+            continue
+        setattr(cls, name, timed(component, name, attr))
+    return cls
+
+
+def create_metrics_router(path="/metrics"):
+    """Prometheus 수집용 FastAPI 라우터 생성"""
+    from fastapi import APIRouter
+    from fastapi.responses import PlainTextResponse
+
+    router = APIRouter()
+
+    @router.get(path, response_class=PlainTextResponse)
+    def metrics_endpoint():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    return router
@@ -0,0 +1,376 @@
+"""반복 일정 규칙과 주 단위 전개
+
+규칙은 recurrence.json 에 한 번만 저장되고, 주간/일별 문서를 불러올 때 해당 주의
+날짜에 맞게 전개되어 문서 복사본에 덧붙습니다 (문서 파일에는 저장되지 않음).
+
+    {"id", "text", "target": "week"|"day", "slot": "오전" (week 만),
+     "freq": "daily"|"weekly", "interval": 1, "weekdays": ["월", "수"],
+     "start": "2025-06-02", "until": null, "exceptions": {"2025-06-04": "skip"|"complete"}}
+
+daily 는 start 부터 interval 일마다 (weekdays 가 있으면 그 요일만), weekly 는 start 가
+속한 주부터 interval 주마다 weekdays 의 요일에 발생합니다 (없으면 start 의 요일).
+발생 항목의 id 는 "<규칙 id>@<날짜>" 이며, 건너뛰기/완료는 규칙의 exceptions 에만 기록됩니다.
+예외 변경은 recurrence.log 에 한 줄씩 추가되고 compact() 에서 규칙 파일로 합쳐집니다.
+"""
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from coordination import temp_path
+from journal import read_log
+from storage import DAYS, TIME_SLOTS
+from tasks import DAY_LISTS, Task, TaskList, new_task_id
+
+RECURRENCE_VERSION = 1
+
+FREQUENCIES = ("daily", "weekly")
+TARGETS = ("week", "day")
+EXCEPTION_STATUSES = ("skip", "complete")
+
+RULE_ID = re.compile(r"[0-9A-Za-z_-]+")
+OCCURRENCE_ID = re.compile(r"(?P<rule>[0-9A-Za-z_-]+)@(?P<date>\d{4}-\d{2}-\d{2})")
+
+
+def occurrence_id(rule_id, date_str):
+    return f"{rule_id}@{date_str}"
+
+
+def parse_occurrence_id(task_id):
+    """발생 항목 id 면 (규칙 id, 날짜), 아니면 None"""
+    match = OCCURRENCE_ID.fullmatch(task_id or "")
+    return (match.group("rule"), match.group("date")) if match else None
+
+
+def _parse_date(date_str, field):
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} 날짜 형식이 올바르지 않습니다 (YYYY-MM-DD): {date_str}")
+
+
+class RecurringTask(Task):
+    """반복 규칙에서 전개된 항목 (done 은 해당 날짜에 완료 처리되었는지)"""
+
+    __slots__ = ("done",)
+
+    recurring = True
+
+    def __init__(self, task_id, text, done=False):
+        super().__init__(task_id, text)
+        self.done = done
+
+    def __repr__(self):
+        return f"RecurringTask({self.id!r}, {self.text!r}, done={self.done!r})"
+
+
+class RecurrenceRule:
+    """반복 규칙 하나"""
+
+    def __init__(self, rule_id, text, target, start, freq="weekly", interval=1,
+                 weekdays=None, slot=None, until=None, exceptions=None):
+        if not RULE_ID.fullmatch(rule_id or ""):
+            raise ValueError(f"규칙 id 는 영문/숫자/-/_ 만 사용할 수 있습니다: {rule_id}")
+        text = (text or "").strip()
+        if not text:
+            raise ValueError("반복 일정 내용을 입력해주세요")
+        if target not in TARGETS:
+            raise ValueError(f"알 수 없는 대상입니다: {target}")
+        if freq not in FREQUENCIES:
+            raise ValueError(f"알 수 없는 반복 주기입니다: {freq}")
+        if target == "week" and slot not in TIME_SLOTS:
+            raise ValueError(f"잘못된 시간대입니다: {slot}")
+        weekdays = list(weekdays or ())
+        for day in weekdays:
+            if day not in DAYS:
+                raise ValueError(f"잘못된 요일입니다: {day}")
+        interval = int(interval or 1)
+        if interval < 1:
+            raise ValueError("반복 간격은 1 이상이어야 합니다")
+        self.id = rule_id
+        self.text = text
+        self.target = target
+        self.slot = slot if target == "week" else None
+        self.freq = freq
+        self.interval = interval
+        self.start = _parse_date(start, "시작")
+        self.until = _parse_date(until, "종료") if until else None
+        if self.until is not None and self.until < self.start:
+            raise ValueError("종료일이 시작일보다 빠릅니다")
+        if freq == "weekly" and not weekdays:
+            weekdays = [DAYS[self.start.weekday()]]
+        self.weekdays = [day for day in DAYS if day in weekdays]
+        self._weekday_numbers = {DAYS.index(day) for day in self.weekdays}
+        self.exceptions = dict(exceptions or {})
+
+    @classmethod
+    def from_dict(cls, raw):
+        return cls(
+            raw["id"], raw["text"], raw["target"], raw["start"], raw.get("freq", "weekly"),
+            raw.get("interval", 1), raw.get("weekdays"), raw.get("slot"), raw.get("until"),
+            raw.get("exceptions")
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "text": self.text,
+            "target": self.target,
+            "slot": self.slot,
+            "freq": self.freq,
+            "interval": self.interval,
+            "weekdays": self.weekdays,
+            "start": self.start.strftime("%Y-%m-%d"),
+            "until": self.until.strftime("%Y-%m-%d") if self.until else None,
+            "exceptions": dict(sorted(self.exceptions.items()))
+        }
+
+    def occurs_on(self, date_obj):
+        """해당 날짜에 발생하는지 (예외와 관계없이)"""
+        if date_obj < self.start or (self.until is not None and date_obj > self.until):
+            return False
+        if self._weekday_numbers and date_obj.weekday() not in self._weekday_numbers:
+            return False
+        if self.freq == "daily":
+            return (date_obj - self.start).days % self.interval == 0
+        start_monday = self.start - timedelta(days=self.start.weekday())
+        monday = date_obj - timedelta(days=date_obj.weekday())
+        return ((monday - start_monday).days // 7) % self.interval == 0
+
+    def describe(self):
+        """사람이 읽을 수 있는 반복 설명"""
+        days = "·".join(self.weekdays)
+        if self.freq == "daily":
+            period = "매일" if self.interval == 1 else f"{self.interval}일마다"
+            if days:
+                period += f" ({days})"
+        else:
+            period = "매주" if self.interval == 1 else f"{self.interval}주마다"
+            period += f" {days}"
+        target = f"📅 {self.slot}" if self.target == "week" else "📋 체크리스트"
+        until = f" ~ {self.until.strftime('%Y-%m-%d')}" if self.until else ""
+        return f"{period} · {target} · {self.start.strftime('%Y-%m-%d')}부터{until}"
+
+
+class RecurrenceStore:
+    """반복 규칙 저장소와 주 단위 전개 결과 캐시
+
+    전개 결과는 주 시작일마다 캐시되며, 규칙이 추가/삭제되면 전체를,
+    발생 항목 예외가 바뀌면 해당 주만 무효화합니다.
+    version 은 규칙이나 예외가 바뀔 때마다 증가하므로 렌더 캐시 키에 사용할 수 있습니다.
+    """
+
+    def __init__(self, path, cache_size=128):
+        self.path = path
+        # 예외 변경 로그, 규칙 파일 전체를 다시 쓰지 않도록 [규칙 id, 날짜, 상태] 를 한 줄씩 추가
+        self.log_path = os.path.splitext(path)[0] + ".log"
+        self._logged = 0
+        self.cache_size = cache_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._rules = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rules)
+
+    def load(self):
+        """규칙 파일을 읽음, 없으면 빈 저장소"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return False
+        if raw.get("version", RECURRENCE_VERSION) > RECURRENCE_VERSION:
+            raise ValueError(f"지원하지 않는 반복 규칙 파일 버전입니다: {raw.get('version')}")
+        with self._lock:
+            self._rules = {}
+            for item in raw.get("rules", []):
+                try:
+                    rule = RecurrenceRule.from_dict(item)
+                except (KeyError, ValueError) as e:
+                    print(f"⚠️ 반복 규칙을 읽을 수 없습니다: {item.get('id')} ({e})")
+                    continue
+                self._rules[rule.id] = rule
+            records = read_log(self.log_path)
+            for record in records:
+                if not isinstance(record, list) or len(record) != 3:
+                    continue
+                rule_id, date_str, status = record
+                rule = self._rules.get(rule_id)
+                if rule is None:
+                    continue
+                if status is None:
+                    rule.exceptions.pop(date_str, None)
+                else:
+                    rule.exceptions[date_str] = status
+            self._logged = len(records)
+            self._changed()
+        return True
+
+    def rules(self):
+        """규칙 목록 (화면 표시용 description 포함)"""
+        with self._lock:
+            return [dict(rule.to_dict(), description=rule.describe()) for rule in self._rules.values()]
+
+    def get(self, rule_id):
+        with self._lock:
+            rule = self._rules.get(rule_id)
+            return rule.to_dict() if rule is not None else None
+
+    def add(self, text, target, start, freq="weekly", interval=1, weekdays=None, slot=None,
+            until=None, rule_id=None, exceptions=None):
+        """규칙을 추가하고 저장된 형태로 반환
+
+        같은 id 가 있으면 교체하며, exceptions 를 주지 않으면 기존 예외를 유지합니다.
+        """
+        rule = RecurrenceRule(
+            rule_id or new_task_id(), text, target, start, freq, interval, weekdays, slot, until, exceptions
+        )
+        with self._lock:
+            previous = self._rules.get(rule.id)
+            if previous is not None and exceptions is None:
+                rule.exceptions = previous.exceptions
+            self._rules[rule.id] = rule
+            self._changed()
+            self._save()
+            return rule.to_dict()
+
+    def remove(self, rule_id):
+        """규칙 삭제, 없으면 False"""
+        with self._lock:
+            if self._rules.pop(rule_id, None) is None:
+                return False
+            self._changed()
+            self._save()
+            return True
+
+    def set_exception(self, rule_id, date_str, status):
+        """한 발생 항목의 예외 설정 (status: 'skip', 'complete', None 이면 해제)
+
+        규칙이 없거나 그 날짜에 발생하지 않으면 False 를 반환합니다.
+        """
+        if status is not None and status not in EXCEPTION_STATUSES:
+            raise ValueError(f"알 수 없는 예외 상태입니다: {status}")
+        date_obj = _parse_date(date_str, "발생")
+        with self._lock:
+            rule = self._rules.get(rule_id)
+            if rule is None or not rule.occurs_on(date_obj):
+                return False
+            if rule.exceptions.get(date_str) == status:
+                return True
+            if status is None:
+                rule.exceptions.pop(date_str, None)
+            else:
+                rule.exceptions[date_str] = status
+            self._changed((date_obj - timedelta(days=date_obj.weekday())).strftime("%Y-%m-%d"))
+            self._append_log(rule_id, date_str, status)
+            return True
+
+    def compact(self, before=None):
+        """로그에 쌓인 예외를 규칙 파일에 합치고 로그 비우기, 로그가 비어 있으면 False
+
+        이때 규칙이 더 이상 발생하지 않는 날짜(시작일 이전, 종료일 이후, 바뀐 요일)와
+        before 보다 이전 날짜의 예외는 정리합니다.
+        """
+        with self._lock:
+            if not self._logged:
+                return False
+            pruned = False
+            for rule in self._rules.values():
+                exceptions = {
+                    date_str: status for date_str, status in rule.exceptions.items()
+                    if (before is None or date_str >= before) and rule.occurs_on(_parse_date(date_str, "발생"))
+                }
+                if len(exceptions) != len(rule.exceptions):
+                    rule.exceptions = exceptions
+                    pruned = True
+            if pruned:
+                self._changed()
+            self._save()
+            return True
+
+    def expand_week(self, week_start):
+        """주 시작일(월요일)의 발생 항목 전개 결과 (캐시)
+
+        {"week": {요일: {시간대: [RecurringTask]}}, "day": {날짜: [RecurringTask]}} 를 반환하며,
+        건너뛴 발생 항목은 빠지고 완료된 항목은 done 이 True 입니다. 결과는 공유되므로 수정하면 안 됩니다.
+        """
+        with self._lock:
+            cached = self._cache.get(week_start)
+            if cached is not None:
+                self._cache.move_to_end(week_start)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            monday = datetime.strptime(week_start, "%Y-%m-%d").date()
+            expansion = {"week": {}, "day": {}}
+            for offset, day in enumerate(DAYS):
+                date_obj = monday + timedelta(days=offset)
+                date_str = date_obj.strftime("%Y-%m-%d")
+                for rule in self._rules.values():
+                    if not rule.occurs_on(date_obj):
+                        continue
+                    status = rule.exceptions.get(date_str)
+                    if status == "skip":
+                        continue
+                    task = RecurringTask(occurrence_id(rule.id, date_str), rule.text, status == "complete")
+                    if rule.target == "week":
+                        expansion["week"].setdefault(day, {}).setdefault(rule.slot, []).append(task)
+                    else:
+                        expansion["day"].setdefault(date_str, []).append(task)
+            self._cache[week_start] = expansion
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return expansion
+
+    def _changed(self, week_start=None):
+        # self._lock 을 잡은 상태에서 호출
+        self.version += 1
+        if week_start is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(week_start, None)
+
+    def _save(self):
+        # self._lock 을 잡은 상태에서 호출
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = temp_path(self.path)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": RECURRENCE_VERSION,
+                "rules": [rule.to_dict() for rule in self._rules.values()]
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        # 규칙 파일에 모두 들어갔으므로 로그 비우기 (그 전에 중단되어도 다시 읽으면 같은 결과)
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self._logged = 0
+
+    def _append_log(self, rule_id, date_str, status):
+        # self._lock 을 잡은 상태에서 호출
+        folder = os.path.dirname(self.log_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps([rule_id, date_str, status], ensure_ascii=False) + "\n")
+        self._logged += 1
+
+
+def strip_occurrences(data):
+    """문서에 섞여 들어온 발생 항목을 제거 (전개된 문서를 그대로 저장하는 경우 대비)"""
+    if "days" in data:
+        lists = [tasks for slots in data["days"].values() for tasks in slots.values()]
+    else:
+        lists = [data[field] for field in DAY_LISTS if field in data]
+    for tasks in lists:
+        if isinstance(tasks, TaskList):
+            for task in [task for task in tasks if parse_occurrence_id(task.id)]:
+                tasks.remove(task.id)
+    return data
@@ -0,0 +1,311 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+
+from coordination import temp_path
+from journal import read_log
+from storage import DAYS
+
+INDEX_VERSION = 1
+
+# 로그가 이 크기(바이트)와 스냅샷 크기의 1/LOG_COMPACT_RATIO 중 큰 값을 넘어야 compact() 가 스냅샷을 다시 씀
+LOG_COMPACT_BYTES = 256 * 1024
+LOG_COMPACT_RATIO = 4
+
+# 일별 문서에서 검색 대상이 되는 필드와 표시 이름
+DAY_FIELDS = {"checklist": "진행중", "completed": "완료됨", "notes": "메모"}
+
+# 색인 토큰의 글자 수
+NGRAM_SIZE = 2
+
+_WORD_SPLIT = re.compile(r"[^\w]+")
+
+
+def normalize_text(text):
+    """검색용 정규화 (NFKC + 소문자)"""
+    return unicodedata.normalize("NFKC", str(text)).lower()
+
+
+def snapshot_due(log_bytes, snapshot_bytes, cursor, saved_cursor):
+    """compact() 에서 스냅샷을 다시 써야 하는지
+
+    로그가 스냅샷에 비해 충분히 커졌거나, 공유 모드에서 변경 알림 로그가 교체되어
+    스냅샷에 기록된 위치로는 곧 따라잡을 수 없게 되는 경우입니다.
+    """
+    if log_bytes and log_bytes >= max(LOG_COMPACT_BYTES, snapshot_bytes // LOG_COMPACT_RATIO):
+        return True
+    return cursor is not None and (saved_cursor is None or cursor[0] != saved_cursor[0])
+
+
+def tokenize(text, n=NGRAM_SIZE):
+    """한글에도 맞도록 단어별 글자 n-gram 토큰 집합 생성
+
+    n 보다 짧은 단어는 단어 자체를 토큰으로 사용합니다.
+    """
+    tokens = set()
+    for word in _WORD_SPLIT.split(normalize_text(text)):
+        if not word:
+            continue
+        if len(word) <= n:
+            tokens.add(word)
+            continue
+        for i in range(len(word) - n + 1):
+            tokens.add(word[i:i + n])
+    return tokens
+
+
+def document_entries(kind, data):
+    """문서에서 검색 대상 (위치, 텍스트) 집합 추출"""
+    entries = set()
+    if kind == "week":
+        for day, slots in data.get("days", {}).items():
+            for slot, tasks in slots.items():
+                for task in tasks:
+                    entries.add((f"{day}/{slot}", str(task)))
+    else:
+        for field in ("checklist", "completed"):
+            for item in data.get(field, []):
+                entries.add((field, str(item)))
+        if data.get("notes"):
+            entries.add(("notes", data["notes"]))
+    return entries
+
+
+def _has_entry(data, location, text):
+    """문서의 location 에 text 항목이 아직 있는지 (TaskList 의 텍스트 색인으로 확인)"""
+    if location == "notes":
+        return data.get("notes") == text
+    if "/" in location:
+        day, slot = location.split("/", 1)
+        return text in data["days"][day][slot]
+    return text in data[location]
+
+
+class SearchIndex:
+    """주간 일정, 일별 체크리스트/완료 항목, 메모에 대한 역색인
+
+    문서별 (위치, 텍스트) 목록을 스냅샷 파일에 두고, 저장될 때마다 추가/삭제된
+    항목만 로그 파일에 추가합니다. 로그는 compact() 에서 스냅샷으로 합쳐집니다.
+    load()/rebuild() 전(loaded 가 False)에는 변경을 로그에만 추가하고 나중에 load() 에서 반영합니다.
+    """
+
+    def __init__(self, base_dir):
+        self.snapshot_path = os.path.join(base_dir, "search_index.json")
+        self.log_path = os.path.join(base_dir, "search_index.log")
+        # (kind, key) -> {(위치, 텍스트)}
+        self._docs = {}
+        # 토큰 -> {(kind, key, 위치, 텍스트)}
+        self._postings = {}
+        self._lock = threading.Lock()
+        self._log = None
+        # 스냅샷과 로그를 읽었는지 (rebuild 포함)
+        self.loaded = False
+        # 공유 모드에서 스냅샷이 반영한 변경 알림 위치 (coordination.ChangeFeed)
+        self.cursor = None
+        # 스냅샷에 기록된 위치와 스냅샷/로그 크기, compact() 가 스냅샷을 다시 쓸지 판단
+        self._saved_cursor = None
+        self._snapshot_bytes = 0
+        self._log_bytes = 0
+
+    def load(self):
+        """스냅샷과 로그를 읽어 색인 복원, 스냅샷이 없으면 False"""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if raw.get("version") != INDEX_VERSION:
+            return False
+        with self._lock:
+            self.cursor = self._saved_cursor = raw.get("cursor")
+            self._docs = {}
+            self._postings = {}
+            for kind, key, entries in raw.get("docs", []):
+                self._replace((kind, key), {tuple(entry) for entry in entries})
+            for record in read_log(self.log_path):
+                doc = tuple(record["doc"])
+                if "entries" in record:
+                    self._replace(doc, {tuple(entry) for entry in record["entries"]})
+                else:
+                    entries = self._docs.get(doc, set())
+                    added = {tuple(entry) for entry in record["add"]}
+                    removed = {tuple(entry) for entry in record["del"]}
+                    self._change(doc, added - entries, removed & entries)
+            self._snapshot_bytes = os.path.getsize(self.snapshot_path)
+            self._log_bytes = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+            self._open_log()
+            self.loaded = True
+        return True
+
+    def rebuild(self, documents):
+        """(kind, key, 문서) 목록으로 색인 전체를 새로 만듦"""
+        with self._lock:
+            self._docs = {}
+            self._postings = {}
+            for kind, key, data in documents:
+                self._replace((kind, key), document_entries(kind, data))
+            self._write_snapshot()
+            self.loaded = True
+
+    def update_document(self, kind, key, data):
+        """문서 전체로 색인을 다시 계산 (put, 다른 프로세스의 변경 반영), 바뀌었으면 문서의 모든 항목을 로그에 추가"""
+        entries = document_entries(kind, data)
+        doc = (kind, key)
+        with self._lock:
+            if self.loaded:
+                if self._docs.get(doc, set()) == entries:
+                    return False
+                self._replace(doc, entries)
+            self._write_log({"doc": [kind, key], "entries": sorted(entries)})
+        return True
+
+    def apply_changes(self, kind, key, data, changes):
+        """apply_operation 이 기록한 항목 변경만큼 색인을 갱신하고 추가/삭제된 항목만 로그에 추가
+
+        data 는 변경이 적용된 문서로, 같은 위치에 같은 텍스트의 항목이 남아 있으면 지우지 않습니다.
+        """
+        added = set()
+        removed = set()
+        for location, old, new in changes:
+            if old is not None and not _has_entry(data, location, old):
+                removed.add((location, old))
+            if new is not None and (new or location != "notes"):
+                added.add((location, new))
+        doc = (kind, key)
+        with self._lock:
+            if self.loaded:
+                entries = self._docs.get(doc, set())
+                added -= entries
+                removed &= entries
+            if not added and not removed:
+                return False
+            if self.loaded:
+                self._change(doc, added, removed)
+            self._write_log({"doc": [kind, key], "add": sorted(added), "del": sorted(removed)})
+        return True
+
+    def compact(self, force=False):
+        """로그가 충분히 쌓였으면 스냅샷에 합치고 로그 비우기, 다시 썼으면 True
+
+        스냅샷은 모든 항목을 담아 전체 데이터만큼 크므로 바뀐 것이 적으면 로그를 그대로 둡니다
+        (로그는 load() 에서 재생됨). force 이면 항상 다시 씁니다.
+        """
+        with self._lock:
+            if not self.loaded:
+                return False
+            if not force and not snapshot_due(self._log_bytes, self._snapshot_bytes, self.cursor, self._saved_cursor):
+                return False
+            self._write_snapshot()
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def search(self, query, limit=100):
+        """검색어를 포함하는 항목을 날짜 최신순으로 반환
+
+        각 결과는 {"date", "kind", "location", "text"} 딕셔너리입니다.
+        """
+        needle = normalize_text(query).strip()
+        if not needle:
+            return []
+        # NGRAM_SIZE 보다 짧은 단어는 더 긴 단어의 일부일 수 있으므로 후보를 좁히는 데 쓰지 않음
+        tokens = [token for token in tokenize(query) if len(token) >= NGRAM_SIZE]
+        with self._lock:
+            if not tokens:
+                # 한 글자 검색어처럼 쓸 토큰이 없으면 모든 항목을 확인
+                candidates = {doc + entry for doc, entries in self._docs.items() for entry in entries}
+            else:
+                postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+                candidates = set(postings[0])
+                for posting in postings[1:]:
+                    candidates &= posting
+                    if not candidates:
+                        break
+        results = []
+        for kind, key, location, text in candidates:
+            # n-gram 교집합은 후보일 뿐이므로 실제 포함 여부 확인
+            if needle not in normalize_text(text):
+                continue
+            results.append({
+                "date": _entry_date(kind, key, location),
+                "kind": kind,
+                "location": location,
+                "text": text
+            })
+        results.sort(key=lambda r: (r["date"], r["location"]), reverse=True)
+        return results[:limit]
+
+    def _replace(self, doc, entries):
+        old_entries = self._docs.get(doc, set())
+        self._change(doc, entries - old_entries, old_entries - entries)
+
+    def _change(self, doc, added, removed):
+        entries = self._docs.setdefault(doc, set())
+        for location, text in removed:
+            posting_entry = doc + (location, text)
+            for token in tokenize(text):
+                posting = self._postings.get(token)
+                if posting is not None:
+                    posting.discard(posting_entry)
+                    if not posting:
+                        del self._postings[token]
+            entries.discard((location, text))
+        for location, text in added:
+            posting_entry = doc + (location, text)
+            for token in tokenize(text):
+                self._postings.setdefault(token, set()).add(posting_entry)
+            entries.add((location, text))
+        if not entries:
+            del self._docs[doc]
+
+    def _write_log(self, record):
+        if self._log is None:
+            self._open_log()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._log.write(line)
+        self._log.flush()
+        self._log_bytes += len(line.encode('utf-8'))
+
+    def _open_log(self):
+        if self._log is not None:
+            self._log.close()
+        folder = os.path.dirname(self.log_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+
+    def _write_snapshot(self):
+        tmp_path = temp_path(self.snapshot_path)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "cursor": self.cursor,
+                "docs": [[kind, key, sorted(entries)] for (kind, key), entries in self._docs.items()]
+            }, f, ensure_ascii=False)
+        self._snapshot_bytes = os.path.getsize(tmp_path)
+        os.replace(tmp_path, self.snapshot_path)
+        self._saved_cursor = self.cursor
+        if self._log is not None:
+            self._log.close()
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self._log_bytes = 0
+        self._open_log()
+
+
+def _entry_date(kind, key, location):
+    """주간 항목은 요일을 실제 날짜로 바꿔서 반환"""
+    if kind != "week":
+        return key
+    day = location.split("/", 1)[0]
+    if day not in DAYS:
+        return key
+    monday = datetime.strptime(key, "%Y-%m-%d")
+    return (monday + timedelta(days=DAYS.index(day))).strftime("%Y-%m-%d")
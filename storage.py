@@ -0,0 +1,527 @@
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from archive import ArchiveStore
+from metrics import registry
+
+DAYS = ["월", "화", "수", "목", "금", "토", "일"]
+TIME_SLOTS = ["오전", "오후", "저녁"]
+
+
+class StorageBackend:
+    """주간/일별 문서 저장소 인터페이스
+
+    week_start 는 해당 주 월요일 날짜(YYYY-MM-DD), date_str 는 일별 날짜입니다.
+    stamp 는 문서가 바뀌었는지 판단하는 값으로, 문서가 없으면 None 을 반환합니다.
+    """
+
+    def week_stamp(self, week_start):
+        raise NotImplementedError
+
+    def day_stamp(self, date_str):
+        raise NotImplementedError
+
+    def read_week(self, week_start):
+        raise NotImplementedError
+
+    def write_week(self, week_start, data):
+        raise NotImplementedError
+
+    def read_day(self, date_str):
+        raise NotImplementedError
+
+    def write_day(self, date_str, data):
+        raise NotImplementedError
+
+    def list_week_starts(self):
+        raise NotImplementedError
+
+    def list_day_dates(self):
+        raise NotImplementedError
+
+    def index_signature(self):
+        """외부에서 저장소가 바뀌었는지 판단하기 위한 값 (모르면 None)"""
+        return None
+
+    # 오래된 문서를 압축 보관하는 ArchiveStore, 지원하지 않는 저장소는 None
+    archive = None
+
+    def close(self):
+        pass
+
+
+class JsonFileBackend(StorageBackend):
+    """JSON 파일 저장소, 연/월 단위로 나눈 디렉토리 구조
+
+    week/2025/06/2025-06-02_week.json, day/2025/06/2025-06-06.json 형태로 저장하며,
+    예전 평면 구조(week/<월요일>_week.json, day/<날짜>/<날짜>.json)도 그대로 읽습니다.
+    예전 구조의 문서는 다시 저장될 때 새 구조로 옮겨집니다.
+    오래된 문서는 archive/<연도>.archive 로 옮겨 보관할 수 있으며, 같은 문서의
+    개별 파일이 있으면 개별 파일이 우선합니다 (보관 후 다시 수정된 경우).
+    """
+
+    WEEK_SUFFIX = "_week.json"
+    DAY_SUFFIX = ".json"
+
+    def __init__(self, base_dir="schedule_data"):
+        self.base_dir = base_dir
+        self.week_dir = os.path.join(base_dir, "week")
+        self.day_dir = os.path.join(base_dir, "day")
+        os.makedirs(self.week_dir, exist_ok=True)
+        os.makedirs(self.day_dir, exist_ok=True)
+        self.archive = ArchiveStore(os.path.join(base_dir, "archive"))
+
+    def _shard_dir(self, root, date_str):
+        return os.path.join(root, date_str[:4], date_str[5:7])
+
+    def week_path(self, week_start):
+        return os.path.join(self._shard_dir(self.week_dir, week_start), f"{week_start}{self.WEEK_SUFFIX}")
+
+    def day_path(self, date_str):
+        return os.path.join(self._shard_dir(self.day_dir, date_str), f"{date_str}{self.DAY_SUFFIX}")
+
+    def legacy_week_path(self, week_start):
+        return os.path.join(self.week_dir, f"{week_start}{self.WEEK_SUFFIX}")
+
+    def legacy_day_path(self, date_str):
+        return os.path.join(self.day_dir, date_str, f"{date_str}{self.DAY_SUFFIX}")
+
+    def _stamp(self, filepath):
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self, filepath):
+        try:
+            with registry.time("schedule_storage_seconds", (("backend", "json"), ("stage", "read"))):
+                with open(filepath, 'rb') as f:
+                    raw = f.read()
+        except FileNotFoundError:
+            return None
+        registry.inc("schedule_storage_bytes_read_total", (("backend", "json"),), len(raw))
+        with registry.time("schedule_storage_seconds", (("backend", "json"), ("stage", "parse"))):
+            return json.loads(raw.decode('utf-8'))
+
+    def _write(self, filepath, data):
+        """임시 파일에 쓴 뒤 rename 으로 교체하여 반쯤 쓰인 파일이 남지 않도록 저장"""
+        folder = os.path.dirname(filepath)
+        os.makedirs(folder, exist_ok=True)
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=".json")
+        try:
+            with registry.time("schedule_storage_seconds", (("backend", "json"), ("stage", "write"))):
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(raw)
+                os.replace(tmp_path, filepath)
+            registry.inc("schedule_storage_bytes_written_total", (("backend", "json"),), len(raw))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remove_legacy(self, legacy_path, remove_folder=False):
+        """새 구조로 저장한 뒤 남아 있는 예전 구조 파일 정리"""
+        try:
+            os.remove(legacy_path)
+        except FileNotFoundError:
+            return
+        if remove_folder:
+            try:
+                os.rmdir(os.path.dirname(legacy_path))
+            except OSError:
+                pass
+
+    def loose_stamp(self, kind, name):
+        """아카이브가 아닌 개별 파일의 stamp, 없으면 None"""
+        if kind == "week":
+            stamp = self._stamp(self.week_path(name))
+            return stamp if stamp is not None else self._stamp(self.legacy_week_path(name))
+        stamp = self._stamp(self.day_path(name))
+        return stamp if stamp is not None else self._stamp(self.legacy_day_path(name))
+
+    def week_stamp(self, week_start):
+        stamp = self.loose_stamp("week", week_start)
+        if stamp is None:
+            stamp = self.archive.stamp("week", week_start)
+        return stamp
+
+    def day_stamp(self, date_str):
+        stamp = self.loose_stamp("day", date_str)
+        if stamp is None:
+            stamp = self.archive.stamp("day", date_str)
+        return stamp
+
+    def read_week(self, week_start):
+        data = self._read(self.week_path(week_start))
+        if data is None:
+            data = self._read(self.legacy_week_path(week_start))
+        if data is None:
+            data = self.archive.read("week", week_start)
+        return data
+
+    def write_week(self, week_start, data):
+        self._write(self.week_path(week_start), data)
+        self._remove_legacy(self.legacy_week_path(week_start))
+
+    def read_day(self, date_str):
+        data = self._read(self.day_path(date_str))
+        if data is None:
+            data = self._read(self.legacy_day_path(date_str))
+        if data is None:
+            data = self.archive.read("day", date_str)
+        return data
+
+    def write_day(self, date_str, data):
+        self._write(self.day_path(date_str), data)
+        self._remove_legacy(self.legacy_day_path(date_str), remove_folder=True)
+
+    def archive_documents(self, year, documents):
+        """{(kind, 날짜): 문서} 를 연도 아카이브에 추가 (개별 파일은 remove_loose 로 따로 삭제)"""
+        return self.archive.pack(year, documents)
+
+    def remove_loose(self, kind, name, stamp):
+        """아카이브로 옮긴 문서의 개별 파일 삭제, 그 사이 파일이 바뀌었으면 남겨 두고 False"""
+        if self.loose_stamp(kind, name) != stamp:
+            return False
+        if kind == "week":
+            self._remove_legacy(self.week_path(name))
+            self._remove_legacy(self.legacy_week_path(name))
+        else:
+            self._remove_legacy(self.day_path(name))
+            self._remove_legacy(self.legacy_day_path(name), remove_folder=True)
+        return True
+
+    def _shard_dirs(self, root):
+        """root 아래의 (연, 월) 샤드 디렉토리 목록"""
+        shards = []
+        for year in sorted(os.listdir(root)):
+            year_dir = os.path.join(root, year)
+            if len(year) != 4 or not year.isdigit() or not os.path.isdir(year_dir):
+                continue
+            for month in sorted(os.listdir(year_dir)):
+                month_dir = os.path.join(year_dir, month)
+                if os.path.isdir(month_dir):
+                    shards.append(month_dir)
+        return shards
+
+    def _list_sharded(self, root, suffix):
+        names = []
+        for shard in self._shard_dirs(root):
+            names.extend(f[:-len(suffix)] for f in os.listdir(shard) if f.endswith(suffix) and not f.startswith("."))
+        return names
+
+    def _legacy_week_starts(self):
+        return [
+            f[:-len(self.WEEK_SUFFIX)] for f in os.listdir(self.week_dir)
+            if f.endswith(self.WEEK_SUFFIX) and os.path.isfile(os.path.join(self.week_dir, f))
+        ]
+
+    def _legacy_day_dates(self):
+        # 예전 구조의 날짜 폴더 (YYYY-MM-DD), 연도 샤드(YYYY)와 구분
+        return [
+            d for d in os.listdir(self.day_dir)
+            if len(d) == 10 and os.path.isdir(os.path.join(self.day_dir, d))
+        ]
+
+    def list_week_starts(self):
+        if not os.path.exists(self.week_dir):
+            return []
+        names = set(self._list_sharded(self.week_dir, self.WEEK_SUFFIX))
+        names.update(self._legacy_week_starts())
+        names.update(self.archive.names("week"))
+        return sorted(names)
+
+    def list_day_dates(self):
+        if not os.path.exists(self.day_dir):
+            return []
+        names = set(self._list_sharded(self.day_dir, self.DAY_SUFFIX))
+        names.update(self._legacy_day_dates())
+        names.update(self.archive.names("day"))
+        return sorted(names)
+
+    def index_signature(self):
+        # 문서가 추가/삭제되면 해당 디렉토리 mtime 이 바뀜 (샤드 개수는 연*12 로 제한됨)
+        folders = [self.week_dir, self.day_dir]
+        folders += self._shard_dirs(self.week_dir) + self._shard_dirs(self.day_dir)
+        return [[folder] + list(self._stamp(folder) or ()) for folder in folders] + self.archive.signature()
+
+    def close(self):
+        self.archive.close()
+
+
+def shard_json_tree(base_dir):
+    """예전 평면 구조의 JSON 문서를 연/월 샤드 구조로 일괄 이동"""
+    backend = JsonFileBackend(base_dir)
+    week_count = 0
+    day_count = 0
+    for week_start in backend._legacy_week_starts():
+        data = backend._read(backend.legacy_week_path(week_start))
+        if data is not None:
+            backend.write_week(week_start, data)
+            week_count += 1
+    for date_str in backend._legacy_day_dates():
+        data = backend._read(backend.legacy_day_path(date_str))
+        if data is not None:
+            backend.write_day(date_str, data)
+            day_count += 1
+        else:
+            # 문서 없이 빈 폴더만 남아 있던 경우
+            try:
+                os.rmdir(os.path.join(backend.day_dir, date_str))
+            except OSError:
+                pass
+    return week_count, day_count
+
+
+class SqliteBackend(StorageBackend):
+    """sqlite3 기반 저장소 (WAL 모드, 날짜/요일/시간대 인덱스)"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS weeks (
+        week_start TEXT PRIMARY KEY,
+        rev INTEGER NOT NULL DEFAULT 0,
+        extra TEXT NOT NULL DEFAULT '{}'
+    );
+    CREATE TABLE IF NOT EXISTS week_tasks (
+        week_start TEXT NOT NULL,
+        day TEXT NOT NULL,
+        slot TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        task TEXT NOT NULL,
+        task_id TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_week_tasks ON week_tasks(week_start, day, slot, position);
+    CREATE TABLE IF NOT EXISTS days (
+        date TEXT PRIMARY KEY,
+        rev INTEGER NOT NULL DEFAULT 0,
+        notes TEXT NOT NULL DEFAULT '',
+        extra TEXT NOT NULL DEFAULT '{}'
+    );
+    CREATE TABLE IF NOT EXISTS day_items (
+        date TEXT NOT NULL,
+        status TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        item TEXT NOT NULL,
+        item_id TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_day_items ON day_items(date, status, position);
+    """
+
+    # 일별 문서에서 day_items 테이블로 분리 저장되는 목록들
+    DAY_LISTS = ("checklist", "completed")
+
+    def __init__(self, db_path="schedule_data/schedule.db"):
+        self.db_path = db_path
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        # id 열이 없던 예전 데이터베이스에 열 추가 (기존 행의 id 는 읽을 때 만들어짐)
+        for table, column in (("week_tasks", "task_id"), ("day_items", "item_id")):
+            columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+
+    def _rev(self, table, column, key):
+        with self._lock:
+            row = self.conn.execute(f"SELECT rev FROM {table} WHERE {column} = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def week_stamp(self, week_start):
+        return self._rev("weeks", "week_start", week_start)
+
+    def day_stamp(self, date_str):
+        return self._rev("days", "date", date_str)
+
+    def read_week(self, week_start):
+        with self._lock, registry.time("schedule_storage_seconds", (("backend", "sqlite"), ("stage", "read"))):
+            row = self.conn.execute("SELECT extra FROM weeks WHERE week_start = ?", (week_start,)).fetchone()
+            if row is None:
+                return None
+            tasks = self.conn.execute(
+                "SELECT day, slot, task, task_id FROM week_tasks WHERE week_start = ? ORDER BY day, slot, position",
+                (week_start,)
+            ).fetchall()
+        data = json.loads(row[0])
+        days = data.setdefault("days", {})
+        for day in DAYS:
+            days.setdefault(day, {slot: [] for slot in TIME_SLOTS})
+        for day, slot, task, task_id in tasks:
+            days.setdefault(day, {}).setdefault(slot, []).append(_item(task, task_id))
+        return data
+
+    def write_week(self, week_start, data):
+        with self._lock, self.conn, registry.time("schedule_storage_seconds", (("backend", "sqlite"), ("stage", "write"))):
+            self.conn.execute("BEGIN")
+            self._write_week(week_start, data)
+
+    def _write_week(self, week_start, data):
+        extra = {k: v for k, v in data.items() if k != "days"}
+        extra["days"] = {day: {slot: [] for slot in slots} for day, slots in data["days"].items()}
+        rows = [
+            (week_start, day, slot, position) + _item_columns(task)
+            for day, slots in data["days"].items()
+            for slot, tasks in slots.items()
+            for position, task in enumerate(tasks)
+        ]
+        self.conn.execute(
+            "INSERT INTO weeks (week_start, rev, extra) VALUES (?, 1, ?) "
+            "ON CONFLICT(week_start) DO UPDATE SET rev = rev + 1, extra = excluded.extra",
+            (week_start, json.dumps(extra, ensure_ascii=False))
+        )
+        self.conn.execute("DELETE FROM week_tasks WHERE week_start = ?", (week_start,))
+        self.conn.executemany("INSERT INTO week_tasks VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def read_day(self, date_str):
+        with self._lock, registry.time("schedule_storage_seconds", (("backend", "sqlite"), ("stage", "read"))):
+            row = self.conn.execute("SELECT notes, extra FROM days WHERE date = ?", (date_str,)).fetchone()
+            if row is None:
+                return None
+            items = self.conn.execute(
+                "SELECT status, item, item_id FROM day_items WHERE date = ? ORDER BY status, position",
+                (date_str,)
+            ).fetchall()
+        data = json.loads(row[1])
+        for name in self.DAY_LISTS:
+            data[name] = []
+        for status, item, item_id in items:
+            data.setdefault(status, []).append(_item(item, item_id))
+        data["notes"] = row[0]
+        return data
+
+    def write_day(self, date_str, data):
+        with self._lock, self.conn, registry.time("schedule_storage_seconds", (("backend", "sqlite"), ("stage", "write"))):
+            self.conn.execute("BEGIN")
+            self._write_day(date_str, data)
+
+    def _write_day(self, date_str, data):
+        extra = {k: v for k, v in data.items() if k not in self.DAY_LISTS and k != "notes"}
+        rows = [
+            (date_str, name, position) + _item_columns(item)
+            for name in self.DAY_LISTS
+            for position, item in enumerate(data.get(name, []))
+        ]
+        self.conn.execute(
+            "INSERT INTO days (date, rev, notes, extra) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT(date) DO UPDATE SET rev = rev + 1, notes = excluded.notes, extra = excluded.extra",
+            (date_str, data.get("notes", ""), json.dumps(extra, ensure_ascii=False))
+        )
+        self.conn.execute("DELETE FROM day_items WHERE date = ?", (date_str,))
+        self.conn.executemany("INSERT INTO day_items VALUES (?, ?, ?, ?, ?)", rows)
+
+    def list_week_starts(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT week_start FROM weeks ORDER BY week_start").fetchall()
+        return [r[0] for r in rows]
+
+    def list_day_dates(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT date FROM days ORDER BY date").fetchall()
+        return [r[0] for r in rows]
+
+    def index_signature(self):
+        with self._lock:
+            weeks = self.conn.execute("SELECT COUNT(*), MAX(week_start) FROM weeks").fetchone()
+            days = self.conn.execute("SELECT COUNT(*), MAX(date) FROM days").fetchone()
+        return [list(weeks), list(days)]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def _item(text, item_id):
+    """행을 문서 항목으로 변환, id 가 없는 예전 행은 문자열 그대로"""
+    return {"id": item_id, "text": text} if item_id else text
+
+
+def _item_columns(item):
+    """문서 항목(문자열 또는 {"id", "text"})을 (텍스트, id) 열 값으로 변환"""
+    if isinstance(item, dict):
+        return (item["text"], item.get("id"))
+    return (item, None)
+
+
+def create_backend(kind="json", base_dir="schedule_data"):
+    """이름으로 저장소 백엔드 생성 ('json' 또는 'sqlite')"""
+    if kind == "json":
+        return JsonFileBackend(base_dir)
+    if kind == "sqlite":
+        return SqliteBackend(os.path.join(base_dir, "schedule.db"))
+    raise ValueError(f"알 수 없는 저장소 종류입니다: {kind}")
+
+
+def migrate_json_to_sqlite(src_dir, db_path):
+    """기존 schedule_data JSON 트리를 SQLite 데이터베이스로 일괄 변환"""
+    source = JsonFileBackend(src_dir)
+    target = SqliteBackend(db_path)
+    week_count = 0
+    day_count = 0
+    try:
+        # 전체 변환을 하나의 트랜잭션으로 처리
+        with target._lock, target.conn:
+            target.conn.execute("BEGIN")
+            for week_start in source.list_week_starts():
+                data = source.read_week(week_start)
+                if data is not None:
+                    target._write_week(week_start, data)
+                    week_count += 1
+            for date_str in source.list_day_dates():
+                data = source.read_day(date_str)
+                if data is not None:
+                    target._write_day(date_str, data)
+                    day_count += 1
+    finally:
+        target.close()
+    return week_count, day_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="schedule_data 저장소 마이그레이션 도구")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    sqlite_parser = commands.add_parser("to-sqlite", help="JSON 트리를 SQLite로 일괄 변환")
+    sqlite_parser.add_argument("--src", default="schedule_data", help="기존 JSON 데이터 디렉토리")
+    sqlite_parser.add_argument("--db", default=os.path.join("schedule_data", "schedule.db"), help="생성할 SQLite 파일 경로")
+    
+    shard_parser = commands.add_parser("shard", help="예전 평면 JSON 구조를 연/월 샤드 구조로 이동")
+    shard_parser.add_argument("--src", default="schedule_data", help="JSON 데이터 디렉토리")
+    
+    archive_parser = commands.add_parser("archive", help="오래된 문서를 연도별 압축 아카이브로 이동")
+    archive_parser.add_argument("--src", default="schedule_data", help="JSON 데이터 디렉토리")
+    archive_parser.add_argument("--older-than-days", type=int, default=365, help="이 일수보다 오래된 문서를 이동")
+    
+    upgrade_parser = commands.add_parser("upgrade", help="예전 형식 문서를 현재 schema(항목 id 포함)로 다시 저장")
+    upgrade_parser.add_argument("--src", default="schedule_data", help="데이터 디렉토리")
+    upgrade_parser.add_argument("--backend", default=os.environ.get("SCHEDULE_BACKEND", "json"), help="저장소 종류 (json/sqlite)")
+    
+    args = parser.parse_args()
+    if args.command in ("archive", "upgrade"):
+        from manager import ScheduleManager
+        
+        backend = JsonFileBackend(args.src) if args.command == "archive" else create_backend(args.backend, args.src)
+        manager = ScheduleManager(args.src, backend=backend, compact_interval=0)
+        try:
+            if args.command == "archive":
+                weeks, days = manager.archive_old_documents(args.older_than_days)
+                print(f"🗄️ 아카이브 완료: 주간 {weeks}개, 일별 {days}개")
+            else:
+                print(f"✅ schema 변환 완료: 문서 {manager.upgrade_documents()}개")
+        finally:
+            manager.close()
+    else:
+        if args.command == "to-sqlite":
+            weeks, days = migrate_json_to_sqlite(args.src, args.db)
+        else:
+            weeks, days = shard_json_tree(args.src)
+        print(f"✅ 마이그레이션 완료: 주간 {weeks}개, 일별 {days}개")
@@ -0,0 +1,168 @@
+"""여러 프로세스가 공유 모드 저장소를 동시에 수정해도 변경이 유실되지 않는지 확인
+
+임시 디렉토리에 공유 모드(shared=True) 저장소를 만들고, 별도 프로세스들이 소수의 같은
+문서에 동시에 항목을 추가/완료합니다. 모두 끝나면 다음을 확인합니다.
+
+- 새로 연 매니저에 모든 프로세스가 추가/완료한 항목이 빠짐없이, 중복 없이 있는지
+- 처음부터 열려 있던 매니저(다른 워커 역할)의 캐시, 검색 색인, 통계가 변경 알림으로 갱신되었는지
+
+    python stress_shared.py --processes 4 --ops 200
+    python stress_shared.py --backend sqlite --days 1
+
+하나라도 어긋나면 종료 코드 1 을 반환합니다.
+"""
+import argparse
+import multiprocessing
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from manager import ScheduleManager
+from storage import DAYS, TIME_SLOTS, create_backend
+
+
+def _open(base_dir, backend_kind):
+    return ScheduleManager(base_dir, backend=create_backend(backend_kind, base_dir), compact_interval=0, shared=True)
+
+
+def _dates(start, days):
+    first = datetime.strptime(start, "%Y-%m-%d")
+    return [(first + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days)]
+
+
+def worker(base_dir, backend_kind, worker_id, ops, dates, seed, barrier, results):
+    """항목을 추가/완료하고 기대 결과 목록을 results 큐로 보냄"""
+    rng = random.Random(seed + worker_id)
+    manager = _open(base_dir, backend_kind)
+    expected = []
+    added = []
+    barrier.wait()
+    begin = time.perf_counter()
+    try:
+        for i in range(ops):
+            text = f"p{worker_id}-{i}"
+            choice = rng.random()
+            if choice < 0.4:
+                date_str = rng.choice(dates)
+                day, slot = rng.choice(DAYS), rng.choice(TIME_SLOTS)
+                manager.add_week_task(date_str, day, slot, text)
+                expected.append(("week", manager.get_week_start(date_str), day, slot, text, False))
+            elif choice < 0.8 or not added:
+                date_str = rng.choice(dates)
+                data = manager.add_day_checklist(date_str, text)
+                added.append((len(expected), date_str, data["checklist"].find(text).id))
+                expected.append(("day", date_str, None, None, text, False))
+            else:
+                # 자기가 추가한 항목 하나를 완료 (다른 프로세스의 변경과 같은 문서에서 섞임)
+                index, date_str, item_id = added.pop(rng.randrange(len(added)))
+                manager.complete_day_checklist(date_str, item_id)
+                expected[index] = expected[index][:5] + (True,)
+    finally:
+        elapsed = time.perf_counter() - begin
+        manager.close()
+    results.put((worker_id, elapsed, expected))
+
+
+def verify(manager, expected, label):
+    """expected 의 항목이 manager 에서 모두 보이는지 확인하고 문제 목록 반환"""
+    problems = []
+    weeks = {}
+    days = {}
+    for kind, name, day, slot, text, done in expected:
+        if kind == "week":
+            weeks.setdefault(name, []).append((day, slot, text))
+        else:
+            days.setdefault(name, []).append((text, done))
+    for week_start, tasks in weeks.items():
+        data = manager.load_week_data(week_start)
+        stored = sorted((day, slot, task.text) for day in DAYS for slot in TIME_SLOTS for task in data["days"][day][slot])
+        if stored != sorted(tasks):
+            missing = len(set(tasks) - set(stored))
+            problems.append(f"{label}: {week_start} 주간 일정 {len(stored)}개 (기대 {len(tasks)}개, 빠짐 {missing}개)")
+    for date_str, items in days.items():
+        data = manager.load_day_data(date_str)
+        stored = sorted([(item.text, False) for item in data["checklist"]] + [(item.text, True) for item in data["completed"]])
+        if stored != sorted(items):
+            missing = len(set(items) - set(stored))
+            problems.append(f"{label}: {date_str} 체크리스트 {len(stored)}개 (기대 {len(items)}개, 다름 {missing}개)")
+    summary = manager.analytics_summary()
+    week_total = sum(len(tasks) for tasks in weeks.values())
+    day_total = sum(len(items) for items in days.values())
+    done_total = sum(done for items in days.values() for _, done in items)
+    if (summary["tasks"], summary["items"], summary["completed"]) != (week_total, day_total, done_total):
+        problems.append(
+            f"{label}: 통계 (일정 {summary['tasks']}, 항목 {summary['items']}, 완료 {summary['completed']}) "
+            f"기대 ({week_total}, {day_total}, {done_total})"
+        )
+    unmatched = sum(
+        1 for *_, text, _ in expected
+        if text not in {result["text"] for result in manager.search(text, limit=len(expected))}
+    )
+    if unmatched:
+        problems.append(f"{label}: 검색되지 않는 항목 {unmatched}개")
+    return problems
+
+
+def run(processes, ops, days, backend_kind, seed, base_dir):
+    """검증을 실행하고 (문제 목록, 프로세스별 소요 시간) 반환"""
+    dates = _dates("2025-06-02", days)
+    # 다른 워커 역할: 작업 전에 문서를 읽어 캐시/색인을 채워 둠
+    observer = _open(base_dir, backend_kind)
+    for date_str in dates:
+        observer.load_week_data(date_str)
+        observer.load_day_data(date_str)
+    observer.search("p0")
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(processes)
+    results = context.Queue()
+    workers = [
+        context.Process(target=worker, args=(base_dir, backend_kind, i, ops, dates, seed, barrier, results))
+        for i in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    outcomes = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    failed = [process.exitcode for process in workers if process.exitcode]
+    expected = [item for _, _, items in sorted(outcomes) for item in items]
+    problems = [f"실패한 프로세스 종료 코드: {failed}"] if failed else []
+    problems += verify(observer, expected, "기존 매니저")
+    observer.close()
+    fresh = _open(base_dir, backend_kind)
+    try:
+        problems += verify(fresh, expected, "새 매니저")
+    finally:
+        fresh.close()
+    return problems, {worker_id: elapsed for worker_id, elapsed, _ in outcomes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="공유 모드 다중 프로세스 동시 쓰기 검증")
+    parser.add_argument("--processes", type=int, default=4, help="동시에 쓰는 프로세스 수")
+    parser.add_argument("--ops", type=int, default=200, help="프로세스별 연산 수")
+    parser.add_argument("--days", type=int, default=2, help="수정할 날짜 수 (적을수록 같은 문서에 몰림)")
+    parser.add_argument("--backend", default="json", help="저장소 종류 (json/sqlite)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="임시 데이터 디렉토리를 지우지 않음")
+    args = parser.parse_args()
+
+    base_dir = tempfile.mkdtemp(prefix="schedule-shared-")
+    try:
+        problems, elapsed = run(args.processes, args.ops, args.days, args.backend, args.seed, base_dir)
+    finally:
+        if args.keep:
+            print(f"📁 데이터 디렉토리: {base_dir}")
+        else:
+            shutil.rmtree(base_dir, ignore_errors=True)
+    total = args.processes * args.ops
+    slowest = max(elapsed.values())
+    print(f"프로세스 {args.processes}개 x 연산 {args.ops}개 = {total}개, {slowest:.2f}초 ({total / slowest:.0f} ops/s)")
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ 유실/중복된 변경 없음, 기존 매니저의 캐시/검색/통계도 모두 갱신됨")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,256 @@
+"""일정/체크리스트 항목 모델과 문서 스키마 변환
+
+메모리에서는 주간 시간대와 일별 체크리스트/완료 목록을 TaskList 로 보관합니다.
+TaskList 는 삽입 순서를 유지하는 id -> Task 딕셔너리와 텍스트 색인으로 되어 있어
+id/텍스트 조회, 완료 처리, 삭제가 목록 길이와 관계없이 O(1) 입니다.
+
+저장 형식 (schema 2):
+
+    {"schema": 2, "week_start": "...", "days": {"월": {"오전": [{"id": "...", "text": "..."}]}}}
+    {"schema": 2, "date": "...", "checklist": [{"id", "text"}], "completed": [...], "notes": ""}
+
+schema 가 없는 예전 형식(문자열 목록)은 읽을 때 자동으로 변환되며, 이때 id 는
+문서/위치/텍스트에서 결정적으로 만들어 다시 저장되기 전에도 항상 같은 값이 됩니다.
+"""
+import hashlib
+import uuid
+
+from storage import DAYS, TIME_SLOTS
+
+SCHEMA_VERSION = 2
+
+# 일별 문서에서 항목 목록인 필드
+DAY_LISTS = ("checklist", "completed")
+
+
+def new_task_id():
+    """새 항목 id"""
+    return uuid.uuid4().hex[:12]
+
+
+def derived_task_id(*parts):
+    """예전 형식 변환 등 id 가 없는 항목에 쓰는 결정적 id"""
+    return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+class Task:
+    """항목 하나 (id 는 문서 안에서 바뀌지 않음)
+
+    변경하지 않는 값으로 다루며, 이름 변경은 같은 id 의 새 Task 로 바꿉니다.
+    """
+
+    __slots__ = ("id", "text")
+
+    # 반복 규칙에서 전개된 항목인지 (recurrence.RecurringTask 에서 True)
+    recurring = False
+
+    def __init__(self, task_id, text):
+        self.id = task_id
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.text!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Task) and self.id == other.id and self.text == other.text
+
+    def __hash__(self):
+        return hash((self.id, self.text))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def renamed(self, text):
+        return Task(self.id, text)
+
+    def to_dict(self):
+        return {"id": self.id, "text": self.text}
+
+
+class TaskList:
+    """삽입 순서를 유지하는 항목 목록 (id/텍스트로 O(1) 조회)"""
+
+    __slots__ = ("_tasks", "_by_text")
+
+    def __init__(self, tasks=()):
+        # id -> Task, dict 의 삽입 순서가 곧 표시 순서
+        self._tasks = {}
+        # 텍스트 -> {id: None}, 같은 텍스트의 항목을 순서대로 보관
+        self._by_text = {}
+        for task in tasks:
+            self.add(task)
+
+    def __iter__(self):
+        return iter(self._tasks.values())
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, text):
+        """같은 텍스트의 항목이 있는지"""
+        return text in self._by_text
+
+    def __eq__(self, other):
+        if not isinstance(other, TaskList):
+            return NotImplemented
+        return list(self._tasks.values()) == list(other._tasks.values())
+
+    def __repr__(self):
+        return f"TaskList({list(self._tasks.values())!r})"
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def copy(self):
+        # Task 는 바뀌지 않으므로 공유
+        clone = TaskList.__new__(TaskList)
+        clone._tasks = dict(self._tasks)
+        clone._by_text = {text: dict(ids) for text, ids in self._by_text.items()}
+        return clone
+
+    def get(self, task_id):
+        return self._tasks.get(task_id)
+
+    def find(self, text):
+        """텍스트가 같은 첫 항목, 없으면 None"""
+        ids = self._by_text.get(text)
+        return self._tasks[next(iter(ids))] if ids else None
+
+    def add(self, task):
+        """끝에 추가, 같은 id 가 이미 있으면 무시하고 False"""
+        if task.id in self._tasks:
+            return False
+        self._tasks[task.id] = task
+        self._by_text.setdefault(task.text, {})[task.id] = None
+        return True
+
+    def remove(self, task_id):
+        """id 로 삭제하고 삭제한 Task 반환, 없으면 None"""
+        task = self._tasks.pop(task_id, None)
+        if task is not None:
+            ids = self._by_text[task.text]
+            del ids[task_id]
+            if not ids:
+                del self._by_text[task.text]
+        return task
+
+    def rename(self, task_id, text):
+        """위치를 유지한 채 텍스트 변경, 없으면 False"""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        if task.text != text:
+            ids = self._by_text[task.text]
+            del ids[task_id]
+            if not ids:
+                del self._by_text[task.text]
+            self._tasks[task_id] = task.renamed(text)
+            self._by_text.setdefault(text, {})[task_id] = None
+        return True
+
+    def unique_id(self, base):
+        """base 가 이미 쓰이고 있으면 뒤에 번호를 붙인 id"""
+        task_id = base
+        n = 1
+        while task_id in self._tasks:
+            task_id = f"{base}-{n}"
+            n += 1
+        return task_id
+
+    def texts(self):
+        return [task.text for task in self._tasks.values()]
+
+    def to_list(self):
+        return [task.to_dict() for task in self._tasks.values()]
+
+
+def _task_list(items, *id_parts):
+    """저장된 항목 목록(문자열/딕셔너리/Task 혼합)을 TaskList 로 변환"""
+    if isinstance(items, TaskList):
+        return items.copy()
+    tasks = TaskList()
+    seen = {}
+    for item in items:
+        if isinstance(item, Task):
+            tasks.add(item)
+            continue
+        if isinstance(item, dict):
+            text = str(item.get("text", ""))
+            task_id = item.get("id")
+        else:
+            text = str(item)
+            task_id = None
+        if not task_id:
+            # 같은 텍스트가 여러 번 있으면 순번으로 구분
+            occurrence = seen[text] = seen.get(text, -1) + 1
+            task_id = tasks.unique_id(derived_task_id(*id_parts, text, str(occurrence)))
+        tasks.add(Task(task_id, text))
+    return tasks
+
+
+def to_model(data):
+    """저장 형식(예전 형식 포함)의 문서를 TaskList 를 쓰는 메모리 문서로 변환"""
+    if data.get("schema", 1) > SCHEMA_VERSION:
+        raise ValueError(f"지원하지 않는 문서 schema 입니다: {data.get('schema')}")
+    model = {key: value for key, value in data.items() if key != "schema"}
+    if "days" in data:
+        name = data.get("week_start", "")
+        days = data.get("days") or {}
+        model["days"] = {
+            day: {slot: _task_list(days.get(day, {}).get(slot, ()), name, day, slot) for slot in TIME_SLOTS}
+            for day in DAYS
+        }
+        # 알 수 없는 요일/시간대도 버리지 않고 보관
+        for day, slots in days.items():
+            for slot, items in slots.items():
+                if slot not in model["days"].setdefault(day, {}):
+                    model["days"][day][slot] = _task_list(items, name, day, slot)
+    else:
+        name = data.get("date", "")
+        for field in DAY_LISTS:
+            model[field] = _task_list(data.get(field, ()), name, field)
+        model.setdefault("notes", "")
+    return model
+
+
+def _plain_list(items, *id_parts):
+    if not isinstance(items, TaskList):
+        items = _task_list(items, *id_parts)
+    return items.to_list()
+
+
+def to_plain(data):
+    """메모리 문서를 JSON 으로 저장할 수 있는 schema 2 딕셔너리로 변환"""
+    plain = {"schema": SCHEMA_VERSION}
+    for key, value in data.items():
+        if key == "days":
+            name = data.get("week_start", "")
+            plain["days"] = {
+                day: {slot: _plain_list(items, name, day, slot) for slot, items in slots.items()}
+                for day, slots in value.items()
+            }
+        elif key in DAY_LISTS:
+            plain[key] = _plain_list(value, data.get("date", ""), key)
+        elif key != "schema":
+            plain[key] = value
+    return plain
+
+
+def empty_document(kind, name):
+    """저장된 문서가 없을 때 사용할 기본 메모리 문서"""
+    if kind == "week":
+        return {"week_start": name, "days": {day: {slot: TaskList() for slot in TIME_SLOTS} for day in DAYS}}
+    return {"date": name, "checklist": TaskList(), "completed": TaskList(), "notes": ""}
+
+
+def count_items(data):
+    """문서(메모리 또는 저장 형식)의 항목 수"""
+    if "days" in data:
+        return sum(len(tasks) for slots in data["days"].values() for tasks in slots.values())
+    return sum(len(data.get(field) or ()) for field in DAY_LISTS)
@@ -0,0 +1,193 @@
+"""사용자별 데이터 분리 (멀티 테넌트)
+
+사용자마다 <root>/users/<이름>-<해시>/ 아래에 따로 저장하고, 사용자별 ScheduleManager 를
+처음 요청할 때 열어 LRU 로 보관합니다. 열린 사용자 수가 max_active 를 넘거나 idle_seconds 동안
+쓰지 않은 사용자의 매니저는 닫아 메모리에서 내립니다 (요청을 처리 중인 매니저는 닫지 않음).
+요청을 처리하는 동안 사용할 매니저는 current_manager 컨텍스트 변수로 전달합니다.
+"""
+import asyncio
+import contextvars
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# 현재 요청이 사용하는 사용자별 ScheduleManager (없으면 None)
+current_manager = contextvars.ContextVar("schedule_manager", default=None)
+
+_UNSAFE_CHARS = re.compile(r"[^0-9A-Za-z_.-]+")
+
+
+def tenant_dir(root, user_id):
+    """사용자의 저장 디렉토리 (읽기 쉬운 이름 + 해시로 서로 겹치지 않음)"""
+    slug = _UNSAFE_CHARS.sub("_", user_id).strip("._")[:32] or "user"
+    digest = hashlib.sha1(user_id.encode('utf-8')).hexdigest()[:10]
+    return os.path.join(root, "users", f"{slug}-{digest}")
+
+
+class _Tenant:
+    __slots__ = ("manager", "leases", "last_used")
+
+    def __init__(self, manager):
+        self.manager = manager
+        # 이 매니저를 빌려 처리 중인 요청 수
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+
+class TenantPool:
+    """사용자별 ScheduleManager 를 필요할 때 열고 오래 쓰지 않으면 닫는 풀
+
+    open_manager(base_dir) 로 매니저를 만들며, acquire()/release() 또는 lease() 로 빌려 씁니다.
+    """
+
+    def __init__(self, root, open_manager, max_active=32, idle_seconds=600):
+        self.root = root
+        self.open_manager = open_manager
+        self.max_active = max_active
+        self.idle_seconds = idle_seconds
+        self.opens = 0
+        self.evictions = 0
+        # 사용자 -> _Tenant, 오래 쓰지 않은 순서
+        self._tenants = OrderedDict()
+        # 내보냈지만 아직 닫지 않은 매니저, 같은 사용자를 다시 열기 전에 먼저 닫음
+        self._closing = {}
+        self._lock = threading.Lock()
+        # 사용자별 열기/닫기 잠금 (고정 개수로 나눠 씀)
+        self._user_locks = [threading.Lock() for _ in range(64)]
+        self._stop_janitor = threading.Event()
+        self._janitor = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tenants)
+
+    def acquire(self, user_id):
+        """사용자의 매니저를 빌림 (열려 있지 않으면 열기), 다 쓰면 release() 호출"""
+        manager = self._lease_open(user_id)
+        if manager is not None:
+            return manager
+        with self._user_lock(user_id):
+            manager = self._lease_open(user_id)
+            if manager is not None:
+                return manager
+            self._finish_closing(user_id)
+            tenant = _Tenant(self.open_manager(tenant_dir(self.root, user_id)))
+            tenant.leases = 1
+            with self._lock:
+                self._tenants[user_id] = tenant
+                self.opens += 1
+        self.evict()
+        return tenant.manager
+
+    async def acquire_async(self, user_id):
+        """acquire 의 비동기 버전, 새로 열 때만 스레드에서 실행해 이벤트 루프를 막지 않음"""
+        manager = self._lease_open(user_id)
+        if manager is not None:
+            return manager
+        return await asyncio.get_running_loop().run_in_executor(None, self.acquire, user_id)
+
+    def release(self, user_id):
+        """acquire 로 빌린 매니저 반납"""
+        with self._lock:
+            tenant = self._tenants[user_id]
+            tenant.leases -= 1
+            tenant.last_used = time.monotonic()
+            self._tenants.move_to_end(user_id)
+
+    @contextmanager
+    def lease(self, user_id):
+        """with 문 동안 사용자의 매니저를 빌리고 current_manager 로 지정"""
+        manager = self.acquire(user_id)
+        token = current_manager.set(manager)
+        try:
+            yield manager
+        finally:
+            current_manager.reset(token)
+            self.release(user_id)
+
+    def evict(self):
+        """열린 사용자 수가 max_active 를 넘은 만큼, 그리고 idle_seconds 동안 쓰지 않은 매니저를 닫고 개수 반환"""
+        now = time.monotonic()
+        victims = []
+        with self._lock:
+            excess = len(self._tenants) - self.max_active
+            for user_id, tenant in self._tenants.items():
+                idle = now - tenant.last_used >= self.idle_seconds
+                if excess <= 0 and not idle:
+                    # 뒤쪽은 더 최근에 쓴 사용자
+                    break
+                if tenant.leases:
+                    continue
+                victims.append(user_id)
+                excess -= 1
+            for user_id in victims:
+                self._closing[user_id] = self._tenants.pop(user_id)
+                self.evictions += 1
+        for user_id in victims:
+            with self._user_lock(user_id):
+                self._finish_closing(user_id)
+        return len(victims)
+
+    def start_janitor(self, interval=60.0):
+        """주기적으로 쓰지 않는 매니저를 닫는 백그라운드 스레드 시작"""
+        if self._janitor is not None:
+            return
+        self._janitor = threading.Thread(target=self._janitor_loop, args=(interval,), name="tenant-janitor", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self, interval):
+        while not self._stop_janitor.wait(interval):
+            try:
+                self.evict()
+            except OSError as e:
+                print(f"⚠️ 사용자 매니저 정리 실패: {e}")
+
+    def managers(self):
+        """열려 있는 (사용자, 매니저) 목록"""
+        with self._lock:
+            return [(user_id, tenant.manager) for user_id, tenant in self._tenants.items()]
+
+    def stats(self):
+        """열린 사용자 수와 누적 열기/내보내기 횟수"""
+        with self._lock:
+            return {"active": len(self._tenants), "max_active": self.max_active,
+                    "opens": self.opens, "evictions": self.evictions}
+
+    def close(self):
+        """정리 스레드를 멈추고 모든 매니저 닫기"""
+        self._stop_janitor.set()
+        if self._janitor is not None:
+            self._janitor.join()
+            self._janitor = None
+        with self._lock:
+            self._closing.update(self._tenants)
+            self._tenants.clear()
+            user_ids = list(self._closing)
+        for user_id in user_ids:
+            with self._user_lock(user_id):
+                self._finish_closing(user_id)
+
+    def _user_lock(self, user_id):
+        return self._user_locks[hash(user_id) % len(self._user_locks)]
+
+    def _lease_open(self, user_id):
+        # 열려 있으면 빌려주고, 아니면 None
+        with self._lock:
+            tenant = self._tenants.get(user_id)
+            if tenant is None:
+                return None
+            tenant.leases += 1
+            tenant.last_used = time.monotonic()
+            self._tenants.move_to_end(user_id)
+            return tenant.manager
+
+    def _finish_closing(self, user_id):
+        # 사용자 잠금을 잡은 상태에서 호출
+        with self._lock:
+            tenant = self._closing.pop(user_id, None)
+        if tenant is not None:
+            tenant.manager.close()